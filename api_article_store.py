@@ -0,0 +1,222 @@
+from typing import List, Dict, Any, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import hashlib
+import json
+import os
+
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid")
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+
+def canonical_url(url: str) -> str:
+    """
+    Canonical form of an article url.
+
+    Lowercases scheme and host, drops `www.`, default ports, fragments,
+    tracking parameters and trailing slashes, and sorts the query string.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or "https"
+
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and str(parts.port) != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    )
+    path = parts.path.rstrip("/") or "/"
+
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def article_id(url: str) -> str:
+    """Stable article id: hash of the canonical url."""
+    return _digest(canonical_url(url))
+
+
+def body_hash(body: str) -> str:
+    """Revision id: hash of the (normalized) article body."""
+    return _digest(body or "")
+
+
+class ArticleStore:
+    """
+    Content-addressed on-disk store of crawled articles.
+
+    An article is identified by the hash of its canonical url and each
+    revision by the hash of its body, so ids are stable across runs and an
+    edited article shows up as a new revision of the same id.
+
+    Layout:
+      {root}/objects/{id[:2]}/{id[2:4]}/{id}/{revision}.json
+      {root}/objects/{id[:2]}/{id[2:4]}/{id}/revisions.log
+
+    `revisions.log` is append-only, one revision id per line, written each
+    time an article's current revision changes. It orders the revisions:
+    a body reverting to earlier content is appended again and becomes the
+    latest, although its object file already exists.
+
+    Day manifest ({timestamp}_articles.json):
+      [
+        {"id": "3fa2...", "revision": "9c01...", "status": "new", "source": "SecurityWeek", "url": "https://..."}
+      ]
+    """
+
+    NEW = "new"
+    CHANGED = "changed"
+    UNCHANGED = "unchanged"
+
+    REVISION_LOG = "revisions.log"
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+
+    # -----------------------------------------------------
+    # Public API
+    # -----------------------------------------------------
+    @staticmethod
+    def identify(item: Dict[str, Any]) -> Tuple[str, str]:
+        """Assign and return the stable `id` and `revision` of an item."""
+        item["id"] = article_id(item["url"])
+        item["revision"] = body_hash(item.get("body", ""))
+        return item["id"], item["revision"]
+
+    def put(self, item: Dict[str, Any]) -> str:
+        """
+        Assign `id` / `revision` to an item and store it if unseen.
+
+        Returns:
+            "new", "changed" or "unchanged" (compared with the latest
+            revision: reverting to an earlier one is a change)
+        """
+        self.identify(item)
+
+        article_dir = self._article_dir(item["id"])
+        path = os.path.join(article_dir, f"{item['revision']}.json")
+
+        revisions = self.revisions(item["id"])
+        if revisions and revisions[-1] == item["revision"] and os.path.exists(path):
+            return self.UNCHANGED
+
+        status = self.CHANGED if os.path.isdir(article_dir) else self.NEW
+        os.makedirs(article_dir, exist_ok=True)
+
+        if not os.path.exists(path):
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(item, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+
+        log_path = os.path.join(article_dir, self.REVISION_LOG)
+        with open(log_path, "a", encoding="utf-8") as f:
+            if revisions and not os.path.getsize(log_path):
+                # Stored before the log existed: keep their order
+                f.writelines(f"{revision}\n" for revision in revisions)
+            f.write(f"{item['revision']}\n")
+
+        return status
+
+    def ingest(
+        self,
+        items: List[Dict[str, Any]],
+        *,
+        known: Dict[Tuple[str, str], str] | None = None,
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Store a run's articles.
+
+        Args:
+            items: Crawled articles
+            known: Statuses already assigned earlier in the same run, keyed by
+                (id, revision). Reused instead of asking the store again, so
+                an article stored before a crash is not reported "unchanged"
+                when the run resumes. Updated in place.
+
+        Returns:
+            (manifest entries for every article, items that are new or changed)
+        """
+        entries = []
+        fresh = []
+        seen = set()
+
+        for item in items:
+            key = self.identify(item)
+            if known is not None and key in known:
+                status = known[key]
+            else:
+                status = self.put(item)
+                if known is not None:
+                    known[key] = status
+
+            if key in seen:
+                continue
+            seen.add(key)
+
+            entries.append({
+                "id": item["id"],
+                "revision": item["revision"],
+                "status": status,
+                "source": item.get("source"),
+                "url": item.get("url"),
+            })
+            if status != self.UNCHANGED:
+                fresh.append(item)
+
+        return entries, fresh
+
+    def get(self, article_id: str, revision: str | None = None) -> Dict[str, Any] | None:
+        """Return a stored revision, or the latest one."""
+        revisions = self.revisions(article_id)
+        if not revisions:
+            return None
+
+        revision = revision or revisions[-1]
+        path = os.path.join(self._article_dir(article_id), f"{revision}.json")
+        if not os.path.exists(path):
+            return None
+
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def revisions(self, article_id: str) -> List[str]:
+        """Revision ids of an article, oldest first, by when each last became current."""
+        article_dir = self._article_dir(article_id)
+        if not os.path.isdir(article_dir):
+            return []
+
+        log_path = os.path.join(article_dir, self.REVISION_LOG)
+        if os.path.exists(log_path) and os.path.getsize(log_path):
+            with open(log_path, encoding="utf-8") as f:
+                logged = [line.strip() for line in f if line.strip()]
+            # A revision that became current again moves to its last position
+            return list(reversed(dict.fromkeys(reversed(logged))))
+
+        # Articles stored before the revision log: file modification order
+        files = [
+            entry for entry in os.scandir(article_dir)
+            if entry.name.endswith(".json")
+        ]
+        files.sort(key=lambda e: e.stat().st_mtime_ns)
+        return [entry.name[:-len(".json")] for entry in files]
+
+    @staticmethod
+    def write_manifest(entries: List[Dict[str, Any]], output_file: str) -> str:
+        os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False, indent=4)
+        return output_file
+
+    # -----------------------------------------------------
+    # Internal helpers
+    # -----------------------------------------------------
+    def _article_dir(self, article_id: str) -> str:
+        return os.path.join(self.root, "objects", article_id[:2], article_id[2:4], article_id)
@@ -0,0 +1,365 @@
+from typing import List, Dict, Any, Iterable, Tuple
+from datetime import datetime, timedelta
+from urllib.parse import quote
+
+import scrapy
+from scrapy.exceptions import IgnoreRequest
+
+from api_article_store import canonical_url
+
+
+def date_slices(since: datetime, until: datetime, days: float = 1) -> List[Tuple[datetime, datetime]]:
+    """[(start, end)] windows of `days` covering [since, until], newest first."""
+    slices = []
+    end = until
+    while end > since:
+        start = max(since, end - timedelta(days=days))
+        slices.append((start, end))
+        end = start
+    return slices
+
+
+def backfill_date_url(template: str, end: datetime) -> str:
+    """Listing url of the posts up to `end` (`{max}` as RFC 3339 with the local offset)."""
+    return template.format(max=quote(end.astimezone().isoformat(timespec="seconds"), safe=""))
+
+
+class PageFanout:
+    """
+    Listing page numbers to request for a backfill of [since, until].
+
+    Instead of following "Next" links one page at a time, up to `window`
+    page numbers are in flight at once; every finished page makes room for
+    the next number. A page reaching past `since` (or an empty page, the
+    end of the archive) stops the fan-out after it.
+
+    With `until` set, the range may start deep in the archive: pages are
+    probed at doubling numbers (1, 2, 4, ...) while they are entirely newer
+    than `until`, then the pages between the last such probe and the first
+    one reaching into the range are requested, lowest first.
+
+    The plan lives in `state` (a dict of plain values), so it survives a
+    JOBDIR pause/resume as part of `spider.state`.
+    """
+
+    def __init__(self, since: datetime, until: datetime | None, window: int, state: Dict[str, Any]):
+        self.since = since
+        self.until = until
+        self.window = max(1, window)
+        self.state = state
+        state.setdefault("scheduled", set())
+        state.setdefault("done", set())
+        state.setdefault("stop", None)  # first page number not needed
+        state.setdefault("probing", until is not None)
+        state.setdefault("low", 0)      # last probe entirely newer than `until`
+
+    # -----------------------------------------------------
+    # Public API
+    # -----------------------------------------------------
+    def start(self) -> List[int]:
+        """Pages of a new backfill ([] when resuming one)."""
+        if self.state["scheduled"]:
+            return []
+        if self.state["probing"]:
+            return self._schedule([1])
+        return self._schedule(range(1, self.window + 1))
+
+    def page_done(self, page: int, dates: Iterable[datetime | None], empty: bool = False) -> List[int]:
+        """Record a parsed page (`dates` of its articles); returns the pages to request next."""
+        s = self.state
+        if page in s["done"]:
+            return []
+        s["done"].add(page)
+
+        dated = [d for d in dates if d is not None]
+        if empty:
+            self._stop_at(page)
+        elif dated and min(dated) < self.since:
+            self._stop_at(page + 1)
+
+        if s["probing"]:
+            if not empty and dated and min(dated) > self.until:
+                s["low"] = max(s["low"], page)
+                return self._schedule([page * 2])
+            # The range starts between the last probe and this page
+            s["probing"] = False
+
+        # Fill the window with the lowest pages not requested yet
+        pages = []
+        in_flight = len(s["scheduled"] - s["done"])
+        next_page = s["low"] + 1
+        while in_flight < self.window and (s["stop"] is None or next_page < s["stop"]):
+            if next_page not in s["scheduled"]:
+                pages.append(next_page)
+                in_flight += 1
+            next_page += 1
+
+        return self._schedule(pages)
+
+    # -----------------------------------------------------
+    # Internal helpers
+    # -----------------------------------------------------
+    def _stop_at(self, page: int):
+        if self.state["stop"] is None or page < self.state["stop"]:
+            self.state["stop"] = page
+
+    def _schedule(self, pages: Iterable[int]) -> List[int]:
+        s = self.state
+        new = sorted(
+            p for p in set(pages)
+            if p not in s["scheduled"] and (s["stop"] is None or p < s["stop"])
+        )
+        s["scheduled"].update(new)
+        return new
+
+
+class BackfillMixin:
+    """
+    Crawl a historical date range with listing requests fanned out in
+    parallel instead of one "Next" link at a time.
+
+        scrapy crawl securityweek -a backfill_from=2025-06-01 [-a backfill_to=2025-08-31] \\
+            -s JOBDIR=crawls/securityweek-backfill
+
+    (or the BACKFILL_FROM / BACKFILL_TO settings, for every spider at once).
+
+    Spiders set one of:
+      backfill_pages  listing url template with `{page}` (page 1 is the
+                      first start url): WordPress `/page/N/` and other
+                      page-number listings, see `PageFanout`
+      backfill_dates  listing url template with `{max}`, the newest post
+                      date to list (Blogger `updated-max`): the range (up
+                      to the newest post if open-ended) is cut into
+                      BACKFILL_SLICE_DAYS slices, all requested at once,
+                      each followed through its "Next" links until it
+                      reaches the slice start
+
+    and implement `listing_entries(response)`, `next_page_url(response)`,
+    `article_request(response, url, title, date, author)` and the
+    `dated_listings` flag, and call `backfill_article_done()` when an
+    article is parsed. Listings without dates report a page once all its
+    articles are done.
+
+    The fan-out only fills the scheduler: requests still go through the
+    per-domain download slots, so concurrency, DOWNLOAD_DELAY and
+    AutoThrottle apply as in any crawl. BACKFILL_WINDOW bounds the listing
+    pages in flight.
+
+    Pause/resume: with JOBDIR, Scrapy keeps the request queue and
+    `spider.state`. The plan and every outstanding listing and article
+    request are kept in `spider.state["backfill"]`; on resume, outstanding
+    requests are issued again (requests dropped from the downloader when
+    the crawl stopped are not lost) and responses for requests that were
+    already handled are ignored.
+
+    Stats:
+      backfill/listings, backfill/articles, backfill/resumed
+    """
+
+    backfill_pages: str | None = None
+    backfill_dates: str | None = None
+
+    @property
+    def backfilling(self) -> bool:
+        return bool(self._backfill_setting("from"))
+
+    async def start(self):
+        if not self.backfilling:
+            async for request in super().start():
+                yield request
+            return
+
+        for request in self._backfill_start():
+            yield request
+
+    def parse_backfill(self, response, page: int | None = None, slice_start: str | None = None, newest: bool = False):
+        state = self._backfill_state()
+        if state["listings"].pop(self._original_url(response), None) is None:
+            return  # already handled before a resume
+        self._inc_stat("backfill/listings")
+
+        entries = self.listing_entries(response)
+        if newest:
+            # Open-ended date range: the slices end with the newest post's day
+            dates = [entry["article_date"] for entry in entries if entry["article_date"] is not None]
+            yield from self._slice_requests(max(dates) + timedelta(days=1) if dates else datetime.now())
+            return
+
+        since, until = self._backfill_range()
+        if slice_start is not None:
+            since = max(since, datetime.fromisoformat(slice_start))
+
+        requested = 0
+        for entry in entries:
+            date = entry["article_date"]
+            if date is not None and not since <= date <= (until or date):
+                continue
+            key = canonical_url(entry["url"])
+            if key in state["requested"]:
+                continue
+            state["requested"].add(key)
+
+            request = self.article_request(response, entry["url"], entry["title"], entry["date"], entry["author"])
+            yield self._track_article(request, page)
+            requested += 1
+
+        dates = [entry["article_date"] for entry in entries]
+        if slice_start is not None:
+            # Follow the slice until it reaches its start
+            next_url = self.next_page_url(response)
+            if next_url and entries and all(d is None or d >= since for d in dates):
+                yield self._listing_request(response.urljoin(next_url), slice_start=slice_start)
+        elif self.dated_listings or not requested:
+            yield from self._pages_done(page, dates, empty=not entries)
+        else:
+            state["pages"][page] = {"pending": requested, "dates": []}
+
+    def backfill_listing_failed(self, failure):
+        state = self._backfill_state()
+        cb_kwargs = state["listings"].pop(failure.request.url, None)
+        if cb_kwargs is None:
+            return
+        page = cb_kwargs.get("page")
+        if page is not None:
+            # A missing page number is past the end of the archive
+            self.logger.info("Backfill listing page %s failed (%s), stopping there", page, failure.value)
+            yield from self._pages_done(page, [], empty=True)
+        else:
+            self.logger.warning("Backfill listing failed: %s (%s)", failure.request.url, failure.value)
+
+    def backfill_article_done(self, request, date: datetime | None) -> Tuple[List[Any], bool]:
+        """
+        Record a parsed or failed backfill article. Returns the listing
+        requests it releases and whether the article is to be kept (in the
+        range, and not already handled before a resume).
+        """
+        state = self._backfill_state()
+        article = state["articles"].pop(canonical_url(request.cb_kwargs.get("url", request.url)), None)
+        if article is None:
+            return [], False
+
+        released = []
+        page = state["pages"].get(article["page"])
+        if page is not None:
+            page["pending"] -= 1
+            page["dates"].append(date)
+            if page["pending"] <= 0:
+                del state["pages"][article["page"]]
+                released = list(self._pages_done(article["page"], page["dates"]))
+
+        since, until = self._backfill_range()
+        keep = date is None or (date >= since and (until is None or date <= until))
+        return released, keep
+
+    def backfill_article_failed(self, failure):
+        # Seen-url frontier drops (IgnoreRequest) and errors count as undated
+        released, _ = self.backfill_article_done(failure.request, None)
+        if not failure.check(IgnoreRequest):
+            self.logger.warning("Backfill article failed: %s (%s)", failure.request.url, failure.value)
+        yield from released
+
+    # -----------------------------------------------------
+    # Internal helpers
+    # -----------------------------------------------------
+    def _backfill_setting(self, name: str):
+        # Spider argument (`-a backfill_from=...`) or BACKFILL_FROM setting
+        crawler = getattr(self, "crawler", None)
+        default = crawler.settings.get(f"BACKFILL_{name.upper()}") if crawler is not None else None
+        return getattr(self, f"backfill_{name}", None) or default
+
+    def _backfill_range(self) -> Tuple[datetime, datetime | None]:
+        since = datetime.fromisoformat(str(self._backfill_setting("from")))
+        until = self._backfill_setting("to")
+        return since, datetime.fromisoformat(str(until)) if until else None
+
+    def _backfill_state(self) -> Dict[str, Any]:
+        # spider.state is set (and persisted) by Scrapy's SpiderState
+        # extension when JOBDIR is set
+        if getattr(self, "state", None) is None:
+            self.state = {}
+        state = self.state.setdefault("backfill", {})
+        state.setdefault("plan", {})
+        state.setdefault("listings", {})   # url -> cb_kwargs
+        state.setdefault("articles", {})   # canonical url -> {"page", "url", "cb_kwargs"}
+        state.setdefault("pages", {})      # undated page -> {"pending", "dates"}
+        state.setdefault("requested", set())
+        return state
+
+    def _fanout(self) -> PageFanout:
+        since, until = self._backfill_range()
+        window = self.crawler.settings.getint("BACKFILL_WINDOW", 8)
+        return PageFanout(since, until, window, self._backfill_state()["plan"])
+
+    def _backfill_start(self):
+        state = self._backfill_state()
+        if state["listings"] or state["articles"] or state["plan"]:
+            # Resumed: issue every outstanding request again
+            self._inc_stat("backfill/resumed")
+            for url, cb_kwargs in list(state["listings"].items()):
+                yield self._listing_request(url, **cb_kwargs)
+            for article in list(state["articles"].values()):
+                yield scrapy.Request(
+                    article["url"],
+                    callback=self.parse_article,
+                    errback=self.backfill_article_failed,
+                    cb_kwargs=article["cb_kwargs"],
+                    meta={"backfill_page": article["page"]},
+                    dont_filter=True,
+                )
+            return
+
+        if self.backfill_pages:
+            yield from self._page_requests(self._fanout().start())
+        elif self.backfill_dates:
+            _, until = self._backfill_range()
+            if until is None:
+                state["plan"]["slices"] = 0
+                yield self._listing_request(self.start_urls[0], newest=True)
+            else:
+                yield from self._slice_requests(until)
+        else:
+            raise ValueError(f"Spider '{self.name}' has no backfill_pages or backfill_dates")
+
+    def _slice_requests(self, until: datetime):
+        since, _ = self._backfill_range()
+        days = self.crawler.settings.getfloat("BACKFILL_SLICE_DAYS", 1)
+        slices = date_slices(since, until, days)
+        self._backfill_state()["plan"]["slices"] = len(slices)
+        for start, end in slices:
+            yield self._listing_request(backfill_date_url(self.backfill_dates, end), slice_start=start.isoformat())
+
+    def _pages_done(self, page: int, dates, empty: bool = False):
+        yield from self._page_requests(self._fanout().page_done(page, dates, empty=empty))
+
+    def _page_requests(self, pages: Iterable[int]):
+        for page in pages:
+            url = self.start_urls[0] if page == 1 else self.backfill_pages.format(page=page)
+            yield self._listing_request(url, page=page)
+
+    def _listing_request(self, url: str, **cb_kwargs):
+        self._backfill_state()["listings"][url] = cb_kwargs
+        return scrapy.Request(
+            url,
+            callback=self.parse_backfill,
+            errback=self.backfill_listing_failed,
+            cb_kwargs=cb_kwargs,
+            dont_filter=True,
+        )
+
+    def _track_article(self, request, page: int | None):
+        url = request.cb_kwargs.get("url", request.url)
+        self._backfill_state()["articles"][canonical_url(url)] = {
+            "page": page, "url": request.url, "cb_kwargs": dict(request.cb_kwargs),
+        }
+        self._inc_stat("backfill/articles")
+        request.meta["backfill_page"] = page
+        return request.replace(errback=self.backfill_article_failed, dont_filter=True)
+
+    @staticmethod
+    def _original_url(response) -> str:
+        return response.meta.get("redirect_urls", [response.request.url])[0]
+
+    def _inc_stat(self, key: str, count: int = 1):
+        crawler = getattr(self, "crawler", None)
+        if crawler is not None and crawler.stats is not None:
+            crawler.stats.inc_value(key, count)
@@ -0,0 +1,156 @@
+from typing import List, Iterable
+import copy
+
+from w3lib.html import replace_entities
+
+from api_compiled_selector import SelectorTimer
+
+HEADINGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+
+
+class BodyExtractor:
+    """
+    Single-pass article body extraction over the lxml tree.
+
+    The container elements are located once; their subtrees are then
+    walked a single time, skipping excluded tags and classes (substring
+    match, as XPath `contains(@class, ...)`) without descending into them,
+    and the body is built from one list of lines.
+
+    Text units:
+      units=None     each direct child of a container is a unit
+      units=(tags)   each element with one of these tags is a unit
+
+    split="unit" makes each unit's whole text one line (XPath `string(.)`),
+    split="node" makes each of its text nodes a line
+    (`descendant-or-self::text()`). Lines are stripped; empty lines and
+    `skip_texts` are dropped. A unit whose normalized text starts with one
+    of `skip_prefixes`, or that contains a `drop_units_containing` tag, is
+    dropped entirely.
+
+    With `fallback_all_text`, a body with no unit text falls back to every
+    text node of the containers (still honouring the exclusions).
+    """
+
+    def __init__(
+        self,
+        containers: str,
+        *,
+        units: Iterable[str] | None = None,
+        split: str = "node",
+        exclude_classes: Iterable[str] = (),
+        exclude_tags: Iterable[str] = ("style", "script"),
+        drop_units_containing: Iterable[str] = (),
+        skip_prefixes: Iterable[str] = (),
+        skip_texts: Iterable[str] = (),
+        fallback_all_text: bool = False,
+    ):
+        if split not in ("unit", "node"):
+            raise ValueError(f"Unknown split '{split}', expected 'unit' or 'node'")
+
+        self.containers = containers
+        self.units = frozenset(units) if units is not None else None
+        self.split = split
+        self.exclude_classes = tuple(exclude_classes)
+        self.exclude_tags = frozenset(exclude_tags)
+        self.drop_units_containing = frozenset(drop_units_containing)
+        self.skip_prefixes = tuple(skip_prefixes)
+        self.skip_texts = frozenset(skip_texts)
+        self.fallback_all_text = fallback_all_text
+
+    def for_containers(self, containers: str) -> "BodyExtractor":
+        """Same rules applied to other container elements."""
+        extractor = copy.copy(self)
+        extractor.containers = containers
+        return extractor
+
+    # -----------------------------------------------------
+    # Public API
+    # -----------------------------------------------------
+    def extract(self, response) -> str:
+        """Body text of a Scrapy response (or Selector, or lxml element)."""
+        return "\n".join(self.extract_lines(response))
+
+    def extract_lines(self, response) -> List[str]:
+        root = getattr(response, "selector", response)
+        root = getattr(root, "root", root)
+
+        containers = SelectorTimer.measure(lambda node: node.xpath(self.containers), root)
+        inside = set(containers)
+        # Nested matches are walked as part of their outermost container
+        containers = [c for c in containers if not any(a in inside for a in c.iterancestors())]
+
+        lines: List[str] = []
+        for container in containers:
+            if self.units is None:
+                for child in container:
+                    if isinstance(child.tag, str) and not self._excluded(child):
+                        self._unit(child, lines)
+            else:
+                self._visit(container, lines)
+
+        if not lines and self.fallback_all_text:
+            for container in containers:
+                nodes: List[str] = []
+                self._collect(container, nodes, drop=False)
+                lines.extend(
+                    replace_entities(text.strip()) for text in nodes if text.strip()
+                )
+
+        return lines
+
+    # -----------------------------------------------------
+    # Internal helpers
+    # -----------------------------------------------------
+    def _excluded(self, el) -> bool:
+        if el.tag in self.exclude_tags:
+            return True
+        if self.exclude_classes:
+            classes = el.get("class")
+            if classes and any(c in classes for c in self.exclude_classes):
+                return True
+        return False
+
+    def _visit(self, el, lines: List[str]):
+        """Look for units below `el` (outside any unit)."""
+        for child in el:
+            if not isinstance(child.tag, str) or self._excluded(child):
+                continue
+            if child.tag in self.units:
+                self._unit(child, lines)
+            else:
+                self._visit(child, lines)
+
+    def _unit(self, el, lines: List[str]):
+        nodes: List[str] = []
+        if self._collect(el, nodes, drop=True):
+            return
+
+        if self.skip_prefixes and " ".join("".join(nodes).split()).startswith(self.skip_prefixes):
+            return
+
+        if self.split == "unit":
+            nodes = ["".join(nodes)]
+        for text in nodes:
+            text = text.strip()
+            if text and text not in self.skip_texts:
+                lines.append(text)
+
+    def _collect(self, el, nodes: List[str], drop: bool) -> bool:
+        """
+        Append the text nodes of `el`'s subtree, skipping excluded elements.
+        Returns True if a `drop_units_containing` tag was met (with `drop`).
+        """
+        if el.text and isinstance(el.tag, str):
+            nodes.append(el.text)
+
+        for child in el:
+            if isinstance(child.tag, str):
+                if drop and child.tag in self.drop_units_containing:
+                    return True
+                if not self._excluded(child) and self._collect(child, nodes, drop):
+                    return True
+            if child.tail:
+                nodes.append(child.tail)
+
+        return False
@@ -0,0 +1,100 @@
+from typing import List, Any
+import contextvars
+import time
+
+from lxml import etree
+from parsel.csstranslator import HTMLTranslator
+
+_TRANSLATOR = HTMLTranslator()
+# Innermost active SelectorTimer of the current thread (or asyncio task)
+_ACTIVE_TIMER: "contextvars.ContextVar[SelectorTimer | None]" = contextvars.ContextVar("selector_timer", default=None)
+
+
+class SelectorTimer:
+    """
+    Time spent evaluating selectors while the timer is active.
+
+        with SelectorTimer() as timer:
+            spider_callback(response)
+        timer.seconds
+
+    `CompiledSelector` (and `BodyExtractor`'s container XPath) evaluations
+    go through `measure()`, which costs nothing when no timer is active.
+    Timers nest: the innermost one receives the time. The active timer is
+    kept per thread, so pages parsed on worker threads (PARSE_OFFLOAD)
+    are not credited to the callback running on the reactor thread.
+    """
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.evaluations = 0
+        self._token: "contextvars.Token | None" = None
+
+    def __enter__(self) -> "SelectorTimer":
+        self._token = _ACTIVE_TIMER.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        _ACTIVE_TIMER.reset(self._token)
+        self._token = None
+
+    @staticmethod
+    def measure(evaluate, node):
+        timer = _ACTIVE_TIMER.get()
+        if timer is None:
+            return evaluate(node)
+        started = time.perf_counter()
+        try:
+            return evaluate(node)
+        finally:
+            timer.seconds += time.perf_counter() - started
+            timer.evaluations += 1
+
+
+class CompiledSelector:
+    """
+    A CSS or XPath selector compiled once into an lxml `XPath` object.
+
+    Expressions starting with "/", "./" or "(" are XPath; anything else is
+    CSS, with parsel's `::text` and `::attr(name)` pseudo-elements. CSS is
+    translated once instead of on every `response.css()` call, and the
+    compiled XPath is evaluated directly on lxml elements, without building
+    `Selector` objects for every match.
+
+    Usage:
+        title = CompiledSelector("h4 a::text")
+        title.first(element)  # "Title" or None
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        if expression.startswith(("/", "./", "(")):
+            self.xpath = expression
+        else:
+            self.xpath = _TRANSLATOR.css_to_xpath(expression)
+        self._compiled = etree.XPath(self.xpath, smart_strings=False)
+
+    def __repr__(self) -> str:
+        return f"CompiledSelector({self.expression!r})"
+
+    def __reduce__(self):
+        # Compiled XPath objects cannot be pickled: compile again on load
+        return CompiledSelector, (self.expression,)
+
+    # -----------------------------------------------------
+    # Public API
+    # -----------------------------------------------------
+    def all(self, node) -> List[Any]:
+        """Every match below `node`: elements, or strings for text and attributes."""
+        result = SelectorTimer.measure(self._compiled, node)
+        return result if isinstance(result, list) else [result]
+
+    def texts(self, node) -> List[str]:
+        """Stripped, non-empty string matches."""
+        return [text.strip() for text in map(str, self.all(node)) if text.strip()]
+
+    def first(self, node) -> str | None:
+        """The first match, stripped (None if there is none or it is blank)."""
+        for match in self.all(node):
+            return str(match).strip() or None
+        return None
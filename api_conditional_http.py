@@ -0,0 +1,134 @@
+from typing import Dict, Tuple
+import os
+import sqlite3
+import time
+
+from scrapy import signals
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+
+from api_article_store import canonical_url
+
+
+class ValidatorStore:
+    """
+    Persistent `ETag` / `Last-Modified` values per url.
+
+    Layout:
+      {directory}/validators.sqlite3
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.db = sqlite3.connect(os.path.join(directory, "validators.sqlite3"))
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS validators ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, updated REAL NOT NULL)"
+        )
+
+    def get(self, url: str) -> Tuple[str | None, str | None]:
+        row = self.db.execute(
+            "SELECT etag, last_modified FROM validators WHERE url = ?",
+            (canonical_url(url),),
+        ).fetchone()
+        return row if row else (None, None)
+
+    def put_many(self, validators: Dict[str, Tuple[str | None, str | None]]):
+        now = time.time()
+        self.db.executemany(
+            "INSERT OR REPLACE INTO validators (url, etag, last_modified, updated) VALUES (?, ?, ?, ?)",
+            [(canonical_url(url), etag, modified, now) for url, (etag, modified) in validators.items()],
+        )
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+
+class ConditionalRequestMiddleware:
+    """
+    Conditional GETs for listing pages.
+
+    Listing requests (callback in CONDITIONAL_HTTP_CALLBACKS, default
+    `parse`) carry `If-None-Match` / `If-Modified-Since` from the validators
+    the site sent last time. A 304 means the listing has no new articles:
+    the request is dropped, so the crawl of that listing stops there.
+
+    Validators of 2xx responses are written only when the spider finishes
+    normally, so a crashed run never makes the next one skip articles it
+    did not get to.
+
+    Settings:
+      CONDITIONAL_HTTP_DIR        directory of the validator store (required)
+      CONDITIONAL_HTTP_CALLBACKS  callback names treated as listing requests
+
+    Stats:
+      conditional_http/sent, conditional_http/not_modified,
+      conditional_http/modified, conditional_http/stored
+    """
+
+    def __init__(self, crawler, directory: str, callbacks):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.callbacks = set(callbacks)
+        self.store = ValidatorStore(directory)
+        self.pending: Dict[str, Tuple[str | None, str | None]] = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.get("CONDITIONAL_HTTP_DIR"):
+            raise NotConfigured("CONDITIONAL_HTTP_DIR is not set")
+
+        mw = cls(
+            crawler,
+            settings.get("CONDITIONAL_HTTP_DIR"),
+            settings.getlist("CONDITIONAL_HTTP_CALLBACKS", ["parse"]),
+        )
+        crawler.signals.connect(mw.spider_closed, signal=signals.spider_closed)
+        return mw
+
+    def _is_listing(self, request) -> bool:
+        callback = request.callback
+        name = getattr(callback, "__name__", None) if callback is not None else "parse"
+        return name in self.callbacks
+
+    def process_request(self, request):
+        if not self._is_listing(request):
+            return None
+
+        etag, modified = self.store.get(request.url)
+        if etag:
+            request.headers.setdefault("If-None-Match", etag)
+        if modified:
+            request.headers.setdefault("If-Modified-Since", modified)
+        if etag or modified:
+            self.stats.inc_value("conditional_http/sent")
+        return None
+
+    def process_response(self, request, response):
+        if not self._is_listing(request):
+            return response
+
+        if response.status == 304:
+            self.stats.inc_value("conditional_http/not_modified")
+            raise IgnoreRequest(f"Listing not modified since the last run: {request.url}")
+
+        if 200 <= response.status < 300:
+            etag = response.headers.get("ETag")
+            modified = response.headers.get("Last-Modified")
+            if etag or modified:
+                self.pending[request.url] = (
+                    etag.decode("latin-1") if etag else None,
+                    modified.decode("latin-1") if modified else None,
+                )
+            if request.headers.get("If-None-Match") or request.headers.get("If-Modified-Since"):
+                self.stats.inc_value("conditional_http/modified")
+
+        return response
+
+    def spider_closed(self, spider, reason):
+        if reason == "finished" and self.pending:
+            self.store.put_many(self.pending)
+            self.stats.set_value("conditional_http/stored", len(self.pending))
+        self.store.close()
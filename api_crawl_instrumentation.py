@@ -0,0 +1,349 @@
+from typing import List, Dict, Any
+import math
+import os
+import time
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+from api_compiled_selector import SelectorTimer
+
+# request.meta keys of the request timeline
+_SCHEDULED = "instrumentation_scheduled"
+_REACHED_DOWNLOADER = "instrumentation_reached_downloader"
+_DOWNLOADED = "instrumentation_downloaded"
+# Set by the download handler when it starts sending a request, once the
+# request has left its download slot's queue (see `mark_sent`)
+SENT = "instrumentation_sent"
+
+# Smallest bucket bound of each kind of histogram (buckets double from there)
+TIME_BASE = 0.0001     # seconds
+BYTES_BASE = 1024      # bytes
+BUCKETS = 24
+
+
+def mark_sent(request):
+    """
+    Record that a request leaves its slot queue and is being sent. Called
+    by the download handler: no signal or middleware runs at that point.
+    """
+    request.meta[SENT] = time.time()
+
+
+class Histogram:
+    """
+    Counts of values in buckets doubling from `base` (the last bucket is
+    open-ended), with the exact count, total and max. Constant memory, so
+    a long crawl can record every response; quantiles are bucket bounds.
+    """
+
+    def __init__(self, base: float = TIME_BASE, unit: str = "s"):
+        self.base = base
+        self.unit = unit
+        self.buckets = [0] * BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float):
+        value = max(0.0, float(value))
+        index = 0 if value <= self.base else math.ceil(math.log2(value / self.base))
+        self.buckets[min(index, BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def bound(self, index: int) -> float:
+        return self.base * 2 ** index
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th value (at most the max)."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(self.bound(index), self.max)
+        return self.max
+
+    def format(self, value: float) -> str:
+        if self.unit == "s":
+            return f"{value * 1000:.1f}ms" if value < 1 else f"{value:.2f}s"
+        if self.unit == "B":
+            return f"{value / 1024:.1f}KiB"
+        return f"{value:g}"
+
+    def render(self, width: int = 30) -> List[str]:
+        """Text bars of the non-empty bucket range."""
+        used = [i for i, n in enumerate(self.buckets) if n]
+        if not used:
+            return []
+        peak = max(self.buckets)
+        lines = []
+        for index in range(used[0], used[-1] + 1):
+            n = self.buckets[index]
+            label = "inf" if index == BUCKETS - 1 else self.format(self.bound(index))
+            lines.append(f"    <= {label:>9} {'#' * math.ceil(width * n / peak):<{width}} {n}")
+        return lines
+
+
+class CrawlInstrumentation:
+    """
+    Extension recording where a crawl's time goes, for every spider:
+
+      callback/<name>/cpu, /wall  CPU and wall time of each callback call
+                                  (measured by `CallbackTimingMiddleware`)
+      callback/<name>/selectors   time spent evaluating selectors in it
+      response/bytes              response body sizes
+      request/queued              scheduler enqueue -> downloader
+      request/slot_wait           downloader -> sent: waiting in the download
+                                  slot's queue (per-domain concurrency,
+                                  DOWNLOAD_DELAY, AutoThrottle)
+      request/download            sent -> whole response body received
+      request/latency             sent -> response headers (download_latency)
+      autothrottle/delay          the slot delay after each AutoThrottle
+                                  adjustment (when enabled)
+      reactor/lag                 how late a timer set every
+                                  INSTRUMENTATION_LOOP_LAG seconds fires:
+                                  time the reactor thread was kept busy
+
+    Each metric goes into the stats as instrumentation/<metric>/count,
+    total, mean, p50, p95 and max; AutoThrottle decisions are also counted
+    as instrumentation/autothrottle/raised, lowered and unchanged. When
+    the spider closes, a histogram summary of every metric is logged and,
+    with INSTRUMENTATION_DIR set, written to `{dir}/{spider}.txt`.
+
+    slot_wait and download need the send time, which only the download
+    handler knows: handlers call `mark_sent(request)` when they start (as
+    `api_crawl_runner.SharedPoolDownloadHandler` does). With other handlers
+    these two metrics are not recorded.
+
+    Settings:
+      INSTRUMENTATION_ENABLED   default True
+      INSTRUMENTATION_DIR       where to write the summaries (optional)
+      INSTRUMENTATION_LOOP_LAG  reactor lag sampling interval in seconds
+                                (default 0.05, 0 disables)
+    """
+
+    def __init__(self, crawler, directory: str | None = None, lag_interval: float = 0.05):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.directory = directory
+        self.lag_interval = lag_interval
+        self.histograms: Dict[str, Histogram] = {}
+        self._slot_delays: Dict[str, float] = {}
+        self._lag_call = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("INSTRUMENTATION_ENABLED", True):
+            raise NotConfigured("INSTRUMENTATION_ENABLED is off")
+
+        ext = cls(
+            crawler,
+            settings.get("INSTRUMENTATION_DIR") or None,
+            settings.getfloat("INSTRUMENTATION_LOOP_LAG", 0.05),
+        )
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.request_scheduled, signal=signals.request_scheduled)
+        crawler.signals.connect(ext.request_reached_downloader, signal=signals.request_reached_downloader)
+        crawler.signals.connect(ext.response_downloaded, signal=signals.response_downloaded)
+        crawler.signals.connect(ext.response_received, signal=signals.response_received)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    # -----------------------------------------------------
+    # Public API
+    # -----------------------------------------------------
+    def record(self, metric: str, value: float, base: float = TIME_BASE, unit: str = "s"):
+        histogram = self.histograms.get(metric)
+        if histogram is None:
+            histogram = self.histograms[metric] = Histogram(base, unit)
+        histogram.add(value)
+
+    def record_callback(self, callback: str, cpu: float, wall: float, selectors: float):
+        self.record(f"callback/{callback}/cpu", cpu)
+        self.record(f"callback/{callback}/wall", wall)
+        self.record(f"callback/{callback}/selectors", selectors)
+
+    def summary(self, spider_name: str) -> str:
+        lines = [f"Crawl instrumentation of '{spider_name}'"]
+        for metric in sorted(self.histograms):
+            h = self.histograms[metric]
+            lines.append(
+                f"  {metric}: n={h.count} total={h.format(h.total)} mean={h.format(h.mean)} "
+                f"p50={h.format(h.quantile(0.5))} p95={h.format(h.quantile(0.95))} max={h.format(h.max)}"
+            )
+            lines.extend(h.render())
+        return "\n".join(lines)
+
+    # -----------------------------------------------------
+    # Signals
+    # -----------------------------------------------------
+    def spider_opened(self, spider):
+        if self.lag_interval > 0:
+            self._schedule_lag_sample()
+
+    def request_scheduled(self, request, spider):
+        request.meta.setdefault(_SCHEDULED, time.time())
+
+    def request_reached_downloader(self, request, spider):
+        request.meta[_REACHED_DOWNLOADER] = time.time()
+
+    def response_downloaded(self, response, request, spider):
+        # Sent by the downloader as soon as the handler returns the whole
+        # response, before the downloader middlewares process it
+        request.meta[_DOWNLOADED] = time.time()
+
+    def response_received(self, response, request, spider):
+        self.record("response/bytes", len(response.body), BYTES_BASE, "B")
+
+        meta = request.meta
+        scheduled, reached = meta.get(_SCHEDULED), meta.get(_REACHED_DOWNLOADER)
+        sent, downloaded = meta.get(SENT), meta.get(_DOWNLOADED)
+        latency = meta.get("download_latency")
+        if scheduled is not None and reached is not None:
+            self.record("request/queued", reached - scheduled)
+        if reached is not None and sent is not None:
+            self.record("request/slot_wait", sent - reached)
+        if sent is not None and downloaded is not None:
+            self.record("request/download", downloaded - sent)
+        if latency is not None:
+            self.record("request/latency", latency)
+
+        if self.crawler.settings.getbool("AUTOTHROTTLE_ENABLED"):
+            self._autothrottle_decision(meta.get("download_slot"))
+
+    def spider_closed(self, spider):
+        if self._lag_call is not None and self._lag_call.active():
+            self._lag_call.cancel()
+
+        for metric, h in self.histograms.items():
+            key = f"instrumentation/{metric}"
+            self.stats.set_value(f"{key}/count", h.count)
+            self.stats.set_value(f"{key}/total", round(h.total, 4))
+            self.stats.set_value(f"{key}/mean", round(h.mean, 4))
+            self.stats.set_value(f"{key}/p50", round(h.quantile(0.5), 4))
+            self.stats.set_value(f"{key}/p95", round(h.quantile(0.95), 4))
+            self.stats.set_value(f"{key}/max", round(h.max, 4))
+
+        if not self.histograms:
+            return
+        summary = self.summary(spider.name)
+        spider.logger.info(summary)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, f"{spider.name}.txt"), "w", encoding="utf-8") as f:
+                f.write(summary + "\n")
+
+    # -----------------------------------------------------
+    # Internal helpers
+    # -----------------------------------------------------
+    def _schedule_lag_sample(self):
+        from twisted.internet import reactor
+
+        self._lag_call = reactor.callLater(self.lag_interval, self._lag_sample, time.perf_counter() + self.lag_interval)
+
+    def _lag_sample(self, due: float):
+        self.record("reactor/lag", time.perf_counter() - due)
+        self._schedule_lag_sample()
+
+    def _autothrottle_decision(self, slot_key: str | None):
+        # AutoThrottle adjusts the slot delay on response_downloaded, which
+        # fires before response_received
+        engine = self.crawler.engine
+        slot = engine.downloader.slots.get(slot_key) if engine is not None and slot_key else None
+        if slot is None:
+            return
+
+        previous = self._slot_delays.get(slot_key)
+        self._slot_delays[slot_key] = slot.delay
+        self.record("autothrottle/delay", slot.delay)
+        if previous is None or slot.delay == previous:
+            self.stats.inc_value("instrumentation/autothrottle/unchanged")
+        elif slot.delay > previous:
+            self.stats.inc_value("instrumentation/autothrottle/raised")
+        else:
+            self.stats.inc_value("instrumentation/autothrottle/lowered")
+
+
+class CallbackTimingMiddleware:
+    """
+    Spider middleware timing each callback for `CrawlInstrumentation`.
+
+    Callbacks are generators: the time of every step (producing the next
+    request or item) is summed, so work done by the engine between steps
+    is not counted. Enable it with the highest order of the spider
+    middlewares, closest to the spider, so later middlewares are excluded.
+    """
+
+    def __init__(self, instrumentation: CrawlInstrumentation):
+        self.instrumentation = instrumentation
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        for extension in crawler.extensions.middlewares:
+            if isinstance(extension, CrawlInstrumentation):
+                return cls(extension)
+        raise NotConfigured("CrawlInstrumentation extension is not enabled")
+
+    def process_spider_output(self, response, result):
+        timing = _CallbackTiming(response)
+        iterator = iter(result)
+        try:
+            while True:
+                with timing:
+                    try:
+                        output = next(iterator)
+                    except StopIteration:
+                        return
+                yield output
+        finally:
+            timing.done(self.instrumentation)
+
+    async def process_spider_output_async(self, response, result):
+        # Async callbacks: awaited time is included in the wall time
+        timing = _CallbackTiming(response)
+        iterator = result.__aiter__()
+        try:
+            while True:
+                with timing:
+                    try:
+                        output = await iterator.__anext__()
+                    except StopAsyncIteration:
+                        return
+                yield output
+        finally:
+            timing.done(self.instrumentation)
+
+
+class _CallbackTiming:
+    """CPU, wall and selector time accumulated over the steps of one callback call."""
+
+    def __init__(self, response):
+        request = getattr(response, "request", None)
+        callback = getattr(request, "callback", None)
+        self.name = getattr(callback, "__name__", "parse")
+        self.cpu = self.wall = 0.0
+        self.selectors = SelectorTimer()
+        self._started: Any = None
+
+    def __enter__(self):
+        self.selectors.__enter__()
+        self._started = (time.perf_counter(), time.thread_time())
+
+    def __exit__(self, *exc):
+        wall, cpu = self._started
+        self.wall += time.perf_counter() - wall
+        self.cpu += time.thread_time() - cpu
+        self.selectors.__exit__(*exc)
+
+    def done(self, instrumentation: CrawlInstrumentation):
+        instrumentation.record_callback(self.name, self.cpu, self.wall, self.selectors.seconds)
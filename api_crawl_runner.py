@@ -0,0 +1,250 @@
+from typing import List, Dict, Any
+import importlib
+import os
+import sys
+import time
+
+from scrapy import signals
+from scrapy.core.downloader.handlers.http11 import HTTP11DownloadHandler
+from scrapy.crawler import Crawler, CrawlerProcess
+from scrapy.settings import Settings
+
+from api_crawl_instrumentation import mark_sent
+
+# Dict settings merged with the project's value rather than replacing it
+COMPONENT_SETTINGS = (
+    "DOWNLOADER_MIDDLEWARES",
+    "SPIDER_MIDDLEWARES",
+    "EXTENSIONS",
+    "ITEM_PIPELINES",
+    "DOWNLOAD_HANDLERS",
+)
+
+
+class LatencyStats:
+    """
+    Extension summarizing download latencies (`download_latency` meta, time
+    from sending a request to receiving its headers) into the crawl stats:
+    latency/count, latency/mean, latency/p50, latency/p95 and latency/max.
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.latencies: List[float] = []
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        ext = cls(crawler.stats)
+        crawler.signals.connect(ext.response_received, signal=signals.response_received)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def response_received(self, response, request, spider):
+        latency = request.meta.get("download_latency")
+        if latency is not None:
+            self.latencies.append(latency)
+
+    def spider_closed(self, spider):
+        if not self.latencies:
+            return
+        latencies = sorted(self.latencies)
+        n = len(latencies)
+        self.stats.set_value("latency/count", n)
+        self.stats.set_value("latency/mean", round(sum(latencies) / n, 4))
+        self.stats.set_value("latency/p50", round(latencies[n // 2], 4))
+        self.stats.set_value("latency/p95", round(latencies[min(n - 1, int(n * 0.95))], 4))
+        self.stats.set_value("latency/max", round(latencies[-1], 4))
+
+
+class SharedPoolDownloadHandler(HTTP11DownloadHandler):
+    """
+    HTTP(S) download handler whose crawlers all use one connection pool.
+
+    Scrapy gives every crawler (and scheme) its own pool; with one crawler
+    per source in a process, this handler hands them the pool of the first
+    one instead, so persistent connections are reused across sources
+    sharing a host (CDNs, APIs) and closed once, by the last handler.
+    Per-host connections are capped at the largest
+    CONCURRENT_REQUESTS_PER_DOMAIN of the crawlers. Requests are marked
+    sent for `CrawlInstrumentation`.
+    """
+
+    _shared_pool = None
+    _users = 0
+
+    def __init__(self, crawler):
+        super().__init__(crawler)
+        cls = SharedPoolDownloadHandler
+        if cls._shared_pool is None:
+            cls._shared_pool = self._pool
+        else:
+            cls._shared_pool.maxPersistentPerHost = max(
+                cls._shared_pool.maxPersistentPerHost, self._pool.maxPersistentPerHost
+            )
+            self._pool = cls._shared_pool
+        cls._users += 1
+
+    async def download_request(self, request):
+        mark_sent(request)
+        return await super().download_request(request)
+
+    async def close(self) -> None:
+        cls = SharedPoolDownloadHandler
+        cls._users -= 1
+        if cls._users > 0:
+            return
+        cls._shared_pool = None
+        await super().close()
+
+
+class ConcurrentCrawlRunner:
+    """
+    Run several Scrapy projects' spiders concurrently in one process.
+
+    Each spider gets its own Crawler, built from its project's
+    `settings.py` with the spider's `custom_settings` layered on top as
+    usual, but all crawlers share a single Twisted reactor. Wall time is
+    therefore close to the slowest source rather than the sum of all.
+
+    Spider spec:
+      {
+        "dir": "news_spider",
+        "settings": "news_spider.settings",
+        "spider": "news_spider.spiders.news.BleepingSpider",
+        "output": "bleeping.json",
+        "source": "BleepingComputer",
+        "pipeline": "news_spider.pipelines.NewsSpiderStreamPipeline",
+      }
+
+    Items are exported as JSON to "output", inside `feed_dir` if given or
+    else the project directory. With `append` they are written as JSON Lines
+    (".jsonl") and appended instead, so a crawl re-run after a crash keeps
+    the articles it had already fetched. With `stream` set, each spider's
+    "pipeline" is enabled and pushes its items into the `ArticleStream`
+    registered under that name. `LatencyStats` is enabled for every spider.
+    A JOBDIR setting containing "{spider}" gives each spider its own job
+    directory, so a paused run (e.g. a backfill) resumes every source.
+    """
+
+    def __init__(
+        self,
+        base_dir: str,
+        spiders: List[Dict[str, Any]],
+        *,
+        settings: Dict[str, Any] | None = None,
+        stream: str | None = None,
+        feed_dir: str | None = None,
+        append: bool = False,
+    ):
+        self.base_dir = base_dir
+        self.spiders = spiders
+        self.settings = settings or {}
+        self.stream = stream
+        self.feed_dir = feed_dir
+        self.append = append
+        self.crawlers: Dict[str, Crawler] = {}
+
+    # -----------------------------------------------------
+    # Public API
+    # -----------------------------------------------------
+    def run(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Crawl all sources and block until every spider has closed.
+
+        Returns:
+            Per-source stats, e.g.
+            {"SecurityWeek": {"item_scraped_count": 12, "downloader/request_count": 31, ...}}
+        """
+        process = CrawlerProcess(self.settings)
+
+        for i, spec in enumerate(self.spiders):
+            crawler = Crawler(
+                self._load_spider(spec),
+                self._project_settings(spec),
+                init_reactor=(i == 0),
+            )
+            self.crawlers[spec["source"]] = crawler
+            process.crawl(crawler)
+
+        started = time.perf_counter()
+        process.start()
+        wall_time = time.perf_counter() - started
+
+        stats = self.stats()
+        for source, spider_stats in stats.items():
+            print(
+                f"{source}: {spider_stats.get('item_scraped_count', 0)} items, "
+                f"{spider_stats.get('downloader/request_count', 0)} requests, "
+                f"{spider_stats.get('elapsed_time_seconds', 0):.1f}s "
+                f"({spider_stats.get('finish_reason')})"
+            )
+        print(f"All spiders finished in {wall_time:.1f}s.")
+
+        return stats
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Full Scrapy stats of every crawler, keyed by source."""
+        return {
+            source: dict(crawler.stats.get_stats()) if crawler.stats is not None else {}
+            for source, crawler in self.crawlers.items()
+        }
+
+    # -----------------------------------------------------
+    # Internal helpers
+    # -----------------------------------------------------
+    def _project_dir(self, spec: Dict[str, Any]) -> str:
+        return os.path.join(self.base_dir, spec["dir"])
+
+    def feed_path(self, spec: Dict[str, Any]) -> str:
+        output = spec["output"]
+        if self.append:
+            output = f"{os.path.splitext(output)[0]}.jsonl"
+        return os.path.join(self.feed_dir or self._project_dir(spec), output)
+
+    def _add_to_path(self, spec: Dict[str, Any]):
+        project_dir = self._project_dir(spec)
+        if project_dir not in sys.path:
+            sys.path.insert(0, project_dir)
+
+    def _load_spider(self, spec: Dict[str, Any]):
+        self._add_to_path(spec)
+        module_name, class_name = spec["spider"].rsplit(".", 1)
+        return getattr(importlib.import_module(module_name), class_name)
+
+    def _project_settings(self, spec: Dict[str, Any]) -> Settings:
+        self._add_to_path(spec)
+        settings = Settings()
+        settings.setmodule(spec["settings"], priority="project")
+        for name, value in self.settings.items():
+            if name in COMPONENT_SETTINGS:
+                # Add to the project's components instead of replacing them
+                value = {**settings.getdict(name), **value}
+            settings.set(name, value, priority="cmdline")
+        settings.set(
+            "FEEDS",
+            {
+                self.feed_path(spec): {
+                    "format": "jsonlines" if self.append else "json",
+                    "encoding": "utf-8",
+                    "overwrite": not self.append,
+                },
+            },
+            priority="cmdline",
+        )
+
+        jobdir = settings.get("JOBDIR")
+        if jobdir and "{spider}" in jobdir:
+            # One job directory per crawler: they cannot share request queues
+            settings.set("JOBDIR", jobdir.format(spider=self._load_spider(spec).name), priority="cmdline")
+
+        extensions = settings.getdict("EXTENSIONS")
+        extensions[f"{__name__}.LatencyStats"] = 500
+        settings.set("EXTENSIONS", extensions, priority="cmdline")
+
+        if self.stream is not None:
+            settings.set("ARTICLE_STREAM", self.stream, priority="cmdline")
+            pipelines = settings.getdict("ITEM_PIPELINES")
+            pipelines[spec["pipeline"]] = 300
+            settings.set("ITEM_PIPELINES", pipelines, priority="cmdline")
+
+        return settings
@@ -0,0 +1,676 @@
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
+import argparse
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+
+import numpy as np
+
+_CVE_RE = re.compile(r"\bCVE[-_\s\u2010-\u2013]?(\d{4})[-_\s\u2010-\u2013](\d{4,7})\b", re.IGNORECASE)
+
+# magic, entry count, first year, year count
+HEADER = struct.Struct("<8sIII")
+MAGIC = b"CVEIDX01"
+
+# Entries sorted by key = year << 32 | number, the record offset and length
+# in the records area, and the base score (NaN without CVSS metrics) for
+# lookups that do not need the record itself
+ENTRY = np.dtype([("key", "<u8"), ("offset", "<u8"), ("length", "<u4"), ("score", "<f4")])
+
+# A year's entries are bucketed by number >> BUCKET_BITS: a lookup reads the
+# bucket's bounds from the directory and binary-searches at most 2^BUCKET_BITS
+# entries, whatever the size of the index
+BUCKET_BITS = 8
+SEARCH_STEPS = BUCKET_BITS + 1
+
+# Preferred CVSS metrics, newest version first
+CVSS_METRICS = (
+    ("cvssMetricV40", "4.0"),
+    ("cvssMetricV31", "3.1"),
+    ("cvssMetricV30", "3.0"),
+    ("cvssMetricV2", "2.0"),
+)
+
+
+def parse_cve_id(text: str) -> Tuple[int, int] | None:
+    """(year, number) of a CVE id, tolerating case and dash variants, or None."""
+    match = _CVE_RE.search(text)
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def format_cve_id(year: int, number: int) -> str:
+    return f"CVE-{year}-{number:04d}"
+
+
+def cve_key(year: int, number: int) -> int:
+    return year << 32 | number
+
+
+def find_cve_ids(text: str) -> List[str]:
+    """Canonical CVE ids mentioned in a text, in order, without repeats."""
+    ids = (format_cve_id(int(year), int(number)) for year, number in _CVE_RE.findall(text))
+    return list(dict.fromkeys(ids))
+
+
+# =========================================================
+# NVD feeds
+# =========================================================
+
+def read_nvd_file(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Compact records of an NVD JSON file (optionally gzipped): an API 2.0
+    response or dump ({"vulnerabilities": [{"cve": ...}]}) or a legacy 1.1
+    data feed ({"CVE_Items": [...]}).
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+
+    if "vulnerabilities" in data:
+        for entry in data["vulnerabilities"]:
+            yield _record_v2(entry["cve"])
+    elif "CVE_Items" in data:
+        for entry in data["CVE_Items"]:
+            yield _record_v11(entry)
+    else:
+        raise ValueError(f"{path}: not an NVD JSON feed (no 'vulnerabilities' or 'CVE_Items')")
+
+
+def read_nvd_files(paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Records of NVD files, or of the *.json / *.json.gz files of directories."""
+    for path in paths:
+        if os.path.isdir(path):
+            names = sorted(n for n in os.listdir(path) if n.endswith((".json", ".json.gz")))
+            yield from read_nvd_files(os.path.join(path, n) for n in names)
+        else:
+            yield from read_nvd_file(path)
+
+
+def _record_v2(cve: Dict[str, Any]) -> Dict[str, Any]:
+    cvss = None
+    metrics = cve.get("metrics") or {}
+    for name, version in CVSS_METRICS:
+        candidates = metrics.get(name) or []
+        # NVD's own assessment over the CNA's
+        candidates = sorted(candidates, key=lambda m: m.get("type") != "Primary")
+        if candidates:
+            metric = candidates[0]
+            data = metric.get("cvssData") or {}
+            cvss = {
+                "version": version,
+                "score": data.get("baseScore"),
+                "severity": data.get("baseSeverity") or metric.get("baseSeverity"),
+                "vector": data.get("vectorString"),
+            }
+            break
+
+    cwe = [
+        d["value"]
+        for weakness in cve.get("weaknesses") or []
+        for d in weakness.get("description") or []
+        if d.get("value", "").startswith("CWE-")
+    ]
+    products = [
+        match.get("criteria", "")
+        for configuration in cve.get("configurations") or []
+        for node in configuration.get("nodes") or []
+        for match in node.get("cpeMatch") or []
+        if match.get("vulnerable", True)
+    ]
+    return _record(
+        cve["id"],
+        cve.get("published"),
+        cve.get("lastModified"),
+        cve.get("vulnStatus"),
+        _english(cve.get("descriptions")),
+        cvss,
+        cwe,
+        products,
+    )
+
+
+def _record_v11(item: Dict[str, Any]) -> Dict[str, Any]:
+    cve = item["cve"]
+    impact = item.get("impact") or {}
+    cvss = None
+    if "baseMetricV3" in impact:
+        data = impact["baseMetricV3"].get("cvssV3") or {}
+        cvss = {
+            "version": data.get("version", "3.x"),
+            "score": data.get("baseScore"),
+            "severity": data.get("baseSeverity"),
+            "vector": data.get("vectorString"),
+        }
+    elif "baseMetricV2" in impact:
+        metric = impact["baseMetricV2"]
+        data = metric.get("cvssV2") or {}
+        cvss = {
+            "version": data.get("version", "2.0"),
+            "score": data.get("baseScore"),
+            "severity": metric.get("severity"),
+            "vector": data.get("vectorString"),
+        }
+
+    cwe = [
+        d["value"]
+        for problem in (cve.get("problemtype") or {}).get("problemtype_data") or []
+        for d in problem.get("description") or []
+        if d.get("value", "").startswith("CWE-")
+    ]
+    products = []
+    nodes = list((item.get("configurations") or {}).get("nodes") or [])
+    while nodes:
+        node = nodes.pop(0)
+        nodes.extend(node.get("children") or [])
+        products.extend(m.get("cpe23Uri", "") for m in node.get("cpe_match") or [] if m.get("vulnerable", True))
+
+    description = _english((cve.get("description") or {}).get("description_data"))
+    return _record(
+        cve["CVE_data_meta"]["ID"],
+        item.get("publishedDate"),
+        item.get("lastModifiedDate"),
+        "Rejected" if description.startswith("** REJECT **") else None,
+        description,
+        cvss,
+        cwe,
+        products,
+    )
+
+
+def _english(descriptions) -> str:
+    for d in descriptions or []:
+        if d.get("lang") == "en":
+            return d.get("value", "")
+    return ""
+
+
+def _record(cve_id, published, modified, status, description, cvss, cwe, cpes) -> Dict[str, Any]:
+    # "cpe:2.3:a:vendor:product:version:..." -> "vendor:product"
+    products = [":".join(cpe.split(":")[3:5]) for cpe in cpes if cpe.count(":") >= 4]
+    return {
+        "id": cve_id,
+        "published": published,
+        "modified": modified,
+        "status": status,
+        "cvss": cvss,
+        "cwe": list(dict.fromkeys(cwe)),
+        "products": list(dict.fromkeys(products)),
+        "description": description,
+    }
+
+
+# =========================================================
+# Index parts
+# =========================================================
+
+def write_part(path: str, records: Dict[int, bytes], scores: Dict[int, float]):
+    """
+    Write an index file from encoded records by key:
+
+      header | year table | bucket directory | entries | records
+
+    The year table holds, per year from the first, its first directory
+    slot and bucket count (u32 each); the directory, per bucket, the index
+    of its first entry, followed by the end of the year's last bucket.
+    """
+    keys = np.array(sorted(records), dtype=np.uint64)
+    years = (keys >> np.uint64(32)).astype(np.int64)
+    numbers = (keys & np.uint64(0xFFFFFFFF)).astype(np.int64)
+    first_year = int(years[0]) if keys.size else 0
+    n_years = int(years[-1]) - first_year + 1 if keys.size else 0
+
+    year_table = np.zeros((n_years, 2), dtype=np.uint32)
+    directory = []
+    for y in range(n_years):
+        lo, hi = np.searchsorted(years, [first_year + y, first_year + y + 1])
+        n_buckets = int(numbers[hi - 1] >> BUCKET_BITS) + 1 if hi > lo else 0
+        year_table[y] = (len(directory), n_buckets)
+        bounds = np.arange(n_buckets, dtype=np.int64) << BUCKET_BITS
+        directory.extend((lo + np.searchsorted(numbers[lo:hi], bounds)).tolist())
+        directory.append(int(hi))
+
+    entries = np.zeros(keys.size, dtype=ENTRY)
+    entries["key"] = keys
+    lengths = np.array([len(records[int(k)]) for k in keys], dtype=np.uint64)
+    entries["length"] = lengths
+    entries["offset"] = np.cumsum(lengths) - lengths
+    entries["score"] = [scores.get(int(k), np.nan) for k in keys]
+
+    with open(path + ".tmp", "wb") as f:
+        f.write(HEADER.pack(MAGIC, int(keys.size), first_year, n_years))
+        f.write(year_table.tobytes())
+        f.write(np.asarray(directory, dtype=np.uint32).tobytes())
+        f.write(entries.tobytes())
+        for key in keys:
+            f.write(records[int(key)])
+    os.replace(path + ".tmp", path)
+
+
+def encode_record(record: Dict[str, Any]) -> Tuple[int, bytes, float]:
+    """Key, compact JSON and base score of a record."""
+    year, number = parse_cve_id(record["id"])
+    score = (record.get("cvss") or {}).get("score")
+    data = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return cve_key(year, number), data, float("nan") if score is None else float(score)
+
+
+class IndexPart:
+    """One memory-mapped index file (see `write_part`)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.n, self.first_year, n_years = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a CVE index file")
+        offset = HEADER.size
+        self.years = np.frombuffer(self._map, dtype=np.uint32, count=2 * n_years, offset=offset).reshape(-1, 2)
+        self._years = self.years.tolist()
+        offset += self.years.nbytes
+        n_slots = int(self.years[-1, 0] + self.years[-1, 1] + 1) if n_years else 0
+        self.directory = np.frombuffer(self._map, dtype=np.uint32, count=n_slots, offset=offset)
+        offset += self.directory.nbytes
+        self.entries = np.frombuffer(self._map, dtype=ENTRY, count=self.n, offset=offset)
+        self.keys = self.entries["key"]
+        self.records_offset = offset + self.entries.nbytes
+
+    def __len__(self) -> int:
+        return self.n
+
+    def close(self):
+        # Views of the map must go before it can be closed
+        self.years = self.directory = self.entries = self.keys = None
+        self._map.close()
+        self._file.close()
+
+    def find(self, year: int, number: int) -> int | None:
+        """Entry index of a CVE, or None: one directory read and a bounded search."""
+        y = year - self.first_year
+        if not 0 <= y < len(self.years):
+            return None
+        first_slot, n_buckets = self._years[y]
+        bucket = number >> BUCKET_BITS
+        if bucket >= n_buckets:
+            return None
+        lo, hi = self.directory[first_slot + bucket:first_slot + bucket + 2].tolist()
+        key = cve_key(year, number)
+        i = lo + int(self.keys[lo:hi].searchsorted(key))
+        return i if i < hi and self.keys[i] == key else None
+
+    def find_many(self, years: np.ndarray, numbers: np.ndarray) -> np.ndarray:
+        """Entry indexes of many CVEs at once, -1 where absent (vectorized `find`)."""
+        found = np.full(years.size, -1, dtype=np.int64)
+        y = years - self.first_year
+        buckets = numbers >> BUCKET_BITS
+        valid = (y >= 0) & (y < len(self.years))
+        valid[valid] &= buckets[valid] < self.years[y[valid], 1]
+        if not valid.any():
+            return found
+
+        slots = self.years[y[valid], 0].astype(np.int64) + buckets[valid]
+        lo = self.directory[slots].astype(np.int64)
+        hi = end = self.directory[slots + 1].astype(np.int64)
+        keys = (years[valid].astype(np.uint64) << np.uint64(32)) | numbers[valid].astype(np.uint64)
+        # Lower bound in [lo, hi), which spans at most one bucket
+        for _ in range(SEARCH_STEPS):
+            active = lo < hi
+            mid = (lo + hi) // 2
+            below = np.zeros(lo.size, dtype=bool)
+            below[active] = self.keys[mid[active]] < keys[active]
+            lo = np.where(active & below, mid + 1, lo)
+            hi = np.where(active & ~below, mid, hi)
+        hit = lo < end
+        hit[hit] &= self.keys[lo[hit]] == keys[hit]
+        found[np.flatnonzero(valid)[hit]] = lo[hit]
+        return found
+
+    def record(self, i: int) -> Dict[str, Any]:
+        return json.loads(self.record_bytes(i))
+
+    def record_bytes(self, i: int) -> bytes:
+        entry = self.entries[i]
+        start = self.records_offset + int(entry["offset"])
+        return self._map[start:start + int(entry["length"])]
+
+
+# =========================================================
+# Index
+# =========================================================
+
+class CVEIndex:
+    """
+    Offline CVE lookups from a local copy of the NVD data.
+
+    `build()` turns NVD JSON files (API 2.0 dumps or legacy 1.1 yearly
+    feeds) into one memory-mapped file of compact records sorted by CVE id
+    (see `write_part`). `update()` applies delta files (such as the
+    "modified" feed) as a small extra part, newest first at lookup time;
+    records older than the indexed ones are skipped and files already
+    applied are recognized by their hash. Once there are more than
+    `max_deltas` delta parts, or they hold more than `max_delta_ratio` of
+    the base's entries, all parts are compacted into a new base by copying
+    their records, without re-reading the feeds.
+
+    Layout:
+      {directory}/index.json        parts (oldest first) and applied files,
+                                    replaced atomically
+      {directory}/part-NNNNNN.idx   index parts
+    """
+
+    MANIFEST = "index.json"
+
+    def __init__(self, directory: str, *, max_deltas: int = 8, max_delta_ratio: float = 0.1):
+        self.directory = directory
+        self.max_deltas = max_deltas
+        self.max_delta_ratio = max_delta_ratio
+
+        manifest = {"generation": 0, "next_part": 0, "parts": [], "applied": {}}
+        manifest_path = os.path.join(directory, self.MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        self.generation: int = manifest["generation"]
+        self.next_part: int = manifest["next_part"]
+        self.applied: Dict[str, str] = manifest["applied"]
+        self.parts: List[IndexPart] = [IndexPart(os.path.join(directory, name)) for name in manifest["parts"]]
+
+    def __enter__(self) -> "CVEIndex":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self) -> int:
+        """Entries of all parts; a CVE updated by a delta is counted once per part."""
+        return sum(len(part) for part in self.parts)
+
+    def __contains__(self, cve_id: str) -> bool:
+        return self._locate(cve_id) is not None
+
+    def close(self):
+        for part in self.parts:
+            part.close()
+
+    @classmethod
+    def build(cls, directory: str, paths: Iterable[str], **kwargs) -> "CVEIndex":
+        """A new index of NVD files, replacing what `directory` held."""
+        os.makedirs(directory, exist_ok=True)
+        index = cls(directory, **kwargs)
+        records, scores = {}, {}
+        for record in read_nvd_files(paths):
+            key, data, score = encode_record(record)
+            records[key], scores[key] = data, score
+
+        index._publish(index._write(records, scores), replace=True, applied={})
+        return index
+
+    # -----------------------------------------------------
+    # Public API
+    # -----------------------------------------------------
+    def get(self, cve_id: str) -> Dict[str, Any] | None:
+        located = self._locate(cve_id)
+        return located[0].record(located[1]) if located else None
+
+    def score(self, cve_id: str) -> float | None:
+        """CVSS base score, without decoding the record."""
+        located = self._locate(cve_id)
+        if located is None:
+            return None
+        score = float(located[0].entries[located[1]]["score"])
+        return None if score != score else score
+
+    def get_many(self, cve_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Records of the CVEs found, by canonical id; each part is searched once for all of them."""
+        wanted = {}
+        for cve_id in cve_ids:
+            parsed = parse_cve_id(cve_id)
+            if parsed is not None:
+                wanted.setdefault(format_cve_id(*parsed), parsed)
+        if not wanted:
+            return {}
+
+        ids = list(wanted)
+        years = np.array([wanted[i][0] for i in ids], dtype=np.int64)
+        numbers = np.array([wanted[i][1] for i in ids], dtype=np.int64)
+        pending = np.arange(len(ids))
+        found = {}
+        for part in reversed(self.parts):
+            if not pending.size:
+                break
+            at = part.find_many(years[pending], numbers[pending])
+            for j, i in zip(pending[at >= 0], at[at >= 0]):
+                found[ids[j]] = part.record(int(i))
+            pending = pending[at < 0]
+        return found
+
+    def update(self, paths: Iterable[str]) -> Dict[str, int]:
+        """
+        Apply NVD delta files, newer records only. Returns counts of added,
+        updated, stale (not newer than the index) and skipped (already
+        applied) records or files.
+        """
+        stats = {"files": 0, "skipped_files": 0, "added": 0, "updated": 0, "stale": 0}
+        records, scores, modified = {}, {}, {}
+        applied = dict(self.applied)
+        for path in paths:
+            digest = _file_digest(path)
+            if applied.get(os.path.basename(path)) == digest:
+                stats["skipped_files"] += 1
+                continue
+            applied[os.path.basename(path)] = digest
+            stats["files"] += 1
+
+            for record in read_nvd_file(path):
+                key, data, score = encode_record(record)
+                if key in modified:
+                    current_modified = modified[key]
+                else:
+                    current = self.get(record["id"])
+                    current_modified = (current.get("modified") or "") if current is not None else None
+                if current_modified is not None and current_modified >= (record.get("modified") or ""):
+                    stats["stale"] += 1
+                    continue
+                if key not in records:
+                    stats["updated" if current_modified is not None else "added"] += 1
+                records[key], scores[key], modified[key] = data, score, record.get("modified") or ""
+
+        parts = [self._write(records, scores)] if records else []
+        self._publish(*parts, applied=applied)
+        if self._needs_compaction():
+            self.compact()
+        return stats
+
+    def compact(self):
+        """Merge all parts into one, newest records winning."""
+        if len(self.parts) < 2:
+            return
+        newest = {}
+        for p, part in enumerate(self.parts):
+            for i, key in enumerate(part.keys.tolist()):
+                newest[key] = (p, i)
+        records = {key: self.parts[p].record_bytes(i) for key, (p, i) in newest.items()}
+        scores = {key: float(self.parts[p].entries[i]["score"]) for key, (p, i) in newest.items()}
+        self._publish(self._write(records, scores), replace=True, applied=self.applied)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "generation": self.generation,
+            "parts": [
+                {"name": os.path.basename(p.path), "entries": len(p), "bytes": os.path.getsize(p.path)}
+                for p in self.parts
+            ],
+            "applied": sorted(self.applied),
+        }
+
+    # -----------------------------------------------------
+    # Internal helpers
+    # -----------------------------------------------------
+    def _locate(self, cve_id: str) -> Tuple[IndexPart, int] | None:
+        parsed = parse_cve_id(cve_id)
+        if parsed is None:
+            return None
+        for part in reversed(self.parts):
+            i = part.find(*parsed)
+            if i is not None:
+                return part, i
+        return None
+
+    def _needs_compaction(self) -> bool:
+        deltas = self.parts[1:]
+        if not deltas:
+            return False
+        base = len(self.parts[0])
+        return len(deltas) > self.max_deltas or sum(len(p) for p in deltas) > self.max_delta_ratio * base
+
+    def _write(self, records: Dict[int, bytes], scores: Dict[int, float]) -> str:
+        name = f"part-{self.next_part:06d}.idx"
+        self.next_part += 1
+        write_part(os.path.join(self.directory, name), records, scores)
+        return name
+
+    def _publish(self, *names: str, replace: bool = False, applied: Dict[str, str]):
+        if replace:
+            self.close()
+            self.parts = []
+        self.parts.extend(IndexPart(os.path.join(self.directory, name)) for name in names)
+        self.applied = applied
+        self.generation += 1
+
+        path = os.path.join(self.directory, self.MANIFEST)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({
+                "generation": self.generation,
+                "next_part": self.next_part,
+                "parts": [os.path.basename(part.path) for part in self.parts],
+                "applied": self.applied,
+            }, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+        referenced = {os.path.basename(part.path) for part in self.parts}
+        for name in os.listdir(self.directory):
+            if name.startswith("part-") and name not in referenced:
+                os.remove(os.path.join(self.directory, name))
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# =========================================================
+# Enrichment
+# =========================================================
+
+class CVEEnricher:
+    """
+    Attach NVD data to the CVE ids found in articles' predicted entities.
+
+    Every entity text of `predicted_result` is scanned for CVE ids (so a
+    span such as "CVE-2024-3400 in PAN-OS" counts too). A batch of articles
+    is looked up at once, each distinct id once, and each article gets
+
+      item["cve_enrichment"] = {
+          "CVE-2024-3400": {"cvss": {"version": "3.1", "score": 10.0, ...},
+                            "cwe": ["CWE-77"], "products": ["paloaltonetworks:pan-os"],
+                            "published": "...", "status": "Analyzed"}
+      }
+
+    Ids missing from the index are left out (and counted).
+    """
+
+    FIELDS = ("cvss", "cwe", "products", "published", "modified", "status")
+
+    def __init__(self, index: CVEIndex, fields: Iterable[str] = FIELDS, max_products: int = 20):
+        self.index = index
+        self.fields = tuple(fields)
+        self.max_products = max_products
+        self.stats = {"articles": 0, "enriched_articles": 0, "mentions": 0, "found": 0, "unknown": 0}
+
+    def cve_ids(self, item: Dict[str, Any]) -> List[str]:
+        ids = []
+        for texts in (item.get("predicted_result") or {}).values():
+            for text in texts:
+                ids.extend(find_cve_ids(text))
+        return list(dict.fromkeys(ids))
+
+    def enrich(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        mentions = [self.cve_ids(item) for item in items]
+        records = self.index.get_many(cve_id for ids in mentions for cve_id in ids)
+
+        for item, ids in zip(items, mentions):
+            enrichment = {cve_id: self._summary(records[cve_id]) for cve_id in ids if cve_id in records}
+            self.stats["articles"] += 1
+            self.stats["mentions"] += len(ids)
+            self.stats["found"] += len(enrichment)
+            self.stats["unknown"] += len(ids) - len(enrichment)
+            if enrichment:
+                item["cve_enrichment"] = enrichment
+                self.stats["enriched_articles"] += 1
+        return items
+
+    def _summary(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        summary = {field: record.get(field) for field in self.fields}
+        if "products" in summary and summary["products"] is not None:
+            summary["products"] = summary["products"][:self.max_products]
+        return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline CVE index built from NVD JSON data.")
+    parser.add_argument("index", help="Index directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="Build the index from NVD files (replaces it)")
+    build_parser.add_argument("feeds", nargs="+", help="NVD .json/.json.gz files or directories of them")
+    update_parser = commands.add_parser("update", help="Apply NVD delta files")
+    update_parser.add_argument("feeds", nargs="+", help="NVD .json/.json.gz delta files")
+    get_parser = commands.add_parser("get", help="Print the records of CVE ids")
+    get_parser.add_argument("ids", nargs="+")
+    enrich_parser = commands.add_parser("enrich", help="Enrich classified articles")
+    enrich_parser.add_argument("articles", help="classified.jsonl or {timestamp}_combined.json")
+    enrich_parser.add_argument("--output", default="-", help="Enriched JSONL (default: stdout)")
+    commands.add_parser("compact", help="Merge delta parts into the base")
+    commands.add_parser("stats", help="Parts and sizes")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        with CVEIndex.build(args.index, args.feeds) as index:
+            print(f"{len(index)} CVEs indexed.", file=sys.stderr)
+        sys.exit(0)
+
+    with CVEIndex(args.index) as index:
+        if args.command == "update":
+            print(json.dumps(index.update(args.feeds)), file=sys.stderr)
+        elif args.command == "get":
+            records = index.get_many(args.ids)
+            for record in records.values():
+                sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+        elif args.command == "enrich":
+            with open(args.articles, encoding="utf-8") as f:
+                if args.articles.endswith(".json"):
+                    articles = json.load(f)
+                else:
+                    articles = [json.loads(line) for line in f if line.strip()]
+            enricher = CVEEnricher(index)
+            enricher.enrich(articles)
+            out = open(args.output, "w", encoding="utf-8") if args.output != "-" else sys.stdout
+            for article in articles:
+                out.write(json.dumps(article, ensure_ascii=False) + "\n")
+            if out is not sys.stdout:
+                out.close()
+            print(json.dumps(enricher.stats), file=sys.stderr)
+        elif args.command == "compact":
+            index.compact()
+            print(json.dumps(index.info()), file=sys.stderr)
+        else:
+            print(json.dumps(index.info(), indent=2))
@@ -0,0 +1,300 @@
+from typing import List, Dict, Any, Iterable, Tuple
+import json
+import os
+
+import numpy as np
+import scipy.sparse as sp
+
+EntityKey = Tuple[str, str]
+
+
+class EntityCooccurrenceMatrix:
+    """
+    Accumulate entity co-occurrence statistics over classified articles.
+
+    Every article is a row of a binary article x entity incidence matrix X,
+    where an entity is a (label, text) pair taken from `predicted_result`.
+    Co-occurrence counts are C = X^T X (the diagonal holds document
+    frequencies), so new days are folded in with one sparse product each
+    instead of a pairwise loop over the spans.
+
+    The entity set counted for each article id is kept: when an article
+    comes back (a new revision), its old row is subtracted before the new
+    one is added, so an edited article is counted once.
+
+    Input items (pipeline output):
+      [
+        {"id": 1, "predicted_result": {"ORG": ["ACME Corp"], "CVE": ["CVE-2024-1234"]}},
+        ...
+      ]
+
+    Exported neighbours:
+      {
+        "ORG|ACME Corp": [{"label": "CVE", "text": "CVE-2024-1234", "count": 3, "pmi": 1.2}]
+      }
+    """
+
+    def __init__(self, labels: Iterable[str] | None = None):
+        self.labels = set(labels) if labels else None
+        self.entities: List[EntityKey] = []
+        self.entity_index: Dict[EntityKey, int] = {}
+        self.counts = sp.csr_matrix((0, 0), dtype=np.int64)
+        self.n_docs = 0
+        # Article id -> sorted entity columns of its counted row
+        self.articles: Dict[Any, np.ndarray] = {}
+
+    # -----------------------------------------------------
+    # Public API
+    # -----------------------------------------------------
+    def add_items(self, items: List[Dict[str, Any]]) -> int:
+        """
+        Fold a batch of classified articles into the running counts.
+
+        Args:
+            items: Pipeline items carrying a `predicted_result` column dict
+
+        Returns:
+            Number of articles that contributed at least one entity
+        """
+        # The last revision in the batch wins
+        rows: Dict[Any, np.ndarray] = {}
+        anonymous: List[np.ndarray] = []
+        for item in items:
+            cols = self._columns(item)
+            if item.get("id") is None:
+                anonymous.append(cols)
+            else:
+                rows[item["id"]] = cols
+
+        old, new = [], list(anonymous)
+        for article_id, cols in rows.items():
+            previous = self.articles.pop(article_id, None)
+            if previous is not None and np.array_equal(previous, cols):
+                self.articles[article_id] = previous
+                continue
+            if previous is not None:
+                old.append(previous)
+            if len(cols):
+                self.articles[article_id] = cols
+                new.append(cols)
+
+        n_entities = len(self.entities)
+        if self.counts.shape[0] < n_entities:
+            self.counts.resize((n_entities, n_entities))
+
+        if old:
+            removed = self._incidence(old)
+            self.counts = (self.counts - (removed.T @ removed)).tocsr()
+            self.counts.eliminate_zeros()
+            self.n_docs -= removed.shape[0]
+
+        incidence = self._incidence(new)
+        if incidence.nnz == 0:
+            return 0
+        self.counts = (self.counts + (incidence.T @ incidence)).tocsr()
+        self.n_docs += incidence.shape[0]
+        return incidence.shape[0]
+
+    def add_output_file(self, path: str) -> int:
+        """Fold a day's `_combined.json` output into the running counts."""
+        with open(path, encoding="utf-8") as f:
+            return self.add_items(json.load(f))
+
+    def build_incidence(self, items: List[Dict[str, Any]]) -> sp.csr_matrix:
+        """
+        Build the binary article x entity matrix for a batch.
+
+        Articles without entities are dropped, so the row count is the
+        number of articles that can co-occur with anything.
+        """
+        return self._incidence([self._columns(item) for item in items])
+
+    def document_frequency(self) -> np.ndarray:
+        """Number of articles each entity appears in."""
+        return self.counts.diagonal()
+
+    def pmi(self) -> sp.csr_matrix:
+        """
+        Pointwise mutual information over the observed co-occurrences.
+
+            pmi(i, j) = log(c_ij * N / (c_i * c_j))
+
+        Only non-zero, off-diagonal pairs are materialized.
+        """
+        pairs = self._off_diagonal()
+        return sp.csr_matrix(
+            (self._pmi_data(pairs), pairs.indices, pairs.indptr),
+            shape=pairs.shape,
+        )
+
+    def top_neighbours(
+        self,
+        n: int = 10,
+        *,
+        by: str = "count",
+        min_count: int = 1,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Return the top-N co-occurring entities for every entity.
+
+        Args:
+            n: Number of neighbours per entity
+            by: Ranking score, either "count" or "pmi"
+            min_count: Ignore pairs seen in fewer articles than this
+
+        Returns:
+            Dict keyed by "LABEL|text" with ranked neighbour records
+        """
+        if by not in ("count", "pmi"):
+            raise ValueError(f"Unknown ranking '{by}', expected 'count' or 'pmi'")
+
+        counts = self._off_diagonal()
+        pmi = self._pmi_data(counts)
+
+        out = {}
+        for i, (label, text) in enumerate(self.entities):
+            start, end = counts.indptr[i], counts.indptr[i + 1]
+            cols = counts.indices[start:end]
+            row_counts = counts.data[start:end]
+            row_pmi = pmi[start:end]
+
+            keep = row_counts >= min_count
+            cols, row_counts, row_pmi = cols[keep], row_counts[keep], row_pmi[keep]
+            if len(cols) == 0:
+                continue
+
+            score = row_counts if by == "count" else row_pmi
+            order = np.lexsort((-row_counts, -score))[:n]
+
+            out[f"{label}|{text}"] = [
+                {
+                    "label": self.entities[cols[k]][0],
+                    "text": self.entities[cols[k]][1],
+                    "count": int(row_counts[k]),
+                    "pmi": round(float(row_pmi[k]), 4),
+                }
+                for k in order
+            ]
+
+        return out
+
+    def export_top_neighbours(
+        self,
+        output_file: str,
+        n: int = 10,
+        *,
+        by: str = "count",
+        min_count: int = 1,
+    ) -> str:
+        """Write `top_neighbours()` as a JSON file and return its path."""
+        os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(
+                self.top_neighbours(n, by=by, min_count=min_count),
+                f,
+                ensure_ascii=False,
+                indent=4,
+            )
+        return output_file
+
+    # -----------------------------------------------------
+    # Persistence
+    # -----------------------------------------------------
+    def save(self, directory: str) -> str:
+        """Persist counts and entity vocabulary so later runs can continue."""
+        os.makedirs(directory, exist_ok=True)
+        sp.save_npz(os.path.join(directory, "counts.npz"), self.counts)
+
+        with open(os.path.join(directory, "entities.json"), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "n_docs": self.n_docs,
+                    "labels": sorted(self.labels) if self.labels else None,
+                    "entities": [list(e) for e in self.entities],
+                    "articles": list(self.articles),
+                },
+                f,
+                ensure_ascii=False,
+            )
+        sp.save_npz(os.path.join(directory, "articles.npz"), self._incidence(list(self.articles.values())))
+        return directory
+
+    @classmethod
+    def load(cls, directory: str) -> "EntityCooccurrenceMatrix":
+        """Load a matrix saved with `save()`, or start empty if none exists."""
+        meta_path = os.path.join(directory, "entities.json")
+        if not os.path.exists(meta_path):
+            return cls()
+
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+
+        matrix = cls(labels=meta.get("labels"))
+        matrix.n_docs = meta["n_docs"]
+        matrix.entities = [tuple(e) for e in meta["entities"]]
+        matrix.entity_index = {e: i for i, e in enumerate(matrix.entities)}
+        matrix.counts = sp.load_npz(os.path.join(directory, "counts.npz")).tocsr()
+
+        # Saved before per-article rows were kept: earlier articles cannot be replaced
+        articles_path = os.path.join(directory, "articles.npz")
+        if meta.get("articles") is not None and os.path.exists(articles_path):
+            rows = sp.load_npz(articles_path).tocsr()
+            matrix.articles = {
+                article_id: rows.indices[rows.indptr[i]:rows.indptr[i + 1]].astype(np.int64)
+                for i, article_id in enumerate(meta["articles"])
+            }
+        return matrix
+
+    # -----------------------------------------------------
+    # Internal helpers
+    # -----------------------------------------------------
+    def _off_diagonal(self) -> sp.csr_matrix:
+        counts = self.counts.tocoo()
+        keep = counts.row != counts.col
+        return sp.csr_matrix(
+            (counts.data[keep], (counts.row[keep], counts.col[keep])),
+            shape=counts.shape,
+        )
+
+    def _columns(self, item: Dict[str, Any]) -> np.ndarray:
+        """Sorted entity columns of an item's `predicted_result`."""
+        cols = set()
+        for label, texts in (item.get("predicted_result") or {}).items():
+            if self.labels is not None and label not in self.labels:
+                continue
+            for text in texts:
+                key = self._key(label, text)
+                if key is not None:
+                    cols.add(self._intern(key))
+        return np.asarray(sorted(cols), dtype=np.int64)
+
+    def _incidence(self, rows: List[np.ndarray]) -> sp.csr_matrix:
+        """Binary incidence matrix of the non-empty column rows."""
+        rows = [cols for cols in rows if len(cols)]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(cols) for cols in rows])
+        indices = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+        return sp.csr_matrix(
+            (np.ones(len(indices), dtype=np.int64), indices, indptr),
+            shape=(len(rows), len(self.entities)),
+        )
+
+    def _pmi_data(self, pairs: sp.csr_matrix) -> np.ndarray:
+        df = self.document_frequency().astype(np.float64)
+        rows = np.repeat(np.arange(pairs.shape[0]), np.diff(pairs.indptr))
+        return np.log(
+            pairs.data.astype(np.float64) * self.n_docs / (df[rows] * df[pairs.indices])
+        )
+
+    @staticmethod
+    def _key(label: str, text: str) -> EntityKey | None:
+        text = " ".join(text.split()) if isinstance(text, str) else ""
+        return (label, text) if label and text else None
+
+    def _intern(self, key: EntityKey) -> int:
+        idx = self.entity_index.get(key)
+        if idx is None:
+            idx = len(self.entities)
+            self.entity_index[key] = idx
+            self.entities.append(key)
+        return idx
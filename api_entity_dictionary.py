@@ -0,0 +1,257 @@
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
+import argparse
+import json
+import os
+import sys
+import tracemalloc
+import unicodedata
+
+from api_output_writer import COMPRESSORS, iter_records, read_manifest
+
+EntityKey = Tuple[str, str]
+
+
+class EntityDictionary:
+    """
+    Corpus-level dictionary mapping (label, normalized text) to integer ids.
+
+    Ids are assigned in first-seen order and never change, so stored outputs
+    can reference entities by id across runs. The dictionary is persisted as
+    an append-only JSON Lines file:
+
+      [0, "ORG", "acme corp", "ACME Corp"]
+      [1, "CVE", "cve-2024-1234", "CVE-2024-1234"]
+
+    Each line is [id, label, normalized text, first-seen surface text].
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self.keys: List[EntityKey] = []
+        self.surface: List[str] = []
+        self.index: Dict[EntityKey, int] = {}
+        self._saved = 0
+
+        if path and os.path.exists(path):
+            self._load(path)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    # -----------------------------------------------------
+    # Public API
+    # -----------------------------------------------------
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Unicode-fold, casefold and collapse whitespace."""
+        return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+    def get_id(self, label: str, text: str) -> int:
+        """Return the id for an entity, assigning a new one if unseen."""
+        key = (sys.intern(label), self.normalize(text))
+        idx = self.index.get(key)
+        if idx is None:
+            idx = len(self.keys)
+            key = (key[0], sys.intern(key[1]))
+            self.index[key] = idx
+            self.keys.append(key)
+            self.surface.append(sys.intern(text))
+        return idx
+
+    def lookup(self, label: str, text: str) -> int | None:
+        """Return the id for an entity without assigning one."""
+        return self.index.get((label, self.normalize(text)))
+
+    def label(self, entity_id: int) -> str:
+        return self.keys[entity_id][0]
+
+    def text(self, entity_id: int) -> str:
+        """First-seen surface form of the entity."""
+        return self.surface[entity_id]
+
+    def encode_spans(self, pred_spans: List[Dict[str, Any]]) -> List[List[int]]:
+        """
+        Encode predicted spans as compact [start, end, entity_id] triples.
+
+        Input:
+            [{"start": 0, "end": 9, "label": "ORG", "text": "ACME Corp"}]
+        Output:
+            [[0, 9, 0]]
+        """
+        return [
+            [sp["start"], sp["end"], self.get_id(sp["label"], sp["text"])]
+            for sp in pred_spans
+            if sp.get("label") and sp.get("text")
+        ]
+
+    def decode_spans(self, encoded: List[List[int]]) -> List[Dict[str, Any]]:
+        """Inverse of `encode_spans()`, using the first-seen surface text."""
+        return [
+            {"start": s, "end": e, "label": self.label(i), "text": self.text(i)}
+            for s, e, i in encoded
+        ]
+
+    def encode_column_dict(self, columns: Dict[str, List[str]]) -> Dict[str, List[int]]:
+        """
+        Encode a `to_column_dict()` result as entity ids.
+
+        Input:
+            {"ORG": ["ACME Corp", "Globex"]}
+        Output:
+            {"ORG": [0, 7]}
+        """
+        return {
+            label: [self.get_id(label, text) for text in texts]
+            for label, texts in columns.items()
+        }
+
+    def decode_column_dict(self, columns: Dict[str, List[int]]) -> Dict[str, List[str]]:
+        """Inverse of `encode_column_dict()`."""
+        return {
+            label: [self.text(i) for i in ids]
+            for label, ids in columns.items()
+        }
+
+    def encode_items(
+        self,
+        items: List[Dict[str, Any]],
+        *,
+        field: str = "predicted_result",
+    ) -> List[Dict[str, Any]]:
+        """Return copies of pipeline items with `field` replaced by entity ids."""
+        out = []
+        for item in items:
+            encoded = dict(item)
+            if field in encoded:
+                encoded[field] = self.encode_column_dict(encoded[field])
+            out.append(encoded)
+        return out
+
+    def decode_items(
+        self,
+        items: Iterable[Dict[str, Any]],
+        *,
+        field: str = "predicted_result",
+    ) -> Iterator[Dict[str, Any]]:
+        """Inverse of `encode_items()`, one item at a time."""
+        for item in items:
+            if field in item:
+                item = dict(item, **{field: self.decode_column_dict(item[field])})
+            yield item
+
+    # -----------------------------------------------------
+    # Persistence
+    # -----------------------------------------------------
+    def save(self, path: str | None = None) -> str:
+        """
+        Append entities assigned since the last save.
+
+        Saving to a different path than the one loaded from writes the
+        whole dictionary.
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path given for EntityDictionary.save()")
+
+        start = self._saved if path == self.path else 0
+        mode = "a" if start else "w"
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, mode, encoding="utf-8") as f:
+            for idx in range(start, len(self.keys)):
+                f.write(self._dump_line(idx))
+                f.write("\n")
+
+        if path == self.path:
+            self._saved = len(self.keys)
+        return path
+
+    # -----------------------------------------------------
+    # Internal helpers
+    # -----------------------------------------------------
+    def _dump_line(self, idx: int) -> str:
+        label, norm = self.keys[idx]
+        return json.dumps([idx, label, norm, self.surface[idx]], ensure_ascii=False)
+
+    def _load(self, path: str):
+        with open(path, encoding="utf-8") as f:
+            self._load_lines(f)
+        self._saved = len(self.keys)
+
+    def _load_lines(self, lines) -> "EntityDictionary":
+        for line in lines:
+            if not line.strip():
+                continue
+            idx, label, norm, text = json.loads(line)
+            if idx != len(self.keys):
+                raise ValueError(f"Corrupt entity dictionary: id {idx} out of order")
+            key = (sys.intern(label), sys.intern(norm))
+            self.index[key] = idx
+            self.keys.append(key)
+            self.surface.append(sys.intern(text))
+        return self
+
+
+# =========================================================
+# Size comparison against string entities
+# =========================================================
+
+def _measure(load) -> Tuple[Any, int]:
+    tracemalloc.start()
+    obj = load()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current
+
+
+def compare_sizes(manifest_path: str, dictionary_path: str | None = None) -> Dict[str, int]:
+    """
+    Compare a sharded output, whose `predicted_result` columns are entity
+    ids, with the same records holding the entity strings.
+
+    Returns disk bytes of the shards as written and of the string form
+    (raw, and compressed like the shards), the size of the dictionary file
+    the ids refer to, and the traced heap size of the decoded columns, with
+    the dictionary's own cost counted on the id side. The dictionary is the
+    one named in the manifest unless `dictionary_path` is given.
+    """
+    manifest = read_manifest(manifest_path)
+    dictionary_path = dictionary_path or manifest["entity_dictionary"]
+    dictionary = EntityDictionary(dictionary_path)
+
+    encoded = list(iter_records(manifest_path))
+    decoded = list(dictionary.decode_items(encoded))
+    string_lines = b"".join(json.dumps(item, ensure_ascii=False).encode("utf-8") + b"\n" for item in decoded)
+    _, compress = COMPRESSORS[manifest["compression"]]
+
+    id_columns_json = json.dumps([item.get("predicted_result", {}) for item in encoded], ensure_ascii=False)
+    string_columns_json = json.dumps([item.get("predicted_result", {}) for item in decoded], ensure_ascii=False)
+    with open(dictionary_path, encoding="utf-8") as f:
+        dictionary_lines = f.read().splitlines()
+
+    _, strings_mem = _measure(lambda: json.loads(string_columns_json))
+    _, ids_mem = _measure(lambda: (json.loads(id_columns_json), EntityDictionary()._load_lines(dictionary_lines)))
+
+    return {
+        "articles": len(encoded),
+        "entities": len(dictionary),
+        "shard_bytes": sum(shard["bytes"] for shard in manifest["shards"]),
+        "shard_raw_bytes": sum(shard["raw_bytes"] for shard in manifest["shards"]),
+        "string_bytes": len(compress(string_lines)) if compress else len(string_lines),
+        "string_raw_bytes": len(string_lines),
+        "dictionary_bytes": os.path.getsize(dictionary_path),
+        "entity_column_memory": strings_mem,
+        "entity_id_memory": ids_mem,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare entity storage as dictionary ids vs strings for a sharded output."
+    )
+    parser.add_argument("manifest", help="Path to a {timestamp}_manifest.json output")
+    parser.add_argument("--dictionary", help="Entity dictionary (default: the one named in the manifest)")
+    args = parser.parse_args()
+
+    for name, value in compare_sizes(args.manifest, args.dictionary).items():
+        print(f"{name:>24}: {value}")
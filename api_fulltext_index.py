@@ -0,0 +1,901 @@
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
+from collections import defaultdict
+from datetime import date, datetime
+import argparse
+import heapq
+import itertools
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import unicodedata
+from bisect import bisect_left
+
+import numpy as np
+
+from api_article_store import body_hash
+from api_entity_dictionary import EntityDictionary
+from api_output_writer import iter_records, read_manifest
+from api_recency_cutoff import parse_listing_date
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+_QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+# Extra terms indexed next to the words; ":" never occurs inside a word token
+TITLE_PREFIX = "t:"     # t:<token>         a word of the title
+LABEL_PREFIX = "l:"     # l:<label>         an entity label
+ENTITY_PREFIX = "e:"    # e:<label>:<text>  a predicted entity (normalized text)
+
+# term count, terms blob length
+TERMS_HEADER = struct.Struct("<QQ")
+# per term, as varints: document frequency, doc stream bytes, position stream bytes
+TERM_FIELDS = 3
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_BOOST = 2.0
+
+
+def tokenize(text: str) -> List[str]:
+    """Unicode-folded, casefolded word tokens."""
+    return _TOKEN_RE.findall(unicodedata.normalize("NFKC", text).casefold())
+
+
+def entity_term(label: str, text: str) -> str:
+    return f"{ENTITY_PREFIX}{label}:{EntityDictionary.normalize(text)}"
+
+
+def date_ordinal(value: Any) -> int:
+    """Proleptic ordinal of an article date ("June 10, 2025", ISO, date), 0 if unknown."""
+    if isinstance(value, datetime):
+        return value.toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    if not value:
+        return 0
+
+    parsed = parse_listing_date(str(value))
+    if parsed is None:
+        try:
+            parsed = datetime.fromisoformat(str(value).strip()[:10])
+        except ValueError:
+            return 0
+    return parsed.toordinal()
+
+
+# =========================================================
+# Postings encoding
+# =========================================================
+
+def varint_sizes(values: np.ndarray) -> np.ndarray:
+    """Bytes taken by each value as a varint."""
+    sizes = np.ones(values.size, dtype=np.int64)
+    rest = values.astype(np.uint64) >> np.uint64(7)
+    while rest.any():
+        sizes += rest > 0
+        rest >>= np.uint64(7)
+    return sizes
+
+
+def encode_varints(values: Iterable[int], sizes: np.ndarray | None = None) -> bytes:
+    """LEB128 varints: 7 bits per byte, low bits first, high bit set on all but the last byte."""
+    values = np.asarray(values, dtype=np.uint64)
+    if not values.size:
+        return b""
+    if sizes is None:
+        sizes = varint_sizes(values)
+
+    out = np.empty(int(sizes.sum()), dtype=np.uint8)
+    starts = np.cumsum(sizes) - sizes
+    for k in range(int(sizes.max())):
+        mask = sizes > k
+        low = (values[mask] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = (sizes[mask] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[mask] + k] = low | more
+    return out.tobytes()
+
+
+def decode_varints(data: bytes) -> np.ndarray:
+    buf = np.frombuffer(data, dtype=np.uint8)
+    if not buf.size:
+        return np.zeros(0, dtype=np.int64)
+
+    ends = np.flatnonzero(buf < 0x80)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    lengths = ends - starts + 1
+
+    values = np.zeros(ends.size, dtype=np.uint64)
+    for k in range(int(lengths.max())):
+        mask = lengths > k
+        values[mask] |= (buf[starts[mask] + k] & 0x7F).astype(np.uint64) << np.uint64(7 * k)
+    return values.astype(np.int64)
+
+
+def delta_runs(values: np.ndarray, runs: np.ndarray) -> np.ndarray:
+    """Deltas of `values` restarting at each of the consecutive runs of `runs` lengths."""
+    deltas = np.diff(values, prepend=0)
+    firsts = np.cumsum(runs) - runs
+    deltas[firsts] = values[firsts]
+    return deltas
+
+
+def cumsum_runs(deltas: np.ndarray, runs: np.ndarray) -> np.ndarray:
+    """Inverse of `delta_runs`."""
+    if not deltas.size:
+        return deltas
+    total = np.cumsum(deltas)
+    firsts = np.cumsum(runs) - runs
+    return total - np.repeat(total[firsts] - deltas[firsts], runs)
+
+
+def encode_postings(
+    dfs: np.ndarray, docs: np.ndarray, tfs: np.ndarray, positions: np.ndarray
+) -> Tuple[bytes, bytes, np.ndarray, np.ndarray]:
+    """
+    Encode the postings of consecutive terms (`dfs` documents each) at once.
+
+    The doc stream of a term holds (doc number delta, term frequency) varint
+    pairs, its position stream the positions of each document, delta-coded
+    within the document. Returns both streams of all terms concatenated, and
+    the bytes of each term in them.
+    """
+    if not dfs.size:
+        return b"", b"", dfs, dfs
+    pairs = np.column_stack([delta_runs(docs, dfs), tfs]).ravel()
+    pair_sizes = varint_sizes(pairs)
+    pos_deltas = delta_runs(positions, tfs)
+    pos_sizes = varint_sizes(pos_deltas)
+
+    term_firsts = np.cumsum(dfs) - dfs
+    doc_bytes = np.add.reduceat(pair_sizes.reshape(-1, 2).sum(axis=1), term_firsts)
+    pos_bytes = np.add.reduceat(np.add.reduceat(pos_sizes, np.cumsum(tfs) - tfs), term_firsts)
+    return encode_varints(pairs, pair_sizes), encode_varints(pos_deltas, pos_sizes), doc_bytes, pos_bytes
+
+
+def decode_docs(doc_stream: bytes, dfs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Doc numbers and term frequencies of the consecutive terms of a doc stream."""
+    pairs = decode_varints(doc_stream)
+    return cumsum_runs(pairs[0::2], dfs), pairs[1::2]
+
+
+def decode_positions(pos_stream: bytes, tfs: np.ndarray) -> np.ndarray:
+    return cumsum_runs(decode_varints(pos_stream), tfs)
+
+
+# =========================================================
+# Segments
+# =========================================================
+
+def document_terms(item: Dict[str, Any]) -> Tuple[Dict[str, List[int]], int]:
+    """Positions of every term of an article, and its length in words."""
+    terms = defaultdict(list)
+    title = tokenize(item.get("title") or "")
+    body = tokenize(item.get("body") or "")
+
+    for position, token in enumerate(title):
+        terms[token].append(position)
+        terms[TITLE_PREFIX + token].append(position)
+    # One position of gap so that phrases do not run from the title into the body
+    for position, token in enumerate(body, len(title) + 1):
+        terms[token].append(position)
+
+    for label, texts in (item.get("predicted_result") or {}).items():
+        terms[LABEL_PREFIX + label] = [0]
+        for text in texts:
+            terms[entity_term(label, text)] = [0]
+
+    return terms, len(title) + len(body)
+
+
+def stored_fields(item: Dict[str, Any]) -> Dict[str, Any]:
+    """What a hit returns; the body is not stored."""
+    return {
+        "id": item.get("id"),
+        "title": item.get("title"),
+        "url": item.get("url"),
+        "source": item.get("source"),
+        "date": item.get("date"),
+        "predicted_result": item.get("predicted_result") or {},
+    }
+
+
+def write_segment(
+    directory: str,
+    name: str,
+    terms: List[str],
+    postings: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+    docs: Dict[str, list],
+    stored: Iterable[bytes],
+):
+    """
+    Write a segment from its sorted terms, their postings as flat arrays
+    (documents per term, then doc numbers and term frequencies per posting,
+    then positions), its per-document columns and its stored fields as
+    JSON lines.
+    """
+    base = os.path.join(directory, name)
+    dfs = postings[0]
+    doc_stream, pos_stream, doc_bytes, pos_bytes = encode_postings(*postings)
+
+    with open(base + ".post", "wb") as f:
+        f.write(doc_stream)
+        f.write(pos_stream)
+
+    blob = "\n".join(terms).encode("utf-8")
+    with open(base + ".terms", "wb") as f:
+        f.write(TERMS_HEADER.pack(len(terms), len(blob)))
+        f.write(blob)
+        f.write(encode_varints(np.column_stack([dfs, doc_bytes, pos_bytes]).ravel()))
+
+    offsets = [0]
+    with open(base + ".docs.jsonl", "wb") as f:
+        for line in stored:
+            f.write(line)
+            offsets.append(offsets[-1] + len(line))
+
+    with open(base + ".meta.json", "w", encoding="utf-8") as f:
+        json.dump(dict(docs, stored=offsets), f)
+
+
+class Segment:
+    """
+    An immutable, memory-mapped part of the index.
+
+    Files, `{name}` being seg-NNNNNN:
+      {name}.terms       sorted terms and, per term, its document frequency
+                         and the bytes of its two postings streams
+      {name}.post        the doc streams of all terms, then their position
+                         streams (see `encode_postings`)
+      {name}.meta.json   per-document ids, revisions, sources, dates, lengths
+      {name}.docs.jsonl  stored fields of the hits
+
+    Deleted documents (replaced by a later revision) are only masked, in
+    `live`, until the segment is merged.
+    """
+
+    def __init__(self, directory: str, name: str, deleted: Iterable[int] = ()):
+        self.name = name
+        self.base = os.path.join(directory, name)
+
+        with open(self.base + ".meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.ids: List[str] = meta["ids"]
+        self.revisions: List[str] = meta["revisions"]
+        self.sources: List[str | None] = meta["sources"]
+        self.source = np.asarray(meta["source"], dtype=np.int32)
+        self.dates = np.asarray(meta["dates"], dtype=np.int64)
+        self.lengths = np.asarray(meta["lengths"], dtype=np.float64)
+        self.stored_offsets: List[int] = meta["stored"]
+
+        self.live = np.ones(len(self.ids), dtype=bool)
+        self.live[list(deleted)] = False
+
+        with open(self.base + ".terms", "rb") as f:
+            data = f.read()
+        n_terms, blob_length = TERMS_HEADER.unpack_from(data)
+        blob = data[TERMS_HEADER.size:TERMS_HEADER.size + blob_length]
+        self.terms: List[str] = blob.decode("utf-8").split("\n") if n_terms else []
+        table = decode_varints(data[TERMS_HEADER.size + blob_length:]).reshape(-1, TERM_FIELDS)
+        self.dfs, self.doc_bytes, self.pos_bytes = table.T
+        self.doc_offsets = np.cumsum(self.doc_bytes) - self.doc_bytes
+        self.pos_offsets = int(self.doc_bytes.sum()) + np.cumsum(self.pos_bytes) - self.pos_bytes
+
+        self._post_file = open(self.base + ".post", "rb")
+        size = os.fstat(self._post_file.fileno()).st_size
+        self._post = mmap.mmap(self._post_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self._docs_file = open(self.base + ".docs.jsonl", "rb")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def live_docs(self) -> int:
+        return int(self.live.sum())
+
+    @property
+    def deleted_ratio(self) -> float:
+        return 1 - self.live_docs / len(self) if len(self) else 0.0
+
+    def close(self):
+        if isinstance(self._post, mmap.mmap):
+            self._post.close()
+        self._post_file.close()
+        self._docs_file.close()
+
+    def delete(self, doc: int):
+        self.live[doc] = False
+
+    def files(self) -> List[str]:
+        return [self.base + ext for ext in (".terms", ".post", ".meta.json", ".docs.jsonl")]
+
+    # -----------------------------------------------------
+    # Postings
+    # -----------------------------------------------------
+    def term_index(self, term: str) -> int | None:
+        i = bisect_left(self.terms, term)
+        return i if i < len(self.terms) and self.terms[i] == term else None
+
+    def doc_postings(self, term: str) -> Tuple[np.ndarray, np.ndarray] | None:
+        """Doc numbers and term frequencies of a term, deleted documents included."""
+        i = self.term_index(term)
+        if i is None:
+            return None
+        return decode_docs(self._doc_stream(i, i + 1), self.dfs[i:i + 1])
+
+    def postings_at(self, i: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        docs, tfs = decode_docs(self._doc_stream(i, i + 1), self.dfs[i:i + 1])
+        return docs, tfs, decode_positions(self._pos_stream(i, i + 1), tfs)
+
+    def all_postings(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Postings of every term, as passed to `write_segment`."""
+        n = len(self.terms)
+        docs, tfs = decode_docs(self._doc_stream(0, n), self.dfs)
+        return self.dfs, docs, tfs, decode_positions(self._pos_stream(0, n), tfs)
+
+    def phrase_docs(self, tokens: List[str], candidates: np.ndarray) -> np.ndarray:
+        """The candidates (which contain every token) where the tokens occur in a row."""
+        # Occurrences as doc << 32 | position, shifted back by the token's
+        # offset in the phrase: those left after intersecting are phrase starts
+        starts = None
+        for offset, token in enumerate(tokens):
+            if not candidates.size:
+                break
+            docs, tfs, positions = self.postings_at(self.term_index(token))
+            keep = np.isin(docs, candidates, assume_unique=True)
+            keys = (np.repeat(docs[keep], tfs[keep]) << 32) + positions[np.repeat(keep, tfs)] - offset
+            starts = keys if starts is None else np.intersect1d(starts, keys, assume_unique=True)
+            candidates = np.unique(starts >> 32)
+        return candidates
+
+    def _doc_stream(self, first: int, end: int) -> bytes:
+        start = int(self.doc_offsets[first]) if first < len(self.terms) else 0
+        return self._post[start:start + int(self.doc_bytes[first:end].sum())]
+
+    def _pos_stream(self, first: int, end: int) -> bytes:
+        start = int(self.pos_offsets[first]) if first < len(self.terms) else 0
+        return self._post[start:start + int(self.pos_bytes[first:end].sum())]
+
+    # -----------------------------------------------------
+    # Stored fields
+    # -----------------------------------------------------
+    def stored_line(self, doc: int) -> bytes:
+        start, end = self.stored_offsets[doc], self.stored_offsets[doc + 1]
+        self._docs_file.seek(start)
+        return self._docs_file.read(end - start)
+
+    def stored(self, doc: int) -> Dict[str, Any]:
+        return json.loads(self.stored_line(doc))
+
+
+class _SegmentBuffer:
+    """Documents added since the last commit, inverted in memory."""
+
+    def __init__(self):
+        self.postings: Dict[str, Tuple[List[int], List[List[int]]]] = {}
+        self.ids: List[str] = []
+        self.revisions: List[str] = []
+        self.sources: List[str | None] = []
+        self.dates: List[int] = []
+        self.lengths: List[int] = []
+        self.stored: List[bytes] = []
+        self.deleted: set = set()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, item: Dict[str, Any], revision: str) -> int:
+        doc = len(self.ids)
+        terms, length = document_terms(item)
+        for term, positions in terms.items():
+            entry = self.postings.get(term)
+            if entry is None:
+                self.postings[term] = ([doc], [positions])
+            else:
+                entry[0].append(doc)
+                entry[1].append(positions)
+
+        self.ids.append(item["id"])
+        self.revisions.append(revision)
+        self.sources.append(item.get("source"))
+        self.dates.append(date_ordinal(item.get("date")))
+        self.lengths.append(length)
+        self.stored.append(json.dumps(stored_fields(item), ensure_ascii=False).encode("utf-8") + b"\n")
+        return doc
+
+    def write(self, directory: str, name: str):
+        vocabulary = sorted({s for s in self.sources if s is not None})
+        source_ids = {s: i for i, s in enumerate(vocabulary)}
+        terms = sorted(self.postings)
+        write_segment(
+            directory,
+            name,
+            terms,
+            self._flat_postings(terms),
+            {
+                "ids": self.ids,
+                "revisions": self.revisions,
+                "sources": vocabulary + [None],
+                "source": [source_ids.get(s, len(vocabulary)) for s in self.sources],
+                "dates": self.dates,
+                "lengths": self.lengths,
+            },
+            self.stored,
+        )
+
+    def _flat_postings(self, terms: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        dfs, docs, tfs, positions = [], [], [], []
+        for term in terms:
+            term_docs, term_positions = self.postings[term]
+            dfs.append(len(term_docs))
+            docs.extend(term_docs)
+            tfs.extend(map(len, term_positions))
+            positions.extend(itertools.chain.from_iterable(term_positions))
+        return tuple(np.asarray(column, dtype=np.int64) for column in (dfs, docs, tfs, positions))
+
+
+# =========================================================
+# Index
+# =========================================================
+
+class FullTextIndex:
+    """
+    On-disk full-text index of classified articles, built incrementally.
+
+    Articles are added to an in-memory buffer and written as a new
+    immutable segment by `commit()`. An article is keyed by its `id`: adding
+    the same revision again is a no-op, a new revision replaces the old one
+    (which is masked as deleted in its segment).
+
+    Segments are merged with a logarithmic policy: a segment's level is
+    floor(log10(live documents)), and as soon as `merge_factor` segments
+    share a level they are merged into one of the next level. A segment
+    with more than `max_deleted_ratio` of its documents deleted is rewritten
+    on its own. So a daily commit costs one small segment, and the number
+    of segments stays logarithmic in the size of the index.
+
+    Layout:
+      {directory}/segments.json   the committed segments and their deleted
+                                  documents, replaced atomically by commit()
+      {directory}/seg-NNNNNN.*    segment files (see `Segment`)
+
+    Search (see `search()`) is over committed segments only. There must be a
+    single writer per directory; searchers re-open the index to see newer
+    commits.
+    """
+
+    MANIFEST = "segments.json"
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        merge_factor: int = 10,
+        max_deleted_ratio: float = 0.3,
+        max_buffer_docs: int = 10000,
+    ):
+        if merge_factor < 2:
+            raise ValueError(f"merge_factor ({merge_factor}) must be at least 2")
+
+        self.directory = directory
+        self.merge_factor = merge_factor
+        self.max_deleted_ratio = max_deleted_ratio
+        self.max_buffer_docs = max_buffer_docs
+        os.makedirs(directory, exist_ok=True)
+
+        manifest = {"generation": 0, "next_segment": 0, "segments": []}
+        manifest_path = os.path.join(directory, self.MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        self.generation: int = manifest["generation"]
+        self.next_segment: int = manifest["next_segment"]
+        self.segments: List[Segment] = [
+            Segment(directory, entry["name"], entry["deleted"]) for entry in manifest["segments"]
+        ]
+
+        self.buffer = _SegmentBuffer()
+        self.stats = {"added": 0, "updated": 0, "unchanged": 0, "segments_written": 0, "merges": 0}
+
+        # id -> (segment, doc, revision); segment None for buffered documents
+        self._locations: Dict[str, Tuple[Segment | None, int, str]] = {}
+        for segment in self.segments:
+            for doc in np.flatnonzero(segment.live):
+                self._locations[segment.ids[doc]] = (segment, int(doc), segment.revisions[doc])
+
+    def __enter__(self) -> "FullTextIndex":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return sum(segment.live_docs for segment in self.segments)
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+
+    # -----------------------------------------------------
+    # Public API: indexing
+    # -----------------------------------------------------
+    def add(self, item: Dict[str, Any]) -> bool:
+        """Buffer an article; False if this revision is already indexed."""
+        revision = item.get("revision") or body_hash(item.get("body", ""))
+        location = self._locations.get(item["id"])
+        if location is not None:
+            segment, doc, indexed_revision = location
+            if indexed_revision == revision:
+                self.stats["unchanged"] += 1
+                return False
+            if segment is None:
+                self.buffer.deleted.add(doc)
+            else:
+                segment.delete(doc)
+            self.stats["updated"] += 1
+        else:
+            self.stats["added"] += 1
+
+        doc = self.buffer.add(item, revision)
+        self._locations[item["id"]] = (None, doc, revision)
+        if len(self.buffer) >= self.max_buffer_docs:
+            self._flush()
+        return True
+
+    def add_items(self, items: Iterable[Dict[str, Any]]) -> int:
+        """Buffer articles; returns how many were new or changed."""
+        return sum(self.add(item) for item in items)
+
+    def commit(self) -> int:
+        """Write buffered articles as a segment, merge, and publish. Returns the generation."""
+        self._flush()
+        while True:
+            group = self._next_merge()
+            if not group:
+                break
+            self._merge(group)
+        self._save_manifest()
+        self._remove_unreferenced()
+        return self.generation
+
+    def force_merge(self) -> int:
+        """Merge the whole index into a single segment and publish it."""
+        self._flush()
+        if len(self.segments) > 1 or any(s.deleted_ratio for s in self.segments):
+            self._merge(list(self.segments))
+        self._save_manifest()
+        self._remove_unreferenced()
+        return self.generation
+
+    # -----------------------------------------------------
+    # Public API: search
+    # -----------------------------------------------------
+    def search(
+        self,
+        query: str = "",
+        *,
+        source: str | None = None,
+        since: Any = None,
+        until: Any = None,
+        labels: Iterable[str] = (),
+        entities: Iterable[Tuple[str, str]] = (),
+        limit: int = 10,
+    ) -> List[Dict[str, Any]]:
+        """
+        Articles matching every word and "quoted phrase" of the query, ranked
+        by BM25 (title matches boosted), with their stored fields and
+        predicted entities.
+
+        Filters: `source` (exact), `since`/`until` (inclusive dates; articles
+        without a date are excluded by them), `labels` (articles with an
+        entity of each label) and `entities` ((label, text) pairs, matched on
+        normalized text). Without query words, filtered articles are returned
+        newest first.
+        """
+        words, phrases = parse_query(query)
+        required = list(dict.fromkeys(words + [token for phrase in phrases for token in phrase]))
+        required += [LABEL_PREFIX + label for label in labels]
+        required += [entity_term(label, text) for label, text in entities]
+        since, until = date_ordinal(since), date_ordinal(until)
+
+        # Postings of the query's terms, decoded once per segment
+        postings = [
+            {term: segment.doc_postings(term) for term in required + [TITLE_PREFIX + w for w in words]}
+            for segment in self.segments
+        ]
+        idf, avg_length = self._collection_stats(words, postings)
+
+        best: List[Tuple[float, int, int]] = []
+        for k, segment in enumerate(self.segments):
+            mask = segment.live.copy()
+            if source is not None:
+                if source not in segment.sources:
+                    continue
+                mask &= segment.source == segment.sources.index(source)
+            if since:
+                mask &= segment.dates >= since
+            if until:
+                mask &= segment.dates <= until
+            candidates = np.flatnonzero(mask)
+
+            for term in sorted(required, key=lambda t: postings[k][t][0].size if postings[k][t] else 0):
+                if postings[k][term] is None:
+                    candidates = candidates[:0]
+                    break
+                candidates = np.intersect1d(candidates, postings[k][term][0], assume_unique=True)
+                if not candidates.size:
+                    break
+            for phrase in phrases:
+                candidates = segment.phrase_docs(phrase, candidates)
+            if not candidates.size:
+                continue
+
+            scores = (
+                self._bm25(segment, postings[k], words, idf, avg_length, candidates)
+                if words
+                else segment.dates[candidates].astype(np.float64)
+            )
+            if scores.size > limit:
+                top = np.argpartition(-scores, limit)[:limit]
+                candidates, scores = candidates[top], scores[top]
+            # Ties go to newer segments and documents
+            best.extend((float(score), k, int(doc)) for score, doc in zip(scores, candidates))
+
+        hits = []
+        for score, k, doc in heapq.nlargest(limit, best):
+            hit = {"score": round(score, 4) if words else None}
+            hit.update(self.segments[k].stored(doc))
+            hits.append(hit)
+        return hits
+
+    def info(self) -> Dict[str, Any]:
+        sizes = [sum(os.path.getsize(path) for path in segment.files()) for segment in self.segments]
+        return {
+            "generation": self.generation,
+            "documents": len(self),
+            "deleted": sum(len(s) - s.live_docs for s in self.segments),
+            "segments": [
+                {"name": s.name, "documents": len(s), "live": s.live_docs, "terms": len(s.terms), "bytes": size}
+                for s, size in zip(self.segments, sizes)
+            ],
+            "bytes": sum(sizes),
+        }
+
+    # -----------------------------------------------------
+    # Internal helpers
+    # -----------------------------------------------------
+    def _collection_stats(
+        self, words: List[str], postings: List[Dict[str, Any]]
+    ) -> Tuple[Dict[str, float], float]:
+        n_docs, total_length = 0, 0.0
+        df = dict.fromkeys(words, 0)
+        for segment, terms in zip(self.segments, postings):
+            n_docs += segment.live_docs
+            total_length += float(segment.lengths[segment.live].sum())
+            for word in words:
+                if terms[word] is not None:
+                    df[word] += int(segment.live[terms[word][0]].sum())
+
+        idf = {word: math.log(1 + (n_docs - n + 0.5) / (n + 0.5)) for word, n in df.items()}
+        return idf, total_length / n_docs if n_docs else 1.0
+
+    @staticmethod
+    def _bm25(segment, postings, words, idf, avg_length, candidates) -> np.ndarray:
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * segment.lengths[candidates] / avg_length)
+        scores = np.zeros(candidates.size)
+        for word in words:
+            docs, tfs = postings[word]
+            tf = tfs[np.searchsorted(docs, candidates)].astype(np.float64)
+            title = postings[TITLE_PREFIX + word]
+            if title is not None:
+                title_docs, title_tfs = title
+                at = np.minimum(np.searchsorted(title_docs, candidates), title_docs.size - 1)
+                tf += TITLE_BOOST * np.where(title_docs[at] == candidates, title_tfs[at], 0)
+            scores += idf[word] * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores
+
+    def _new_segment_name(self) -> str:
+        name = f"seg-{self.next_segment:06d}"
+        self.next_segment += 1
+        return name
+
+    def _flush(self):
+        if not len(self.buffer):
+            return
+        name = self._new_segment_name()
+        self.buffer.write(self.directory, name)
+        segment = Segment(self.directory, name, self.buffer.deleted)
+        self.segments.append(segment)
+        for doc in np.flatnonzero(segment.live):
+            self._locations[segment.ids[doc]] = (segment, int(doc), segment.revisions[doc])
+        self.buffer = _SegmentBuffer()
+        self.stats["segments_written"] += 1
+
+    def _next_merge(self) -> List[Segment]:
+        levels: Dict[int, List[Segment]] = {}
+        for segment in self.segments:
+            if not segment.live_docs:
+                return [segment]
+            if segment.deleted_ratio > self.max_deleted_ratio:
+                return [segment]
+            levels.setdefault(int(math.log10(segment.live_docs)), []).append(segment)
+        for level in sorted(levels):
+            if len(levels[level]) >= self.merge_factor:
+                return levels[level][:self.merge_factor]
+        return []
+
+    def _merge(self, group: List[Segment]):
+        """Replace `group` by one segment of their live documents (none: just drop them)."""
+        position = self.segments.index(group[0])
+        for segment in group:
+            self.segments.remove(segment)
+        self.stats["merges"] += 1
+
+        if not any(segment.live_docs for segment in group):
+            for segment in group:
+                segment.close()
+            return
+
+        # Old doc number -> new one, -1 for deleted documents
+        doc_maps, base = [], 0
+        for segment in group:
+            doc_map = np.cumsum(segment.live) - 1 + base
+            doc_map[~segment.live] = -1
+            doc_maps.append(doc_map)
+            base += segment.live_docs
+
+        vocabulary = sorted({s for segment in group for s in segment.sources if s is not None})
+        source_ids = {s: i for i, s in enumerate(vocabulary)}
+        docs = {"ids": [], "revisions": [], "sources": vocabulary + [None], "source": [], "dates": [], "lengths": []}
+        stored = []
+        for segment in group:
+            for doc in np.flatnonzero(segment.live):
+                docs["ids"].append(segment.ids[doc])
+                docs["revisions"].append(segment.revisions[doc])
+                docs["source"].append(source_ids.get(segment.sources[segment.source[doc]], len(vocabulary)))
+                docs["dates"].append(int(segment.dates[doc]))
+                docs["lengths"].append(int(segment.lengths[doc]))
+                stored.append(segment.stored_line(doc))
+
+        name = self._new_segment_name()
+        write_segment(self.directory, name, *self._merged_postings(group, doc_maps), docs, stored)
+        merged = Segment(self.directory, name)
+        self.segments.insert(position, merged)
+        for doc, (doc_id, revision) in enumerate(zip(merged.ids, merged.revisions)):
+            self._locations[doc_id] = (merged, doc, revision)
+        for segment in group:
+            segment.close()
+
+    @staticmethod
+    def _merged_postings(group: List[Segment], doc_maps: List[np.ndarray]):
+        """Terms and flat postings of the live documents of `group`, renumbered."""
+        terms = sorted(set().union(*(segment.terms for segment in group)))
+        term_ids = {term: i for i, term in enumerate(terms)}
+
+        parts = []
+        for segment, doc_map in zip(group, doc_maps):
+            dfs, docs, tfs, positions = segment.all_postings()
+            term_of = np.repeat(np.fromiter((term_ids[t] for t in segment.terms), np.int64, len(segment.terms)), dfs)
+            keep = segment.live[docs]
+            parts.append((term_of[keep], doc_map[docs[keep]], tfs[keep], positions[np.repeat(keep, tfs)]))
+        term_of, docs, tfs, positions = (np.concatenate(column) for column in zip(*parts))
+
+        # Postings in (term, doc) order, and their runs of positions with them
+        order = np.lexsort((docs, term_of))
+        firsts = (np.cumsum(tfs) - tfs)[order]
+        term_of, docs, tfs = term_of[order], docs[order], tfs[order]
+        positions = positions[np.repeat(firsts - (np.cumsum(tfs) - tfs), tfs) + np.arange(int(tfs.sum()))]
+
+        dfs = np.bincount(term_of, minlength=len(terms))
+        present = dfs > 0
+        terms = [term for term, keep in zip(terms, present) if keep]
+        return terms, (dfs[present], docs, tfs, positions)
+
+    def _save_manifest(self):
+        self.generation += 1
+        manifest = {
+            "generation": self.generation,
+            "next_segment": self.next_segment,
+            "segments": [
+                {"name": s.name, "documents": len(s), "deleted": np.flatnonzero(~s.live).tolist()}
+                for s in self.segments
+            ],
+        }
+        path = os.path.join(self.directory, self.MANIFEST)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(path + ".tmp", path)
+
+    def _remove_unreferenced(self):
+        # Merged-away segments, and those of a commit interrupted before publishing
+        referenced = {s.name for s in self.segments}
+        for name in os.listdir(self.directory):
+            if name.startswith("seg-") and name.split(".", 1)[0] not in referenced:
+                os.remove(os.path.join(self.directory, name))
+
+
+def parse_query(query: str) -> Tuple[List[str], List[List[str]]]:
+    """Distinct words of a query, and its quoted phrases of more than one word."""
+    words, phrases = [], []
+    for phrase, word in _QUERY_RE.findall(query):
+        tokens = tokenize(phrase or word)
+        if len(tokens) > 1 and phrase:
+            phrases.append(tokens)
+        words.extend(tokens)
+    return list(dict.fromkeys(words)), phrases
+
+
+def read_articles(path: str) -> Iterator[Dict[str, Any]]:
+    """Articles of a {timestamp}_combined.json, a sharded output manifest or a JSONL file."""
+    if path.endswith("_manifest.json"):
+        # Shards hold entity ids: decoded with the dictionary they refer to
+        dictionary_path = read_manifest(path).get("entity_dictionary")
+        if dictionary_path:
+            yield from EntityDictionary(dictionary_path).decode_items(iter_records(path))
+        else:
+            yield from iter_records(path)
+    elif path.endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            yield from json.load(f)
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Full-text index of classified articles.")
+    parser.add_argument("index", help="Index directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = commands.add_parser("index", help="Add articles and commit")
+    index_parser.add_argument("articles", nargs="+", help="_combined.json, _manifest.json or JSONL files")
+
+    search_parser = commands.add_parser("search", help="Ranked search")
+    search_parser.add_argument("query", nargs="?", default="", help='Words and "quoted phrases"')
+    search_parser.add_argument("--source", help="Only this source")
+    search_parser.add_argument("--since", help="Earliest date, YYYY-MM-DD")
+    search_parser.add_argument("--until", help="Latest date, YYYY-MM-DD")
+    search_parser.add_argument("--label", action="append", default=[], help="Has an entity of this label")
+    search_parser.add_argument("--entity", action="append", default=[], help="Has this entity, LABEL=TEXT")
+    search_parser.add_argument("--limit", type=int, default=10)
+
+    commands.add_parser("merge", help="Merge all segments into one")
+    commands.add_parser("stats", help="Segments and sizes")
+    args = parser.parse_args()
+
+    with FullTextIndex(args.index) as index:
+        if args.command == "index":
+            for path in args.articles:
+                index.add_items(read_articles(path))
+            generation = index.commit()
+            print(
+                f"{index.stats['added']} added, {index.stats['updated']} updated, "
+                f"{index.stats['unchanged']} unchanged; {len(index)} articles in "
+                f"{len(index.segments)} segments (generation {generation}).",
+                file=sys.stderr,
+            )
+        elif args.command == "search":
+            entities = [tuple(entity.split("=", 1)) for entity in args.entity]
+            if any(len(entity) != 2 for entity in entities):
+                parser.error("--entity must be LABEL=TEXT")
+            for hit in index.search(
+                args.query,
+                source=args.source,
+                since=args.since,
+                until=args.until,
+                labels=args.label,
+                entities=entities,
+                limit=args.limit,
+            ):
+                sys.stdout.write(json.dumps(hit, ensure_ascii=False) + "\n")
+        elif args.command == "merge":
+            index.force_merge()
+            print(f"{len(index)} articles in {len(index.segments)} segment(s).", file=sys.stderr)
+        else:
+            print(json.dumps(index.info(), indent=2))
@@ -1,5 +1,5 @@
 import torch
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 
 from transformers import (
     AutoTokenizer,
@@ -37,9 +37,9 @@ class TokenClassificationSecurityModel:
         self.label2id = self.model.config.label2id
 
     # -----------------------------------------------------
-    # Split text into token chunks
+    # Split text into token chunks (also returns its token count)
     # -----------------------------------------------------
-    def _split_for_inference(self, text: str) -> List[Dict[str, Any]]:
+    def _split_for_inference(self, text: str) -> Tuple[List[Dict[str, Any]], int]:
         full = self.tokenizer(
             text,
             return_offsets_mapping=True,
@@ -80,7 +80,7 @@ class TokenClassificationSecurityModel:
 
             start_idx = end_idx
 
-        return chunks
+        return chunks, n_tokens
 
     # -----------------------------------------------------
     # BIO → character spans
@@ -128,12 +128,27 @@ class TokenClassificationSecurityModel:
 
         return spans
 
+    # -----------------------------------------------------
+    # Collect tags / offsets predicted for one chunk
+    # -----------------------------------------------------
+    def _collect_chunk(self, ch, pred_ids, all_tags, all_offsets):
+        base = ch["global_char_start"]
+        for pid, (s, e) in zip(pred_ids, ch["local_offsets"]):
+            if s == 0 and e == 0:
+                continue
+            gs, ge = base + s, base + e
+            if gs == ge:
+                continue
+
+            all_tags.append(self.id2label[int(pid)])
+            all_offsets.append((gs, ge))
+
     # -----------------------------------------------------
     # Predict spans for a single text
     # -----------------------------------------------------
     @torch.no_grad()
     def _predict_single(self, text: str) -> Dict[str, Any]:
-        chunks = self._split_for_inference(text)
+        chunks, n_tokens = self._split_for_inference(text)
 
         all_tags = []
         all_offsets = []
@@ -143,40 +158,77 @@ class TokenClassificationSecurityModel:
             logits = self.model(**enc).logits.squeeze(0)
             pred_ids = logits.argmax(-1).tolist()
 
-            base = ch["global_char_start"]
-            for pid, (s, e) in zip(pred_ids, ch["local_offsets"]):
-                if s == 0 and e == 0:
-                    continue
-                gs, ge = base + s, base + e
-                if gs == ge:
-                    continue
-
-                all_tags.append(self.id2label[int(pid)])
-                all_offsets.append((gs, ge))
+            self._collect_chunk(ch, pred_ids, all_tags, all_offsets)
 
         spans = self._bio_to_char_spans(all_tags, all_offsets, text)
 
         return {
             "text": text,
             "pred_spans": spans,
+            "n_tokens": n_tokens,
         }
 
+    # -----------------------------------------------------
+    # Predict spans for several texts, chunks padded into batches
+    # -----------------------------------------------------
+    @torch.no_grad()
+    def _predict_batch(self, texts: List[str], batch_size: int) -> List[Dict[str, Any]]:
+        chunks = []
+        n_tokens = []
+        for i, text in enumerate(texts):
+            text_chunks, text_tokens = self._split_for_inference(text)
+            chunks.extend((i, ch) for ch in text_chunks)
+            n_tokens.append(text_tokens)
+
+        all_tags = [[] for _ in texts]
+        all_offsets = [[] for _ in texts]
+
+        for b in range(0, len(chunks), batch_size):
+            group = chunks[b:b + batch_size]
+
+            enc = self.tokenizer.pad(
+                [{k: v.squeeze(0) for k, v in ch["enc"].items()} for _, ch in group],
+                return_tensors="pt",
+            )
+            enc = {k: v.to(self.device) for k, v in enc.items()}
+            pred_ids = self.model(**enc).logits.argmax(-1).tolist()
+            attention = enc["attention_mask"].tolist()
+
+            # Keep the real positions only, whichever side the tokenizer pads
+            for (i, ch), ids, mask in zip(group, pred_ids, attention):
+                ids = [pred for pred, real in zip(ids, mask) if real]
+                self._collect_chunk(ch, ids, all_tags[i], all_offsets[i])
+
+        return [
+            {
+                "text": text,
+                "pred_spans": self._bio_to_char_spans(all_tags[i], all_offsets[i], text),
+                "n_tokens": n_tokens[i],
+            }
+            for i, text in enumerate(texts)
+        ]
+
     # -----------------------------------------------------
     # PUBLIC API METHOD
     # -----------------------------------------------------
-    def generate(self, texts: List[str]) -> List[Dict[str, Any]]:
+    def generate(self, texts: List[str], batch_size: int = 1) -> List[Dict[str, Any]]:
         """
         API entrypoint.
         Input:
             texts = ["some text", "another text"]
+            batch_size = number of token chunks per forward pass
+                         (chunks of different texts are padded together)
         Output:
             [
               {
                 "text": "...",
                 "pred_spans": [
                     {"start": 0, "end": 4, "label": "ORG", "text": "ACME"}
-                ]
+                ],
+                "n_tokens": 312
               }
             ]
         """
+        if batch_size > 1:
+            return self._predict_batch(texts, batch_size)
         return [self._predict_single(t) for t in texts]
@@ -0,0 +1,266 @@
+from typing import List, Dict, Any, Iterable, Tuple
+from collections import defaultdict
+from datetime import datetime, timedelta
+import json
+import os
+import re
+import zlib
+
+import numpy as np
+
+# Smallest prime above 2**32: (a * x + b) stays below 2**64 for 32-bit shingle hashes
+HASH_PRIME = np.uint64(4294967311)
+WORD_RE = re.compile(r"\w+")
+
+
+class NearDuplicateDetector:
+    """
+    MinHash / LSH near-duplicate detection over article bodies.
+
+    Bodies are shingled into word n-grams, summarized by `num_perm` MinHash
+    values and bucketed by LSH in `bands` bands. Candidates sharing a bucket
+    are confirmed against `threshold` on the estimated Jaccard similarity.
+
+    The first article of a cluster is its representative and is the only one
+    sent to the model; later members are linked to it. Representatives are
+    kept for `window_days` days so syndicated copies published on later days
+    still match.
+
+    Window layout:
+      {window_dir}/{YYYYMMDD}.jsonl   one representative per line:
+      {"id": "...", "signature": [...], "pred_spans": [...]}
+    """
+
+    def __init__(
+        self,
+        window_dir: str,
+        *,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_size: int = 5,
+        window_days: int = 7,
+        seed: int = 1,
+        today: datetime | None = None,
+    ):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+
+        self.window_dir = window_dir
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.window_days = window_days
+        self.today = today or datetime.now()
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 2 ** 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 2 ** 32, size=num_perm, dtype=np.uint64)
+
+        self.signatures: Dict[str, np.ndarray] = {}
+        self.spans: Dict[str, List[Dict[str, Any]]] = {}
+        self.buckets: Dict[Tuple[int, bytes], List[str]] = defaultdict(list)
+        self.new_representatives: Dict[str, None] = {}
+        self.links: List[Dict[str, Any]] = []
+
+        os.makedirs(window_dir, exist_ok=True)
+        self._load_window()
+
+    # -----------------------------------------------------
+    # Public API
+    # -----------------------------------------------------
+    def signature(self, text: str) -> np.ndarray | None:
+        """
+        MinHash signature of a body's word shingles, or None for a body
+        shorter than one shingle: teasers and empty bodies say too little to
+        be called duplicates of each other.
+        """
+        words = WORD_RE.findall(text.lower())
+        n = self.shingle_size
+        if len(words) < n:
+            return None
+        shingles = {
+            zlib.crc32(" ".join(words[i:i + n]).encode("utf-8"))
+            for i in range(len(words) - n + 1)
+        }
+        x = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+
+        hashed = (np.outer(self._a, x) + self._b[:, None]) % HASH_PRIME
+        return hashed.min(axis=1)
+
+    def similarity(self, sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+        return float(np.mean(sig_a == sig_b))
+
+    def assign(self, item: Dict[str, Any]) -> Tuple[str, float] | None:
+        """
+        Match an article against the window and earlier articles of this run.
+
+        Returns (representative id, similarity) for a near-duplicate, or None
+        when the article starts a new cluster and must be classified.
+        """
+        sig = self.signature(item.get("body") or "")
+        if sig is None:
+            self.new_representatives[item["id"]] = None
+            return None
+
+        best_id, best_sim = None, 0.0
+        for candidate in self._candidates(sig):
+            if candidate == item["id"]:
+                continue  # a new revision of the same article is not a duplicate
+            sim = self.similarity(sig, self.signatures[candidate])
+            if sim > best_sim:
+                best_id, best_sim = candidate, sim
+
+        if best_id is not None and best_sim >= self.threshold:
+            self.links.append({
+                "id": item["id"],
+                "duplicate_of": best_id,
+                "similarity": round(best_sim, 4),
+                "source": item.get("source"),
+                "url": item.get("url"),
+            })
+            return best_id, best_sim
+
+        self._insert(item["id"], sig)
+        self.new_representatives[item["id"]] = None
+        return None
+
+    def restore(self, records: Iterable[Dict[str, Any]]):
+        """
+        Re-register articles already processed earlier in this run, e.g.
+        when a crashed run resumes. Representatives need `pred_spans`,
+        duplicates `duplicate_of` (and optionally `duplicate_similarity`).
+        """
+        for rec in records:
+            if rec.get("duplicate_of"):
+                self.links.append({
+                    "id": rec["id"],
+                    "duplicate_of": rec["duplicate_of"],
+                    "similarity": rec.get("duplicate_similarity"),
+                    "source": rec.get("source"),
+                    "url": rec.get("url"),
+                })
+            else:
+                sig = self.signature(rec.get("body") or "")
+                if sig is not None:
+                    self._insert(rec["id"], sig)
+                self.new_representatives[rec["id"]] = None
+                self.spans[rec["id"]] = rec.get("pred_spans", [])
+
+    def set_spans(self, rep_id: str, pred_spans: List[Dict[str, Any]]):
+        """Record the model output of a representative for its duplicates."""
+        self.spans[rep_id] = pred_spans
+
+    def spans_for(self, rep_id: str, body: str | None = None) -> List[Dict[str, Any]]:
+        """
+        Model output of a representative. With `body`, the spans are
+        re-anchored on that text (a duplicate's body): each span moves to the
+        next occurrence of its text, spans whose text does not occur are
+        dropped.
+        """
+        spans = self.spans.get(rep_id, [])
+        if body is None:
+            return spans
+
+        anchored = []
+        cursor = 0
+        for sp in sorted(spans, key=lambda x: x["start"]):
+            start = body.find(sp["text"], cursor)
+            if start < 0:
+                start = body.find(sp["text"])
+            if start < 0:
+                continue
+            cursor = start + len(sp["text"])
+            anchored.append(dict(sp, start=start, end=cursor))
+        return sorted(anchored, key=lambda x: x["start"])
+
+    def save(self, day: str | None = None) -> str:
+        """Persist this run's representatives and prune days outside the window."""
+        day = day or self.today.strftime("%Y%m%d")
+        path = os.path.join(self.window_dir, f"{day}.jsonl")
+
+        with open(path, "a", encoding="utf-8") as f:
+            for rep_id in self.new_representatives:
+                if rep_id not in self.spans or rep_id not in self.signatures:
+                    continue
+                f.write(json.dumps({
+                    "id": rep_id,
+                    "signature": self.signatures[rep_id].tolist(),
+                    "pred_spans": self.spans[rep_id],
+                }, ensure_ascii=False))
+                f.write("\n")
+        self.new_representatives = {}
+
+        for name in os.listdir(self.window_dir):
+            if name.endswith(".jsonl") and not self._in_window(name[:-len(".jsonl")]):
+                os.remove(os.path.join(self.window_dir, name))
+
+        return path
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "threshold": self.threshold,
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "rows_per_band": self.rows,
+            # similarity at which a pair becomes an LSH candidate with p = 0.5
+            "lsh_threshold": round((1 / self.bands) ** (1 / self.rows), 4),
+            "shingle_size": self.shingle_size,
+            "window_days": self.window_days,
+            "representatives": len(self.signatures),
+            "duplicates": len(self.links),
+            "links": self.links,
+        }
+
+    def write_report(self, output_file: str) -> str:
+        os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=4)
+        return output_file
+
+    # -----------------------------------------------------
+    # Internal helpers
+    # -----------------------------------------------------
+    def _band_keys(self, sig: np.ndarray):
+        for band in range(self.bands):
+            yield band, sig[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def _candidates(self, sig: np.ndarray):
+        seen = set()
+        for key in self._band_keys(sig):
+            for doc_id in self.buckets.get(key, ()):
+                if doc_id not in seen:
+                    seen.add(doc_id)
+                    yield doc_id
+
+    def _insert(self, doc_id: str, sig: np.ndarray):
+        self.signatures[doc_id] = sig
+        for key in self._band_keys(sig):
+            self.buckets[key].append(doc_id)
+
+    def _in_window(self, day: str) -> bool:
+        try:
+            date = datetime.strptime(day, "%Y%m%d")
+        except ValueError:
+            return True
+        return date >= (self.today - timedelta(days=self.window_days)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+
+    def _load_window(self):
+        for name in sorted(os.listdir(self.window_dir)):
+            if not name.endswith(".jsonl") or not self._in_window(name[:-len(".jsonl")]):
+                continue
+
+            with open(os.path.join(self.window_dir, name), encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    rec = json.loads(line)
+                    sig = np.asarray(rec["signature"], dtype=np.uint64)
+                    if len(sig) != self.num_perm:
+                        continue  # written with different MinHash parameters
+                    self._insert(rec["id"], sig)
+                    self.spans[rec["id"]] = rec["pred_spans"]
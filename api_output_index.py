@@ -0,0 +1,183 @@
+from typing import List, Dict, Any, Iterable, Tuple
+import gzip
+import hashlib
+import json
+import lzma
+import mmap
+import os
+import struct
+
+# key hash, block offset, block length, offset in block, record length
+ENTRY = struct.Struct("<QQIII")
+
+DECOMPRESSORS = {
+    None: None,
+    "gzip": gzip.decompress,
+    "lzma": lzma.decompress,
+}
+
+
+def key_hash(field: str, value: Any) -> int:
+    """64-bit hash of an index key such as ("id", 12) or ("url", "https://...")."""
+    digest = hashlib.blake2b(f"{field}:{value}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class OutputIndexBuilder:
+    """
+    Collect record positions for one shard and write its sidecar index.
+
+    The index is a flat array of fixed-size little-endian entries sorted by
+    key hash, so readers can binary-search it straight from a memory map:
+
+      key_hash: u64 | block_offset: u64 | block_length: u32 | offset_in_block: u32 | length: u32
+
+    For plain shards a block is the record line itself. For block-compressed
+    shards it is the compressed member holding the record, and the last two
+    fields locate the line inside the decompressed block.
+    """
+
+    def __init__(self, fields: Iterable[str] = ("id", "url")):
+        self.fields = tuple(fields)
+        self.entries: List[Tuple[int, int, int, int, int]] = []
+
+    def add(
+        self,
+        record: Dict[str, Any],
+        block_offset: int,
+        block_length: int,
+        offset_in_block: int,
+        length: int,
+    ):
+        for field in self.fields:
+            value = record.get(field)
+            if value is not None:
+                self.entries.append(
+                    (key_hash(field, value), block_offset, block_length, offset_in_block, length)
+                )
+
+    def write(self, index_file: str) -> str:
+        self.entries.sort()
+        with open(index_file, "wb") as f:
+            for entry in self.entries:
+                f.write(ENTRY.pack(*entry))
+        return index_file
+
+
+class ShardIndex:
+    """Memory-mapped sidecar index of a single shard."""
+
+    def __init__(self, index_file: str):
+        self.index_file = index_file
+        self._file = open(index_file, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.n = size // ENTRY.size
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def _key_at(self, i: int) -> int:
+        return int.from_bytes(self._map[i * ENTRY.size:i * ENTRY.size + 8], "little")
+
+    def find(self, key: int) -> List[Tuple[int, int, int, int]]:
+        """Return all (block_offset, block_length, offset_in_block, length) for a key hash."""
+        lo, hi = 0, self.n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        out = []
+        while lo < self.n and self._key_at(lo) == key:
+            out.append(ENTRY.unpack_from(self._map, lo * ENTRY.size)[1:])
+            lo += 1
+        return out
+
+
+class IndexedOutputReader:
+    """
+    Random-access reader over one or more days of sharded output.
+
+    Usage:
+        reader = IndexedOutputReader([
+            ".../20250101_outputs/20250101_manifest.json",
+            ".../20250102_outputs/20250102_manifest.json",
+        ])
+        reader.get(id=42)
+        reader.get(url="https://www.securityweek.com/...")
+
+    Only the index entries touched by the binary search and the one block
+    holding the record are read from disk. Records are returned as stored:
+    when the manifest names an `entity_dictionary`, `predicted_result`
+    holds entity ids (see `EntityDictionary.decode_items`).
+    """
+
+    def __init__(self, manifest_paths: Iterable[str]):
+        self.shards = []
+
+        for manifest_path in manifest_paths:
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+
+            base = os.path.dirname(manifest_path)
+            for shard in manifest["shards"]:
+                if not shard.get("index"):
+                    continue
+                self.shards.append({
+                    "path": os.path.join(base, shard["file"]),
+                    "index": ShardIndex(os.path.join(base, shard["index"])),
+                    "decompress": DECOMPRESSORS[manifest["compression"]],
+                })
+
+    def __enter__(self) -> "IndexedOutputReader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        for shard in self.shards:
+            shard["index"].close()
+
+    # -----------------------------------------------------
+    # Public API
+    # -----------------------------------------------------
+    def get(self, *, id: Any = None, url: str | None = None) -> Dict[str, Any] | None:
+        """Return the most recent record with the given id or url, or None."""
+        records = self.get_all(id=id, url=url)
+        return records[-1] if records else None
+
+    def get_all(self, *, id: Any = None, url: str | None = None) -> List[Dict[str, Any]]:
+        """Return every record with the given id or url, oldest day first."""
+        if (id is None) == (url is None):
+            raise ValueError("Pass exactly one of id= or url=")
+
+        field, value = ("id", id) if id is not None else ("url", url)
+        key = key_hash(field, value)
+
+        out = []
+        for shard in self.shards:
+            for position in shard["index"].find(key):
+                record = self._read(shard, *position)
+                if record.get(field) == value:
+                    out.append(record)
+        return out
+
+    # -----------------------------------------------------
+    # Internal helpers
+    # -----------------------------------------------------
+    @staticmethod
+    def _read(shard, block_offset, block_length, offset_in_block, length) -> Dict[str, Any]:
+        with open(shard["path"], "rb") as f:
+            f.seek(block_offset)
+            block = f.read(block_length)
+
+        if shard["decompress"] is not None:
+            block = shard["decompress"](block)
+
+        return json.loads(block[offset_in_block:offset_in_block + length])
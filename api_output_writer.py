@@ -0,0 +1,264 @@
+from typing import List, Dict, Any, Iterable, Iterator
+import gzip
+import json
+import lzma
+import os
+
+from api_output_index import OutputIndexBuilder
+
+COMPRESSORS = {
+    None: ("", None),
+    "gzip": (".gz", lambda data: gzip.compress(data, compresslevel=6)),
+    "lzma": (".xz", lambda data: lzma.compress(data, preset=6)),
+}
+
+
+class ShardedJSONLWriter:
+    """
+    Write pipeline records incrementally as JSON Lines shards.
+
+    Records are appended as soon as they are produced and a new shard is
+    started once the current one holds `max_shard_bytes` of uncompressed
+    JSON. With compression enabled each shard is a sequence of independent
+    gzip members / xz streams of roughly `block_bytes`, which standard
+    `gzip.open` / `lzma.open` read as one file.
+
+    Unless `index_fields` is None, every shard gets a sidecar `.idx` file
+    locating each record by the given fields (see `api_output_index`).
+    `metadata` is added to the manifest as is, e.g. to say how a field of
+    the records is encoded.
+
+    Output layout:
+      {prefix}-00000.jsonl[.gz|.xz]
+      {prefix}-00000.jsonl[.gz|.xz].idx
+      {prefix}-00001.jsonl[.gz|.xz]
+      {prefix}-00001.jsonl[.gz|.xz].idx
+      {prefix}_manifest.json
+
+    Manifest:
+      {
+        "compression": "gzip",
+        "records": 120,
+        "entity_dictionary": ".../entity_dictionary.jsonl",    (metadata)
+        "shards": [{"file": "20250101-00000.jsonl.gz", "index": "20250101-00000.jsonl.gz.idx",
+                    "records": 120, "bytes": 51234, "raw_bytes": 181022}]
+      }
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        prefix: str,
+        *,
+        max_shard_bytes: int = 64 * 1024 * 1024,
+        compression: str | None = None,
+        block_bytes: int = 256 * 1024,
+        index_fields: Iterable[str] | None = ("id", "url"),
+        metadata: Dict[str, Any] | None = None,
+    ):
+        if compression not in COMPRESSORS:
+            raise ValueError(f"Unknown compression '{compression}', expected one of {list(COMPRESSORS)}")
+
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.max_shard_bytes = max_shard_bytes
+        self.compression = compression
+        self.block_bytes = block_bytes
+        self.index_fields = tuple(index_fields) if index_fields else None
+        self.metadata = dict(metadata or {})
+        self.suffix, self._compress = COMPRESSORS[compression]
+
+        self.shards: List[Dict[str, Any]] = []
+        self._file = None
+        self._block: List[bytes] = []
+        self._block_size = 0
+        self._index = None
+        self._pending: List[tuple] = []
+
+        os.makedirs(output_dir, exist_ok=True)
+
+    def __enter__(self) -> "ShardedJSONLWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.output_dir, f"{self.prefix}_manifest.json")
+
+    # -----------------------------------------------------
+    # Public API
+    # -----------------------------------------------------
+    def write(self, record: Dict[str, Any]):
+        """Append one record, rolling to a new shard when the current one is full."""
+        line = json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+
+        if self._file is None or self.shards[-1]["raw_bytes"] >= self.max_shard_bytes:
+            self._open_shard()
+
+        shard = self.shards[-1]
+        shard["records"] += 1
+        shard["raw_bytes"] += len(line)
+
+        if self._compress is None:
+            if self._index is not None:
+                self._index.add(record, shard["bytes"], len(line), 0, len(line))
+            self._file.write(line)
+            shard["bytes"] += len(line)
+            return
+
+        if self._index is not None:
+            keys = {f: record.get(f) for f in self.index_fields}
+            self._pending.append((keys, self._block_size, len(line)))
+        self._block.append(line)
+        self._block_size += len(line)
+        if self._block_size >= self.block_bytes:
+            self._flush_block()
+
+    def write_all(self, records) -> int:
+        n = 0
+        for record in records:
+            self.write(record)
+            n += 1
+        return n
+
+    def close(self) -> str:
+        """Close the open shard and write the manifest. Returns the manifest path."""
+        self._close_shard()
+
+        manifest = {
+            "compression": self.compression,
+            "records": sum(s["records"] for s in self.shards),
+            "shards": self.shards,
+            **self.metadata,
+        }
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=4)
+
+        return self.manifest_path
+
+    # -----------------------------------------------------
+    # Internal helpers
+    # -----------------------------------------------------
+    def _open_shard(self):
+        self._close_shard()
+
+        name = f"{self.prefix}-{len(self.shards):05d}.jsonl{self.suffix}"
+        self._file = open(os.path.join(self.output_dir, name), "wb")
+        self.shards.append({"file": name, "records": 0, "bytes": 0, "raw_bytes": 0})
+
+        if self.index_fields:
+            self._index = OutputIndexBuilder(self.index_fields)
+            self.shards[-1]["index"] = f"{name}.idx"
+
+    def _flush_block(self):
+        if not self._block:
+            return
+        data = self._compress(b"".join(self._block))
+        block_offset = self.shards[-1]["bytes"]
+
+        if self._index is not None:
+            for keys, offset_in_block, length in self._pending:
+                self._index.add(keys, block_offset, len(data), offset_in_block, length)
+
+        self._file.write(data)
+        self.shards[-1]["bytes"] += len(data)
+        self._block = []
+        self._block_size = 0
+        self._pending = []
+
+    def _close_shard(self):
+        if self._file is None:
+            return
+        self._flush_block()
+        self._file.close()
+        self._file = None
+
+        if self._index is not None:
+            self._index.write(os.path.join(self.output_dir, self.shards[-1]["index"]))
+            self._index = None
+
+
+class CombinedJSONWriter:
+    """
+    Compatibility writer for the single `{timestamp}_combined.json` output.
+
+    Streams records into the file one at a time while producing the same
+    bytes as `json.dump(all_items, f, ensure_ascii=False, indent=4)`.
+    """
+
+    def __init__(self, output_file: str):
+        os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+        self.output_file = output_file
+        self._file = open(output_file, "w", encoding="utf-8")
+        self._count = 0
+
+    def __enter__(self) -> "CombinedJSONWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, record: Dict[str, Any]):
+        body = json.dumps(record, ensure_ascii=False, indent=4).replace("\n", "\n    ")
+        self._file.write(("[\n    " if self._count == 0 else ",\n    ") + body)
+        self._count += 1
+
+    def close(self) -> str:
+        if self._file is None:
+            return self.output_file
+        self._file.write("\n]" if self._count else "[]")
+        self._file.close()
+        self._file = None
+        return self.output_file
+
+
+class MultiWriter:
+    """Fan one record stream out to several writers."""
+
+    def __init__(self, *writers):
+        self.writers = writers
+
+    def __enter__(self) -> "MultiWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, record: Dict[str, Any]):
+        for w in self.writers:
+            w.write(record)
+
+    def close(self):
+        for w in self.writers:
+            w.close()
+
+
+# =========================================================
+# Readers
+# =========================================================
+
+def read_manifest(manifest_path: str) -> Dict[str, Any]:
+    with open(manifest_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def iter_records(manifest_path: str) -> Iterator[Dict[str, Any]]:
+    """Stream every record of a sharded output in write order."""
+    manifest = read_manifest(manifest_path)
+    base = os.path.dirname(manifest_path)
+
+    for shard in manifest["shards"]:
+        path = os.path.join(base, shard["file"])
+        if manifest["compression"] == "gzip":
+            f = gzip.open(path, "rt", encoding="utf-8")
+        elif manifest["compression"] == "lzma":
+            f = lzma.open(path, "rt", encoding="utf-8")
+        else:
+            f = open(path, encoding="utf-8")
+
+        with f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
@@ -0,0 +1,183 @@
+from typing import Any, Callable, Tuple
+from concurrent.futures import CancelledError, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
+import os
+
+from parsel import Selector
+from scrapy import signals
+from twisted.internet.defer import Deferred, DeferredSemaphore
+from twisted.python.failure import Failure
+
+OFFLOAD_MODES = ("thread", "process")
+
+# Shared arguments of the pool this worker process belongs to
+_worker_shared: Tuple = ()
+
+
+def call_on_page(fn: Callable[..., Any], text: str, url: str, *args) -> Any:
+    """Parse an HTML page as `response.selector` does and return `fn(root, *args)`."""
+    return fn(Selector(text=text, type="html", base_url=url).root, *args)
+
+
+def _init_worker(shared: Tuple):
+    global _worker_shared
+    _worker_shared = shared
+
+
+def _call_on_page_shared(fn: Callable[..., Any], text: str, url: str, *args) -> Any:
+    # In a worker process, with the shared arguments received at startup
+    return call_on_page(fn, text, url, *_worker_shared, *args)
+
+
+class ParseOffload:
+    """
+    Run CPU-heavy page parsing in a thread or process pool instead of on
+    the Twisted reactor thread, so the downloader keeps going while a large
+    page is parsed.
+
+        offload = ParseOffload("process", workers=2, max_pending=4, shared=(selectors, extractor))
+        fields = await maybe_deferred_to_future(
+            offload.call_on_page(response, article_fields)
+        )
+
+    The page is parsed again in the worker from `response.text`: lxml trees
+    cannot cross threads safely or processes at all. `fn` and its
+    arguments must be picklable in "process" mode (module-level functions,
+    `CompiledSelector`, `BodyExtractor`). Results come back on the reactor
+    thread.
+
+    `shared` arguments, the same for every page, are passed to `fn` after
+    the root. A process pool sends them to each worker once, when it
+    starts, instead of pickling them with every job (`CompiledSelector`
+    would compile its XPath again each time).
+
+    At most `max_pending` jobs are submitted at once; further calls wait
+    (their responses stay in Scrapy's scraper slot, which in turn holds
+    back new downloads once SCRAPER_SLOT_MAX_ACTIVE_SIZE is reached).
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        workers: int = 2,
+        max_pending: int | None = None,
+        stats=None,
+        shared: Tuple = (),
+    ):
+        if mode not in OFFLOAD_MODES:
+            raise ValueError(f"Unknown parse offload mode '{mode}', expected one of {OFFLOAD_MODES}")
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending or 2 * self.workers)
+        self.stats = stats
+        self.shared = tuple(shared)
+        self.executor: Executor = (
+            ThreadPoolExecutor(self.workers, thread_name_prefix="parse-offload")
+            if mode == "thread"
+            else ProcessPoolExecutor(
+                self.workers,
+                # Not forked: this process runs the reactor and other threads
+                # (inference), whose locks a forked child could inherit held
+                mp_context=multiprocessing.get_context("forkserver"),
+                initializer=_init_worker,
+                initargs=(self.shared,),
+            )
+        )
+        self._slots = DeferredSemaphore(self.max_pending)
+
+    @classmethod
+    def from_crawler(cls, crawler, shared: Tuple = ()) -> "ParseOffload | None":
+        """
+        Pool configured by the crawler's settings, shut down when its spider
+        closes; None unless PARSE_OFFLOAD is set.
+
+        Settings:
+          PARSE_OFFLOAD              "thread" or "process" (default: off)
+          PARSE_OFFLOAD_WORKERS      pool size (default: CPUs - 1, at least 1)
+          PARSE_OFFLOAD_MAX_PENDING  jobs submitted at once (default: 2 x workers)
+        """
+        settings = crawler.settings
+        mode = settings.get("PARSE_OFFLOAD")
+        if not mode:
+            return None
+
+        offload = cls(
+            mode,
+            workers=settings.getint("PARSE_OFFLOAD_WORKERS", 0) or max(1, (os.cpu_count() or 2) - 1),
+            max_pending=settings.getint("PARSE_OFFLOAD_MAX_PENDING", 0) or None,
+            stats=crawler.stats,
+            shared=shared,
+        )
+        crawler.signals.connect(offload.close, signal=signals.spider_closed)
+        return offload
+
+    # -----------------------------------------------------
+    # Public API
+    # -----------------------------------------------------
+    def call(self, fn: Callable[..., Any], *args) -> Deferred:
+        """Deferred firing on the reactor thread with `fn(*args)` run in the pool."""
+        if self._slots.tokens == 0:
+            self._inc_stat("parse_offload/waits")
+        return self._slots.run(self._submit, fn, *args)
+
+    def call_on_page(self, response, fn: Callable[..., Any], *args) -> Deferred:
+        """Deferred firing with `fn(root, *shared, *args)`, `root` being the parsed page."""
+        if self.mode == "process":
+            return self.call(_call_on_page_shared, fn, response.text, response.url, *args)
+        return self.call(call_on_page, fn, response.text, response.url, *self.shared, *args)
+
+    def close(self, spider=None):
+        # Every job has called back once the spider closes; the workers exit
+        # in the background instead of blocking the reactor thread
+        self.executor.shutdown(wait=False)
+
+    # -----------------------------------------------------
+    # Internal helpers
+    # -----------------------------------------------------
+    def _submit(self, fn: Callable[..., Any], *args) -> Deferred:
+        from twisted.internet import reactor
+
+        d = Deferred()
+        self._inc_stat("parse_offload/jobs")
+        future = self.executor.submit(fn, *args)
+        future.add_done_callback(lambda f: reactor.callFromThread(self._fire, d, f))
+        return d
+
+    @staticmethod
+    def _fire(d: Deferred, future):
+        # Always fire: a Deferred left waiting would hold its semaphore slot
+        if future.cancelled():
+            d.errback(Failure(CancelledError()))
+            return
+        error = future.exception()
+        if error is not None:
+            d.errback(error)
+        else:
+            d.callback(future.result())
+
+    def _inc_stat(self, key: str):
+        if self.stats is not None:
+            self.stats.inc_value(key)
+
+
+class ParseOffloadMixin:
+    """
+    Gives a spider a lazily built `parse_offload` (see `ParseOffload.from_crawler`),
+    its shared arguments returned by `parse_offload_shared()`.
+    """
+
+    _parse_offload: ParseOffload | None = None
+    _parse_offload_checked = False
+
+    @property
+    def parse_offload(self) -> ParseOffload | None:
+        if not self._parse_offload_checked:
+            crawler = getattr(self, "crawler", None)
+            self._parse_offload = (
+                ParseOffload.from_crawler(crawler, self.parse_offload_shared()) if crawler is not None else None
+            )
+            self._parse_offload_checked = True
+        return self._parse_offload
+
+    def parse_offload_shared(self) -> Tuple:
+        return ()
@@ -0,0 +1,160 @@
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Tuple
+from datetime import datetime
+import hashlib
+import json
+import os
+
+
+def sha256_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class StageCheckpoints:
+    """
+    Completion state of the named stages of one pipeline run.
+
+    A stage counts as done only if it was marked complete and every artifact
+    it recorded still exists with the same SHA-256, so a truncated or edited
+    artifact makes the stage (and the ones after it) run again.
+
+    State file ({run_dir}/stages.json):
+      {
+        "crawl": {"finished_at": "...", "artifacts": {"crawl/bleeping.json": "9f2c..."}},
+        "merge": {...}
+      }
+    """
+
+    def __init__(self, run_dir: str):
+        self.run_dir = run_dir
+        self.state_path = os.path.join(run_dir, "stages.json")
+        os.makedirs(run_dir, exist_ok=True)
+
+        self.state: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    def path(self, *parts: str) -> str:
+        return os.path.join(self.run_dir, *parts)
+
+    # -----------------------------------------------------
+    # Public API
+    # -----------------------------------------------------
+    def done(self, stage: str) -> bool:
+        entry = self.state.get(stage)
+        if entry is None:
+            return False
+
+        for rel_path, checksum in entry["artifacts"].items():
+            path = self.path(rel_path)
+            if not os.path.exists(path) or sha256_file(path) != checksum:
+                return False
+        return True
+
+    def complete(self, stage: str, artifacts: Iterable[str]):
+        """Mark a stage complete with the checksums of its artifacts."""
+        self.state[stage] = {
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "artifacts": {
+                os.path.relpath(path, self.run_dir): sha256_file(path)
+                for path in artifacts
+            },
+        }
+        self._write_state()
+
+    def invalidate(self, stage: str):
+        if self.state.pop(stage, None) is not None:
+            self._write_state()
+
+    def run(self, stages: List[Tuple[str, Callable[[], List[str]]]]):
+        """
+        Run stages in order, skipping completed ones.
+
+        Each stage callable returns the paths of its artifacts. Once a stage
+        has to run, every later stage runs as well, since its inputs changed.
+        """
+        rerun = False
+        for name, fn in stages:
+            if not rerun and self.done(name):
+                print(f"Stage '{name}' already complete, skipping.")
+                continue
+
+            rerun = True
+            print(f"Stage '{name}'...")
+            self.complete(name, fn())
+
+    # -----------------------------------------------------
+    # Internal helpers
+    # -----------------------------------------------------
+    def _write_state(self):
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=4)
+        os.replace(tmp_path, self.state_path)
+
+
+class JSONLCheckpoint:
+    """
+    Append-only JSON Lines file used to resume a stage article by article.
+
+    Every `append()` is flushed and fsynced, so after a crash the file holds
+    exactly the records finished so far (a torn last line is ignored).
+
+    Records are identified by the `key` field, or by a tuple of the values
+    of several fields when `key` is a tuple (e.g. ("id", "revision")).
+    """
+
+    def __init__(self, path: str, key: str | Tuple[str, ...] = "id"):
+        self.path = path
+        self.key = key
+        self.keys = set()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._truncate_torn_line()
+        for record in self.records():
+            self.keys.add(self.key_of(record))
+
+    def __contains__(self, key) -> bool:
+        return key in self.keys
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def key_of(self, record: Dict[str, Any]):
+        if isinstance(self.key, tuple):
+            return tuple(record.get(k) for k in self.key)
+        return record.get(self.key)
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    return
+
+    def append(self, records: Iterable[Dict[str, Any]]):
+        records = list(records)
+        if not records:
+            return
+
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.keys.update(self.key_of(r) for r in records)
+
+    def _truncate_torn_line(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
@@ -0,0 +1,137 @@
+from typing import Dict, Any, Iterable
+from datetime import datetime, timedelta
+import re
+
+from api_article_store import canonical_url
+
+# "October 19, 2025", "Oct 19, 2025", optionally followed by a time
+_DATE_RE = re.compile(r"[A-Za-z]+\.?\s+\d{1,2},\s+\d{4}")
+_DATE_FORMATS = ("%B %d, %Y", "%b %d, %Y")
+
+
+def parse_listing_date(text: str | None) -> datetime | None:
+    """Parse a "Month DD, YYYY" date as shown on the news sites, or None."""
+    if not text:
+        return None
+
+    match = _DATE_RE.search(text)
+    if not match:
+        return None
+    value = match.group(0).replace(".", "")
+
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+class RecencyCutoff:
+    """
+    Decide which articles are recent enough to crawl and when to stop paging.
+
+    The cutoff is either `since` (a datetime) or `days` before `now`.
+    Articles without a parseable date are kept. Listings are newest first,
+    so as soon as a listing page holds an article older than the cutoff,
+    the following pages can only be older and are never requested.
+
+    For sites whose listings carry no dates (SecurityWeek), the next page
+    is held back until every article of the current page has been parsed
+    and turned out recent; see `defer_next_page()` / `article_done()`.
+    """
+
+    def __init__(
+        self,
+        days: float | None = 1,
+        since: datetime | None = None,
+        now: datetime | None = None,
+    ):
+        if since is not None:
+            self.cutoff = since
+        elif days is not None:
+            self.cutoff = (now or datetime.now()) - timedelta(days=float(days))
+        else:
+            self.cutoff = None
+
+        # listing page url -> {"pending": articles not parsed yet, "next": request, "old": bool}
+        self._pages: Dict[str, Dict[str, Any]] = {}
+        self._requested = set()
+
+    @classmethod
+    def for_spider(cls, spider) -> "RecencyCutoff":
+        """
+        Cutoff from spider arguments (`-a days=3`, `-a since=2025-01-01`)
+        or the RECENCY_DAYS / RECENCY_SINCE settings. Default: 1 day.
+        """
+        crawler = getattr(spider, "crawler", None)
+        settings = crawler.settings if crawler is not None else {}
+
+        since = getattr(spider, "since", None) or settings.get("RECENCY_SINCE")
+        days = getattr(spider, "days", None) or settings.get("RECENCY_DAYS", 1)
+
+        if since:
+            return cls(since=datetime.fromisoformat(str(since)))
+        return cls(days=days)
+
+    # -----------------------------------------------------
+    # Public API
+    # -----------------------------------------------------
+    def is_recent(self, date: datetime | None) -> bool:
+        return date is None or self.cutoff is None or date >= self.cutoff
+
+    def continue_paging(self, dates: Iterable[datetime | None]) -> bool:
+        """True if every dated article of a listing page is recent."""
+        return all(self.is_recent(date) for date in dates)
+
+    def first_request(self, url: str) -> bool:
+        """
+        True the first time an article url is seen, so an article listed on
+        two pages is requested once (and never left to the dupefilter, which
+        would drop it without calling back).
+        """
+        key = canonical_url(url)
+        if key in self._requested:
+            return False
+        self._requested.add(key)
+        return True
+
+    def defer_next_page(self, page_url: str, pending: int, next_request):
+        """
+        Hold `next_request` until the `pending` articles of `page_url` are
+        parsed. Returns the request right away if there is nothing to wait for.
+        """
+        if next_request is None or pending <= 0:
+            return next_request
+        self._pages[page_url] = {"pending": pending, "next": next_request, "old": False}
+        return None
+
+    def article_done(self, page_url: str | None, date: datetime | None = None, *, old: bool = False):
+        """
+        Record a parsed (or failed) article of a listing page; `old` marks
+        it as past the cutoff regardless of `date`. Returns the held
+        next-page request once the whole page is done and recent.
+        """
+        page = self._pages.get(page_url)
+        if page is None:
+            return None
+
+        page["pending"] -= 1
+        page["old"] = page["old"] or old or not self.is_recent(date)
+        if page["pending"] > 0:
+            return None
+
+        del self._pages[page_url]
+        return None if page["old"] else page["next"]
+
+
+class RecencyCutoffMixin:
+    """Gives a spider a lazily built `cutoff` (see `RecencyCutoff.for_spider`)."""
+
+    _cutoff: RecencyCutoff | None = None
+
+    @property
+    def cutoff(self) -> RecencyCutoff:
+        if self._cutoff is None:
+            self._cutoff = RecencyCutoff.for_spider(self)
+        return self._cutoff
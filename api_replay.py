@@ -0,0 +1,237 @@
+from typing import Dict, Any, Iterator
+import json
+import os
+import random
+import zipfile
+
+from scrapy import signals
+from scrapy.core.downloader.handlers.base import BaseDownloadHandler
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+from scrapy.utils.defer import maybe_deferred_to_future
+
+RECORD_MIDDLEWARE = "api_replay.RecordResponsesMiddleware"
+REPLAY_HANDLER = "api_replay.ReplayDownloadHandler"
+
+
+def record_settings(archive_dir: str) -> Dict[str, Any]:
+    """
+    Crawl settings recording every downloaded response into
+    `{archive_dir}/{spider}.zip`. The seen-url frontier and conditional
+    requests are disabled so the archive holds every listing page in full
+    and every article on them.
+    """
+    return {
+        "REPLAY_ARCHIVE": os.path.join(archive_dir, "{spider}.zip"),
+        "DOWNLOADER_MIDDLEWARES": {RECORD_MIDDLEWARE: 950},
+        "SEEN_URL_DIR": "",
+        "CONDITIONAL_HTTP_DIR": "",
+    }
+
+
+def replay_settings(archive_dir: str, latency: float = 0.0, jitter: float = 0.0) -> Dict[str, Any]:
+    """
+    Crawl settings serving every request from `{archive_dir}/{spider}.zip`
+    with `latency` seconds (± `jitter` fraction) of simulated download time
+    instead of the network. Politeness delays are turned off.
+    """
+    return {
+        "REPLAY_ARCHIVE": os.path.join(archive_dir, "{spider}.zip"),
+        "REPLAY_LATENCY": latency,
+        "REPLAY_LATENCY_JITTER": jitter,
+        "DOWNLOAD_HANDLERS": {"http": REPLAY_HANDLER, "https": REPLAY_HANDLER},
+        "SEEN_URL_DIR": "",
+        "CONDITIONAL_HTTP_DIR": "",
+        "AUTOTHROTTLE_ENABLED": False,
+        "DOWNLOAD_DELAY": 0,
+        "ROBOTSTXT_OBEY": False,
+    }
+
+
+class ResponseArchive:
+    """
+    Compact archive of recorded responses (one deflated zip member each).
+
+    Members are named by request fingerprint; each holds a JSON header line
+    followed by the raw response body:
+      {"url": "...", "status": 200, "headers": {"Content-Type": ["text/html"]},
+       "callback": "parse_article", "cb_kwargs": {"title": "..."}}
+      <body bytes>
+
+    Responses are stored as they left the download handler (before
+    decompression and redirect handling), so replaying them runs the same
+    middlewares as the live crawl.
+    """
+
+    def __init__(self, path: str, mode: str = "r"):
+        self.path = path
+        if mode == "a":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._zip = zipfile.ZipFile(path, mode, compression=zipfile.ZIP_DEFLATED, compresslevel=6)
+        self._names = set(self._zip.namelist())
+
+    def __enter__(self) -> "ResponseArchive":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __contains__(self, fingerprint: str) -> bool:
+        return fingerprint in self._names
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    # -----------------------------------------------------
+    # Public API
+    # -----------------------------------------------------
+    def add(self, fingerprint: str, request, response) -> bool:
+        """Store a response unless its request is already archived."""
+        if fingerprint in self._names:
+            return False
+
+        header = {
+            "url": response.url,
+            "status": response.status,
+            "headers": {
+                k.decode("latin-1"): [v.decode("latin-1") for v in values]
+                for k, values in response.headers.items()
+            },
+            "callback": getattr(request.callback, "__name__", None),
+            "cb_kwargs": request.cb_kwargs,
+        }
+        data = json.dumps(header, ensure_ascii=False, default=str).encode("utf-8") + b"\n" + response.body
+        self._zip.writestr(fingerprint, data)
+        self._names.add(fingerprint)
+        return True
+
+    def get(self, fingerprint: str) -> Dict[str, Any] | None:
+        """Header of a recorded response with its raw `body`, or None."""
+        if fingerprint not in self._names:
+            return None
+        return self._decode(self._zip.read(fingerprint))
+
+    def entries(self) -> Iterator[Dict[str, Any]]:
+        for name in self._zip.namelist():
+            entry = self._decode(self._zip.read(name))
+            entry["fingerprint"] = name
+            yield entry
+
+    def close(self):
+        self._zip.close()
+
+    # -----------------------------------------------------
+    # Internal helpers
+    # -----------------------------------------------------
+    @staticmethod
+    def _decode(data: bytes) -> Dict[str, Any]:
+        header, _, body = data.partition(b"\n")
+        entry = json.loads(header)
+        entry["body"] = body
+        return entry
+
+
+def build_response(entry: Dict[str, Any], request=None):
+    """Scrapy response (of the matching class) for an archived entry."""
+    headers = Headers(entry["headers"])
+    respcls = responsetypes.from_args(headers=headers, url=entry["url"], body=entry["body"])
+    return respcls(
+        url=entry["url"],
+        status=entry["status"],
+        headers=headers,
+        body=entry["body"],
+        request=request,
+        flags=["replay"],
+    )
+
+
+def _archive_path(crawler) -> str:
+    template = crawler.settings.get("REPLAY_ARCHIVE")
+    if not template:
+        raise NotConfigured("REPLAY_ARCHIVE is not set")
+    return template.format(spider=crawler.spidercls.name)
+
+
+class RecordResponsesMiddleware:
+    """
+    Downloader middleware archiving every response for offline replay.
+
+    Enable it close to the download handler (e.g. 950) so responses are
+    recorded raw. See `record_settings()`.
+
+    Settings:
+      REPLAY_ARCHIVE  archive path, "{spider}" is replaced by the spider name
+
+    Stats:
+      replay/recorded
+    """
+
+    def __init__(self, crawler, path: str):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.archive = ResponseArchive(path, mode="a")
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        mw = cls(crawler, _archive_path(crawler))
+        crawler.signals.connect(mw.spider_closed, signal=signals.spider_closed)
+        return mw
+
+    def process_response(self, request, response):
+        fingerprint = self.crawler.request_fingerprinter.fingerprint(request).hex()
+        if self.archive.add(fingerprint, request, response):
+            self.stats.inc_value("replay/recorded")
+        return response
+
+    def spider_closed(self, spider):
+        self.archive.close()
+        spider.logger.info("Recorded %d responses to %s", len(self.archive), self.archive.path)
+
+
+class ReplayDownloadHandler(BaseDownloadHandler):
+    """
+    Download handler serving requests from a `ResponseArchive` instead of
+    the network. Unarchived requests (or all of them, if the archive does
+    not exist) get an empty 404.
+
+    Settings:
+      REPLAY_ARCHIVE         archive path, "{spider}" is replaced by the spider name
+      REPLAY_LATENCY         simulated download time in seconds (default 0)
+      REPLAY_LATENCY_JITTER  relative jitter of the latency, e.g. 0.5 for ±50%
+
+    Stats:
+      replay/hit, replay/miss
+    """
+
+    def __init__(self, crawler):
+        super().__init__(crawler)
+        path = _archive_path(crawler)
+        self.archive = ResponseArchive(path) if os.path.exists(path) else None
+        self.latency = crawler.settings.getfloat("REPLAY_LATENCY", 0.0)
+        self.jitter = crawler.settings.getfloat("REPLAY_LATENCY_JITTER", 0.0)
+
+    async def download_request(self, request):
+        from twisted.internet import reactor
+        from twisted.internet.task import deferLater
+
+        latency = self.latency * (1 + random.uniform(-self.jitter, self.jitter)) if self.latency else 0.0
+        if latency > 0:
+            await maybe_deferred_to_future(deferLater(reactor, latency, lambda: None))
+        request.meta["download_latency"] = latency
+
+        fingerprint = self.crawler.request_fingerprinter.fingerprint(request).hex()
+        entry = self.archive.get(fingerprint) if self.archive is not None else None
+        if entry is None:
+            self.crawler.stats.inc_value("replay/miss")
+            return build_response(
+                {"url": request.url, "status": 404, "headers": {}, "body": b""},
+                request,
+            )
+
+        self.crawler.stats.inc_value("replay/hit")
+        return build_response(entry, request)
+
+    async def close(self):
+        if self.archive is not None:
+            self.archive.close()
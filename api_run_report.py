@@ -0,0 +1,230 @@
+from typing import List, Dict, Any, Callable, Iterable, Tuple
+from datetime import datetime
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+
+# Scrapy stats kept per spider
+CRAWL_STATS = {
+    "requests": "downloader/request_count",
+    "request_bytes": "downloader/request_bytes",
+    "responses": "downloader/response_count",
+    "response_bytes": "downloader/response_bytes",
+    "retries": "retry/count",
+    "retries_exhausted": "retry/max_reached",
+    "items": "item_scraped_count",
+    "errors": "log_count/ERROR",
+    "elapsed_seconds": "elapsed_time_seconds",
+    "latency_mean": "latency/mean",
+    "latency_p50": "latency/p50",
+    "latency_p95": "latency/p95",
+    "latency_max": "latency/max",
+    "finish_reason": "finish_reason",
+}
+
+# Metrics compared between reports: (path suffix, True if higher is better)
+COMPARED = [
+    ("wall_seconds", False),
+    ("cpu_seconds", False),
+    ("process_peak_rss_mb", False),
+    ("docs_per_second", True),
+    ("tokens_per_second", True),
+    ("latency_mean", False),
+    ("latency_p95", False),
+    ("retries", False),
+    ("errors", False),
+    ("output_bytes", False),
+]
+
+
+def process_peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process so far (ru_maxrss is KiB on
+    Linux, bytes on macOS). It never decreases, so a stage's value is the
+    peak of the run up to the end of that stage, not of the stage itself.
+    """
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        rss /= 1024
+    return round(rss / 1024, 1)
+
+
+class RunReport:
+    """
+    Structured telemetry of one pipeline run, saved as JSON.
+
+    The report is rewritten after every stage, so a resumed run keeps the
+    numbers of the stages it skips.
+
+    Report:
+      {
+        "run": "20250101",
+        "stages": {"crawl": {"wall_seconds": 812.4, "cpu_seconds": 95.1, "process_peak_rss_mb": 1630.2, ...}},
+        "sources": {"SecurityWeek": {"articles": 40, "new": 12, "changed": 1, "unchanged": 27, "tokens": 18230}},
+        "crawl": {"SecurityWeek": {"requests": 52, "response_bytes": 3120044, "latency_p95": 0.81, ...}},
+        "inference": {"docs": 13, "tokens": 18230, "seconds": 41.7, "docs_per_second": 0.31, "tokens_per_second": 437.2},
+        "output": {"files": 17, "output_bytes": 2291113},
+        "process_peak_rss_mb": 1630.2
+      }
+    """
+
+    def __init__(self, path: str, run: str | None = None):
+        self.path = path
+        self.data: Dict[str, Any] = {
+            "run": run,
+            "stages": {},
+            "sources": {},
+            "crawl": {},
+            "inference": {"docs": 0, "tokens": 0, "seconds": 0.0},
+            "output": {},
+        }
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.data.update(json.load(f))
+
+    # -----------------------------------------------------
+    # Public API
+    # -----------------------------------------------------
+    def timed(self, stage: str, fn: Callable[[], Any]) -> Callable[[], Any]:
+        """Wrap a stage callable to record its wall time, CPU time and the process's peak RSS so far."""
+        def run():
+            wall, cpu = time.perf_counter(), time.process_time()
+            result = fn()
+            self.data["stages"][stage] = {
+                "finished_at": datetime.now().isoformat(timespec="seconds"),
+                "wall_seconds": round(time.perf_counter() - wall, 3),
+                "cpu_seconds": round(time.process_time() - cpu, 3),
+                "process_peak_rss_mb": process_peak_rss_mb(),
+            }
+            self.save()
+            return result
+        return run
+
+    def set(self, section: str, values: Dict[str, Any]):
+        self.data[section] = values
+
+    def add_sources(self, entries: Iterable[Dict[str, Any]]):
+        """Count articles per source and status from article manifest entries."""
+        sources = self.data["sources"]
+        for source in sources.values():
+            for status in ("articles", "new", "changed", "unchanged"):
+                source[status] = 0
+
+        for entry in entries:
+            source = sources.setdefault(entry.get("source") or "unknown", {"tokens": 0})
+            source["articles"] = source.get("articles", 0) + 1
+            source[entry["status"]] = source.get(entry["status"], 0) + 1
+
+    def add_inference(self, docs: int, seconds: float, tokens_by_source: Dict[str, int]):
+        """Record one inference batch."""
+        inference = self.data["inference"]
+        inference["docs"] += docs
+        inference["seconds"] += seconds
+        for source, tokens in tokens_by_source.items():
+            inference["tokens"] += tokens
+            entry = self.data["sources"].setdefault(source or "unknown", {})
+            entry["tokens"] = entry.get("tokens", 0) + tokens
+
+        if inference["seconds"]:
+            inference["docs_per_second"] = round(inference["docs"] / inference["seconds"], 3)
+            inference["tokens_per_second"] = round(inference["tokens"] / inference["seconds"], 1)
+
+    def add_crawl_stats(self, stats: Dict[str, Dict[str, Any]]):
+        """Keep the relevant Scrapy stats of every spider (see CRAWL_STATS)."""
+        for source, spider_stats in stats.items():
+            self.data["crawl"][source] = {
+                name: spider_stats[key]
+                for name, key in CRAWL_STATS.items()
+                if key in spider_stats
+            }
+
+    def add_outputs(self, output_dir: str):
+        """Count files and bytes written to the output directory."""
+        sizes = [entry.stat().st_size for entry in os.scandir(output_dir) if entry.is_file()]
+        self.data["output"] = {"files": len(sizes), "output_bytes": sum(sizes)}
+
+    def save(self) -> str:
+        self.data["process_peak_rss_mb"] = max(self.data.get("process_peak_rss_mb", 0), process_peak_rss_mb())
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=4, default=str)
+        os.replace(tmp_path, self.path)
+        return self.path
+
+
+# =========================================================
+# Comparing reports
+# =========================================================
+
+def _flatten(data: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    flat = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{path}."))
+        else:
+            flat[path] = value
+    return flat
+
+
+def compare_reports(
+    old: Dict[str, Any],
+    new: Dict[str, Any],
+    threshold: float = 0.1,
+) -> List[Tuple[str, float, float, float, bool]]:
+    """
+    Compare the metrics listed in COMPARED between two reports.
+
+    Returns:
+        (metric, old value, new value, relative change, regression) per
+        metric present in both, where a regression is a change for the
+        worse of more than `threshold`.
+    """
+    old_flat, new_flat = _flatten(old), _flatten(new)
+    rows = []
+
+    for path in sorted(old_flat.keys() & new_flat.keys()):
+        higher_is_better = next(
+            (better for suffix, better in COMPARED if path.rsplit(".", 1)[-1] == suffix),
+            None,
+        )
+        a, b = old_flat[path], new_flat[path]
+        if higher_is_better is None or not isinstance(a, (int, float)) or not isinstance(b, (int, float)):
+            continue
+
+        change = (b - a) / a if a else (0.0 if b == a else float("inf"))
+        worse = -change if higher_is_better else change
+        rows.append((path, a, b, change, worse > threshold))
+
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two run reports and flag regressions.")
+    parser.add_argument("old", help="Baseline {timestamp}_run_report.json")
+    parser.add_argument("new", help="Report to check")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative change counted as a regression (default 0.1)")
+    parser.add_argument("--all", action="store_true", help="Show unchanged metrics too")
+    args = parser.parse_args()
+
+    with open(args.old, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+
+    rows = compare_reports(old, new, args.threshold)
+    regressions = [row for row in rows if row[4]]
+
+    for path, a, b, change, regression in rows:
+        if not (args.all or regression or abs(change) > args.threshold):
+            continue
+        flag = "REGRESSION" if regression else ""
+        print(f"{path:<48} {a:>14,.3f} {b:>14,.3f} {change:>+8.1%}  {flag}")
+
+    print(f"{len(regressions)} regressions in {len(rows)} metrics (threshold {args.threshold:.0%}).")
+    sys.exit(1 if regressions else 0)
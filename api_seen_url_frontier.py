@@ -0,0 +1,235 @@
+from typing import Dict
+import hashlib
+import math
+import mmap
+import os
+import sqlite3
+import struct
+import time
+
+from scrapy import signals
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+
+from api_article_store import canonical_url
+
+# magic, number of hash functions, number of bits
+HEADER = struct.Struct("<4sIQ")
+MAGIC = b"SBF1"
+
+
+class BloomFilter:
+    """
+    On-disk Bloom filter, memory-mapped so lookups never touch Python I/O.
+
+    Sized for `capacity` keys at a false-positive rate of `error_rate`;
+    the sizing is fixed when the file is first created.
+    """
+
+    def __init__(self, path: str, capacity: int = 1_000_000, error_rate: float = 0.001):
+        self.path = path
+
+        if not os.path.exists(path):
+            n_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+            n_hashes = max(1, round(n_bits / capacity * math.log(2)))
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, n_hashes, n_bits))
+                f.truncate(HEADER.size + (n_bits + 7) // 8)
+
+        self._file = open(path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+        magic, self.n_hashes, self.n_bits = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a Bloom filter file")
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.n_hashes):
+            yield (h1 + i * h2) % self.n_bits
+
+    def __contains__(self, key: str) -> bool:
+        for pos in self._positions(key):
+            if not self._map[HEADER.size + (pos >> 3)] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            offset = HEADER.size + (pos >> 3)
+            self._map[offset] = self._map[offset] | (1 << (pos & 7))
+
+    def close(self):
+        self._map.flush()
+        self._map.close()
+        self._file.close()
+
+
+class SeenUrlStore:
+    """
+    Persistent set of article urls stored by earlier runs.
+
+    The Bloom filter answers most lookups ("definitely not seen") from
+    memory; only its positives are confirmed against the exact SQLite
+    table, so false positives never drop a new article.
+
+    Layout:
+      {directory}/seen.bloom
+      {directory}/seen.sqlite3
+    """
+
+    _open_stores: Dict[str, "SeenUrlStore"] = {}
+
+    def __init__(self, directory: str, capacity: int = 1_000_000, error_rate: float = 0.001):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.bloom = BloomFilter(os.path.join(directory, "seen.bloom"), capacity, error_rate)
+
+        # One thread at a time, but not always the one that opened it: the
+        # pipeline adds urls from its inference thread
+        self.db = sqlite3.connect(os.path.join(directory, "seen.sqlite3"), check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS seen (url TEXT PRIMARY KEY, first_seen REAL NOT NULL)"
+        )
+        self._pending = 0
+        self._users = 0
+
+    @classmethod
+    def open(cls, directory: str, **kwargs) -> "SeenUrlStore":
+        """Shared instance per directory, so spiders in one process use one filter."""
+        directory = os.path.abspath(directory)
+        store = cls._open_stores.get(directory)
+        if store is None:
+            store = cls._open_stores[directory] = cls(directory, **kwargs)
+        store._users += 1
+        return store
+
+    def release(self):
+        self._users -= 1
+        if self._users <= 0:
+            self._open_stores.pop(self.directory, None)
+            self.close()
+
+    # -----------------------------------------------------
+    # Public API
+    # -----------------------------------------------------
+    def check(self, url: str, refresh_seconds: float = 0) -> str:
+        """
+        Classify a url as "new" (Bloom negative), "false_positive"
+        (Bloom positive, not in the exact store), "refresh" (first seen
+        less than `refresh_seconds` ago) or "seen".
+        """
+        key = canonical_url(url)
+        if key not in self.bloom:
+            return "new"
+
+        row = self.db.execute("SELECT first_seen FROM seen WHERE url = ?", (key,)).fetchone()
+        if row is None:
+            return "false_positive"
+        return "refresh" if row[0] > time.time() - refresh_seconds else "seen"
+
+    def __contains__(self, url: str) -> bool:
+        return self.check(url) == "seen"
+
+    def add(self, url: str):
+        key = canonical_url(url)
+        self.bloom.add(key)
+        self.db.execute(
+            "INSERT OR IGNORE INTO seen (url, first_seen) VALUES (?, ?)",
+            (key, time.time()),
+        )
+        self._pending += 1
+        if self._pending >= 100:
+            self.flush()
+
+    def flush(self):
+        self.db.commit()
+        self._pending = 0
+
+    def close(self):
+        self.flush()
+        self.db.close()
+        self.bloom.close()
+
+
+class SeenUrlDownloaderMiddleware:
+    """
+    Drop article requests for urls stored by a previous run.
+
+    Only requests whose callback is listed in SEEN_URL_CALLBACKS (default
+    `parse_article`) are checked, so listing pages are always refreshed.
+    The middleware only reads the store: urls are added by whoever stores
+    the articles (classify_everything, once `ArticleStore.ingest` has
+    them), so an article downloaded by a crawl that crashed, or whose run
+    was never resumed, is fetched again. Articles first stored less than
+    SEEN_URL_REFRESH_DAYS ago are fetched again too, so that edits made
+    shortly after publication reach the article store as new revisions.
+
+    Settings:
+      SEEN_URL_DIR           directory shared by all spiders (required)
+      SEEN_URL_CALLBACKS     callback names treated as article requests
+      SEEN_URL_REFRESH_DAYS  days after which a stored url is skipped (default 0)
+      SEEN_URL_CAPACITY      Bloom filter sizing (keys)
+      SEEN_URL_ERROR_RATE    Bloom filter false-positive rate
+
+    Stats:
+      seen_url/avoided, seen_url/bloom_negative, seen_url/bloom_false_positive,
+      seen_url/refreshed
+    """
+
+    def __init__(
+        self, crawler, directory: str, callbacks, capacity: int, error_rate: float, refresh_days: float = 0
+    ):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.callbacks = set(callbacks)
+        self.refresh_seconds = refresh_days * 86400
+        self.store = SeenUrlStore.open(directory, capacity=capacity, error_rate=error_rate)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.get("SEEN_URL_DIR"):
+            raise NotConfigured("SEEN_URL_DIR is not set")
+
+        s = cls(
+            crawler,
+            settings.get("SEEN_URL_DIR"),
+            settings.getlist("SEEN_URL_CALLBACKS", ["parse_article"]),
+            settings.getint("SEEN_URL_CAPACITY", 1_000_000),
+            settings.getfloat("SEEN_URL_ERROR_RATE", 0.001),
+            settings.getfloat("SEEN_URL_REFRESH_DAYS", 0),
+        )
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
+        return s
+
+    def _is_article(self, request) -> bool:
+        return getattr(request.callback, "__name__", None) in self.callbacks
+
+    def process_request(self, request):
+        if not self._is_article(request):
+            return None
+
+        status = self.store.check(request.url, self.refresh_seconds)
+        if status == "new":
+            self.stats.inc_value("seen_url/bloom_negative")
+            return None
+        if status == "false_positive":
+            self.stats.inc_value("seen_url/bloom_false_positive")
+            return None
+        if status == "refresh":
+            self.stats.inc_value("seen_url/refreshed")
+            return None
+
+        self.stats.inc_value("seen_url/avoided")
+        raise IgnoreRequest(f"Already stored by an earlier run: {request.url}")
+
+    def spider_closed(self, spider):
+        self.store.flush()
+        self.store.release()
+        spider.logger.info(
+            "Seen-url frontier: %d article requests avoided",
+            self.stats.get_value("seen_url/avoided", 0),
+        )
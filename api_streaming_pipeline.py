@@ -0,0 +1,190 @@
+from typing import List, Dict, Any, Callable
+from collections import deque
+import queue
+import threading
+import time
+
+from itemadapter import ItemAdapter
+from scrapy.utils.defer import maybe_deferred_to_future
+
+from api_text_normalizer import normalize_body
+
+_END = object()
+_STREAMS: Dict[str, "ArticleStream"] = {}
+
+
+def register_stream(name: str, stream: "ArticleStream") -> "ArticleStream":
+    """Make a stream reachable from Scrapy pipelines via the ARTICLE_STREAM setting."""
+    _STREAMS[name] = stream
+    return stream
+
+
+def get_stream(name: str) -> "ArticleStream":
+    try:
+        return _STREAMS[name]
+    except KeyError:
+        raise KeyError(f"No article stream registered as '{name}'") from None
+
+
+class ArticleStream:
+    """
+    Bounded hand-off of scraped articles from the Twisted reactor to an
+    inference thread.
+
+    The reactor side never blocks: `put()` returns a Deferred that fires
+    once the article is in the queue. While the queue is full those
+    Deferreds stay pending, Scrapy's scraper slot fills up and the engine
+    stops scheduling new downloads, so the crawl slows to the pace of
+    inference instead of buffering unbounded work.
+    """
+
+    def __init__(self, maxsize: int = 32):
+        self.queue = queue.Queue(maxsize)
+        self._waiting = deque()
+        self._ended = False
+        self.stats = {
+            "articles": 0,
+            "backpressure_waits": 0,
+            "backpressure_seconds": 0.0,
+        }
+
+    # -----------------------------------------------------
+    # Producer side (reactor thread)
+    # -----------------------------------------------------
+    def put(self, item: Dict[str, Any]):
+        from twisted.internet.defer import Deferred
+
+        d = Deferred()
+        self.stats["articles"] += 1
+
+        if not self._waiting:
+            try:
+                self.queue.put_nowait(item)
+                d.callback(None)
+                return d
+            except queue.Full:
+                pass
+
+        self.stats["backpressure_waits"] += 1
+        self._waiting.append((item, d, time.perf_counter()))
+        return d
+
+    def _drain_waiting(self):
+        while self._waiting:
+            item, d, since = self._waiting[0]
+            try:
+                self.queue.put_nowait(item)
+            except queue.Full:
+                return
+            self._waiting.popleft()
+            self.stats["backpressure_seconds"] += time.perf_counter() - since
+            d.callback(None)
+
+    def finish(self):
+        """Signal end of input. Call once every crawler has closed."""
+        self.queue.put(_END)
+
+    # -----------------------------------------------------
+    # Consumer side (inference thread)
+    # -----------------------------------------------------
+    def get_batch(self, max_items: int, timeout: float) -> List[Dict[str, Any]] | None:
+        """
+        Block for the next article, then gather up to `max_items` within
+        `timeout` seconds. Returns None once the stream is finished.
+        """
+        if self._ended:
+            return None
+
+        batch = []
+        item = self.queue.get()
+        deadline = time.perf_counter() + timeout
+
+        while item is not _END:
+            batch.append(item)
+            if len(batch) >= max_items:
+                break
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+        else:
+            self._ended = True
+
+        self._notify_producers()
+        return batch or None
+
+    def _notify_producers(self):
+        from twisted.internet import reactor
+
+        if reactor.running:
+            reactor.callFromThread(self._drain_waiting)
+
+
+class StreamingInferenceConsumer(threading.Thread):
+    """
+    Inference thread pulling article batches from an `ArticleStream`.
+
+    `handle_batch` runs the model and writes results. If it raises, the
+    error is kept in `self.error` and the stream is still drained so the
+    crawl can finish instead of waiting on a full queue.
+    """
+
+    def __init__(
+        self,
+        stream: ArticleStream,
+        handle_batch: Callable[[List[Dict[str, Any]]], None],
+        *,
+        batch_size: int = 8,
+        batch_timeout: float = 2.0,
+    ):
+        super().__init__(name="inference-consumer", daemon=True)
+        self.stream = stream
+        self.handle_batch = handle_batch
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.error: BaseException | None = None
+        self.busy_seconds = 0.0
+
+    def run(self):
+        while True:
+            batch = self.stream.get_batch(self.batch_size, self.batch_timeout)
+            if batch is None:
+                return
+            if self.error is not None:
+                continue
+
+            started = time.perf_counter()
+            try:
+                self.handle_batch(batch)
+            except BaseException as exc:
+                self.error = exc
+            self.busy_seconds += time.perf_counter() - started
+
+
+class ArticleStreamPipeline:
+    """
+    Item pipeline pushing normalized articles into the `ArticleStream`
+    named by the ARTICLE_STREAM setting. Subclasses set `source`.
+    """
+
+    source: str | None = None
+
+    def __init__(self, stream: ArticleStream):
+        self.stream = stream
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(get_stream(crawler.settings.get("ARTICLE_STREAM")))
+
+    async def process_item(self, item):
+        article = ItemAdapter(item).asdict()
+        article["source"] = self.source
+
+        # Spiders normally normalize already; normalize_body() detects that
+        # and returns the body untouched.
+        if isinstance(article.get("body"), str):
+            article["body"] = normalize_body(article["body"])
+
+        await maybe_deferred_to_future(self.stream.put(article))
+        return item
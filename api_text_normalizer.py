@@ -0,0 +1,71 @@
+import re
+
+# A newline not ending a sentence is a soft line break inside a paragraph
+_SOFT_NEWLINE_RE = re.compile(r'(?<![.!?])\n')
+
+# Placeholder for hard line breaks while soft ones are replaced
+_MARK = "\x00"
+
+
+def normalize_body(body: str) -> str:
+    """
+    Normalize an article body.
+
+    Equivalent to the chain previously copy-pasted in every spider:
+
+        body = re.sub(r'(?<![.!?])\\n', ' ', body)
+        body = re.sub(r'[\\t\\r]', '', body)
+        body = re.sub(r'\\n+', '\\n', body)
+        body = body.replace(u'\\xa0', u' ')
+
+    Hard breaks (after `.`, `!` or `?`) are masked, the remaining soft
+    breaks become spaces and the masks are restored, all with `str.replace`,
+    which runs several times faster than the look-behind regex. The soft
+    break pass must see the original text (a `\\r` before `\\n` makes it a
+    soft break), so `\\t` / `\\r` are deleted afterwards. Every newline left
+    then follows sentence punctuation, so the `\\n+` collapse is not needed.
+
+    Idempotent; already-normalized input is returned as is.
+    """
+    if is_normalized(body):
+        return body
+
+    if _MARK in body:
+        body = _SOFT_NEWLINE_RE.sub(" ", body)
+    else:
+        body = (
+            body.replace(".\n", "." + _MARK)
+                .replace("!\n", "!" + _MARK)
+                .replace("?\n", "?" + _MARK)
+                .replace("\n", " ")
+                .replace(_MARK, "\n")
+        )
+
+    return body.replace("\t", "").replace("\r", "").replace("\xa0", " ")
+
+
+def is_normalized(body: str) -> bool:
+    """
+    True if `normalize_body(body)` would return `body` unchanged.
+
+    Uses substring counts instead of a regex scan: every newline must be
+    preceded by sentence punctuation and no tab, CR or nbsp may remain.
+    """
+    if "\t" in body or "\r" in body or "\xa0" in body:
+        return False
+
+    newlines = body.count("\n")
+    if not newlines:
+        return True
+    if body.startswith("\n"):
+        return False
+    return newlines == body.count(".\n") + body.count("!\n") + body.count("?\n")
+
+
+def normalize_body_legacy(body: str) -> str:
+    """The original four-step chain, kept as the reference for benchmarks."""
+    body = re.sub(r'(?<![.!?])\n', ' ', body)
+    body = re.sub(r'[\t\r]', '', body)
+    body = re.sub(r'\n+', '\n', body)
+    body = body.replace(u'\xa0', u' ')
+    return body
@@ -0,0 +1,452 @@
+from typing import List, Dict, Any, Iterable, Tuple
+from datetime import datetime
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import unicodedata
+
+from api_entity_dictionary import EntityDictionary
+
+# Delta automaton size (patterns) above which it is folded into the main one
+COMPACT_MIN = 256
+COMPACT_RATIO = 0.1
+SNIPPET_CHARS = 80
+
+WatchEntry = Tuple[str, str]   # (list name, term as written in the watchlist)
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton over normalized patterns.
+
+    The patterns are inserted into a trie (`add()`), then `build()` links
+    every node to the longest proper suffix that is also a trie node
+    (`fail`) and to the nearest such suffix ending a pattern (`dict_link`),
+    so a text is scanned once, one `step()` per character, whatever the
+    number of patterns.
+
+    Usage:
+        automaton = AhoCorasick(["acme corp", "globex"])
+        state = 0
+        for ch in text:
+            state = automaton.step(state, ch)
+            for pattern_id in automaton.outputs(state): ...
+    """
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        self.patterns: List[str] = []
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.terminal: List[int] = [-1]  # pattern id ending at the node, or -1
+        self.dict_link: List[int] = [0]
+        self.built = True
+        for pattern in patterns:
+            self.add(pattern)
+        self.build()
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    # -----------------------------------------------------
+    # Public API
+    # -----------------------------------------------------
+    def add(self, pattern: str) -> int:
+        """Insert a pattern (call `build()` before matching); returns its id."""
+        if not pattern:
+            raise ValueError("Empty pattern")
+        node = 0
+        for ch in pattern:
+            child = self.goto[node].get(ch)
+            if child is None:
+                child = len(self.goto)
+                self.goto[node][ch] = child
+                self.goto.append({})
+                self.fail.append(0)
+                self.terminal.append(-1)
+                self.dict_link.append(0)
+            node = child
+
+        if self.terminal[node] == -1:
+            self.terminal[node] = len(self.patterns)
+            self.patterns.append(pattern)
+            self.built = False
+        return self.terminal[node]
+
+    def build(self):
+        """Compute the failure and dictionary links, breadth first."""
+        queue = list(self.goto[0].values())
+        for node in queue:
+            self.fail[node] = 0
+            self.dict_link[node] = 0
+
+        for node in queue:
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while ch not in self.goto[state] and state:
+                    state = self.fail[state]
+                fail = self.goto[state].get(ch, 0)
+                self.fail[child] = fail if fail != child else 0
+                self.dict_link[child] = fail if self.terminal[fail] != -1 else self.dict_link[fail]
+        self.built = True
+
+    def step(self, state: int, ch: str) -> int:
+        goto = self.goto
+        while ch not in goto[state] and state:
+            state = self.fail[state]
+        return goto[state].get(ch, 0)
+
+    def outputs(self, state: int) -> List[int]:
+        """Ids of the patterns ending at `state` (longest first)."""
+        found = []
+        if self.terminal[state] != -1:
+            found.append(self.terminal[state])
+        state = self.dict_link[state]
+        while state:
+            found.append(self.terminal[state])
+            state = self.dict_link[state]
+        return found
+
+
+def fold(text: str) -> Tuple[str, List[int] | None, List[int] | None]:
+    """
+    Text folded like `EntityDictionary.normalize()` (NFKC, then casefold),
+    with the span in `text` of every folded character as start and end
+    offsets (None: the same index, one character).
+
+    NFKC composes across characters ("e" + U+0301 -> "é"), so the text is
+    normalized by clusters: a character joins the previous cluster when it
+    is a combining mark or composes with it. Every character folded from a
+    cluster maps to the whole cluster.
+    """
+    if text.isascii():
+        return text.lower(), None, None
+
+    clusters: List[Tuple[int, int]] = []
+    start = 0
+    for i in range(1, len(text)):
+        ch = text[i]
+        if ch < "\u0300" or not (
+            unicodedata.combining(ch)
+            or unicodedata.normalize("NFKC", text[start:i + 1])
+            != unicodedata.normalize("NFKC", text[start:i]) + unicodedata.normalize("NFKC", ch)
+        ):
+            clusters.append((start, i))
+            start = i
+    if text:
+        clusters.append((start, len(text)))
+
+    chars, starts, ends = [], [], []
+    for start, end in clusters:
+        folded = unicodedata.normalize("NFKC", text[start:end]).casefold()
+        chars.append(folded)
+        starts.extend([start] * len(folded))
+        ends.extend([end] * len(folded))
+    return "".join(chars), starts, ends
+
+
+def load_watchlists(path: str) -> Dict[str, List[str]]:
+    """
+    Watchlists of a directory: one `{list}.txt` per list, one term per line
+    (blank lines and "#" comments ignored). A single file is one list.
+    """
+    files = [path] if os.path.isfile(path) else sorted(glob.glob(os.path.join(path, "*.txt")))
+    watchlists = {}
+    for file in files:
+        with open(file, encoding="utf-8") as f:
+            terms = [line.strip() for line in f]
+        watchlists[os.path.splitext(os.path.basename(file))[0]] = [
+            term for term in terms if term and not term.startswith("#")
+        ]
+    return watchlists
+
+
+class WatchlistMatcher:
+    """
+    Find watchlist terms in article bodies and predicted entities.
+
+    Terms are normalized like entity texts (`EntityDictionary.normalize`:
+    NFKC, casefold, collapsed whitespace) and must match whole words: a
+    term starting or ending with a letter or digit does not match inside
+    a longer word ("Acme" is not found in "Acmex").
+
+    `reload()` applies an edited watchlist without rebuilding the main
+    automaton: new terms go into a small delta automaton, scanned in the
+    same pass, and removed terms are masked. Once the delta or the masked
+    terms outgrow COMPACT_RATIO of the main automaton, everything is
+    rebuilt into one.
+    """
+
+    def __init__(self, watchlists: Dict[str, List[str]] | None = None):
+        self.entries: Dict[str, List[WatchEntry]] = {}
+        self.main = AhoCorasick()
+        self.delta = AhoCorasick()
+        self.masked: set = set()
+        self.stats = {"reloads": 0, "compactions": 0}
+        if watchlists:
+            self.entries = self._entries(watchlists)
+            self._compact()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # -----------------------------------------------------
+    # Public API
+    # -----------------------------------------------------
+    def reload(self, watchlists: Dict[str, List[str]]) -> Dict[str, int]:
+        """Switch to new watchlists; returns the number of terms added and removed."""
+        entries = self._entries(watchlists)
+        added = [term for term in entries if term not in self.entries]
+        removed = [term for term in self.entries if term not in entries]
+        self.entries = entries
+        self.stats["reloads"] += 1
+
+        self.masked.update(removed)
+        for term in added:
+            self.masked.discard(term)
+            if not self._indexed(term):
+                self.delta.add(term)
+        self.delta.build()
+
+        if not len(self.main) or len(self.delta) + len(self.masked) > max(COMPACT_MIN, COMPACT_RATIO * len(self.main)):
+            self._compact()
+        return {"added": len(added), "removed": len(removed)}
+
+    def find(self, text: str) -> List[Tuple[str, int, int]]:
+        """Whole-word matches as (normalized term, start, end) offsets into `text`."""
+        if not text or not self.entries:
+            return []
+
+        folded, starts, ends = fold(text)
+        automata = [self.main] if not len(self.delta) else [self.main, self.delta]
+        tables = [(a.goto, a.fail, a.terminal, a.dict_link, a) for a in automata]
+        states = [0] * len(automata)
+        # Folded position of every character fed to the automata
+        fed: List[int] = []
+        previous_space = True
+        matches = []
+
+        for position, ch in enumerate(folded):
+            if ch.isspace():
+                if previous_space:
+                    continue
+                ch = " "
+                previous_space = True
+            else:
+                previous_space = False
+            fed.append(position)
+
+            for a, (goto, fail, terminal, dict_link, automaton) in enumerate(tables):
+                # Inlined AhoCorasick.step()
+                state = states[a]
+                while ch not in goto[state] and state:
+                    state = fail[state]
+                state = states[a] = goto[state].get(ch, 0)
+                if terminal[state] == -1 and not dict_link[state]:
+                    continue
+
+                for pattern_id in automaton.outputs(state):
+                    term = automaton.patterns[pattern_id]
+                    if term in self.masked:
+                        continue
+                    start = fed[len(fed) - len(term)]
+                    start, end = (start, position + 1) if starts is None else (starts[start], ends[position])
+                    if self._whole_word(text, term, start, end):
+                        matches.append((term, start, end))
+
+        return matches
+
+    def match_item(self, item: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Terms found in a classified item's body and `predicted_result` texts.
+
+        Returns:
+            {"acme corp": {"body": [(start, end), ...], "labels": ["ORG"]}}
+        """
+        found: Dict[str, Dict[str, Any]] = {}
+        for term, start, end in self.find(item.get("body") or ""):
+            found.setdefault(term, {"body": [], "labels": []})["body"].append((start, end))
+
+        for label, texts in (item.get("predicted_result") or {}).items():
+            for text in texts:
+                for term, _, _ in self.find(text):
+                    labels = found.setdefault(term, {"body": [], "labels": []})["labels"]
+                    if label not in labels:
+                        labels.append(label)
+        return found
+
+    # -----------------------------------------------------
+    # Internal helpers
+    # -----------------------------------------------------
+    @staticmethod
+    def _entries(watchlists: Dict[str, List[str]]) -> Dict[str, List[WatchEntry]]:
+        entries: Dict[str, List[WatchEntry]] = {}
+        for name, terms in watchlists.items():
+            for term in terms:
+                key = EntityDictionary.normalize(term)
+                if key and (name, term) not in entries.get(key, []):
+                    entries.setdefault(key, []).append((name, term))
+        return entries
+
+    def _indexed(self, term: str) -> bool:
+        for automaton in (self.main, self.delta):
+            node = 0
+            for ch in term:
+                node = automaton.goto[node].get(ch)
+                if node is None:
+                    break
+            else:
+                if automaton.terminal[node] != -1:
+                    return True
+        return False
+
+    def _compact(self):
+        self.main = AhoCorasick(self.entries)
+        self.delta = AhoCorasick()
+        self.masked = set()
+        self.stats["compactions"] += 1
+
+    @staticmethod
+    def _whole_word(text: str, term: str, start: int, end: int) -> bool:
+        if term[0].isalnum() and start > 0 and text[start - 1].isalnum():
+            return False
+        if term[-1].isalnum() and end < len(text) and text[end].isalnum():
+            return False
+        return True
+
+
+class JSONLAlertSink:
+    """Append-only JSON Lines file of alert records, flushed after every batch."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def write(self, alerts: List[Dict[str, Any]]):
+        if not alerts:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            for alert in alerts:
+                f.write(json.dumps(alert, ensure_ascii=False) + "\n")
+
+
+class WatchlistAlerts:
+    """
+    Alerting stage run on classified articles (after `generate()` and
+    `to_column_dict()`): one alert per article and watchlist term found.
+
+    Watchlists are read from `path` (see `load_watchlists`) and reloaded
+    incrementally when a file changes, added or removed between batches.
+
+    Alert record:
+      {"alert_id": "3f1c...", "list": "vendors", "term": "ACME Corp",
+       "article_id": 12, "revision": "9ab2...", "title": "...", "url": "...",
+       "source": "SecurityWeek", "date": "June 10, 2025",
+       "body_matches": 2, "entity_labels": ["ORG"],
+       "snippet": "... ACME Corp patched ...", "alerted_at": "2025-06-10T08:15:02"}
+
+    `alert_id` is a hash of the article revision, list and term, so a
+    consumer can drop the repeats of a resumed run.
+    """
+
+    def __init__(self, path: str, sink: JSONLAlertSink | None = None):
+        self.path = path
+        self.sink = sink
+        self.matcher = WatchlistMatcher()
+        self.stats = {"articles": 0, "alerts": 0}
+        self._mtimes: Dict[str, float] = {}
+        self.maybe_reload()
+
+    # -----------------------------------------------------
+    # Public API
+    # -----------------------------------------------------
+    def maybe_reload(self) -> bool:
+        """Reload the watchlists if their files changed since the last load."""
+        mtimes = self._watchlist_mtimes()
+        if mtimes == self._mtimes:
+            return False
+        self._mtimes = mtimes
+        self.matcher.reload(load_watchlists(self.path) if mtimes else {})
+        return True
+
+    def process(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Alert on a batch of classified items; returns the alerts written."""
+        self.maybe_reload()
+        alerts = []
+        for item in items:
+            self.stats["articles"] += 1
+            alerts.extend(self.alerts_for(item))
+        if self.sink is not None:
+            self.sink.write(alerts)
+        self.stats["alerts"] += len(alerts)
+        return alerts
+
+    def alerts_for(self, item: Dict[str, Any]) -> List[Dict[str, Any]]:
+        body = item.get("body") or ""
+        alerted_at = datetime.now().isoformat(timespec="seconds")
+        alerts = []
+
+        for key, found in self.matcher.match_item(item).items():
+            snippet = None
+            if found["body"]:
+                start, end = found["body"][0]
+                snippet = body[max(0, start - SNIPPET_CHARS):end + SNIPPET_CHARS].replace("\n", " ")
+
+            for name, term in self.matcher.entries[key]:
+                alert_key = f"{item.get('id')}|{item.get('revision')}|{name}|{key}"
+                alerts.append({
+                    "alert_id": hashlib.sha1(alert_key.encode("utf-8")).hexdigest()[:16],
+                    "list": name,
+                    "term": term,
+                    "article_id": item.get("id"),
+                    "revision": item.get("revision"),
+                    "title": item.get("title"),
+                    "url": item.get("url"),
+                    "source": item.get("source"),
+                    "date": item.get("date"),
+                    "body_matches": len(found["body"]),
+                    "entity_labels": found["labels"],
+                    "snippet": snippet,
+                    "alerted_at": alerted_at,
+                })
+        return alerts
+
+    # -----------------------------------------------------
+    # Internal helpers
+    # -----------------------------------------------------
+    def _watchlist_mtimes(self) -> Dict[str, float]:
+        if os.path.isfile(self.path):
+            files = [self.path]
+        else:
+            files = glob.glob(os.path.join(self.path, "*.txt"))
+        return {file: os.path.getmtime(file) for file in files}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Match watchlists against classified articles (JSON Lines, or a _combined.json output)."
+    )
+    parser.add_argument("watchlists", help="Directory of {list}.txt watchlists, or one list file")
+    parser.add_argument("articles", help="classified.jsonl or {timestamp}_combined.json")
+    parser.add_argument("--output", default="-", help="Alerts JSONL file (default: stdout)")
+    args = parser.parse_args()
+
+    with open(args.articles, encoding="utf-8") as f:
+        if args.articles.endswith(".json"):
+            articles = json.load(f)
+        else:
+            articles = [json.loads(line) for line in f if line.strip()]
+
+    stage = WatchlistAlerts(args.watchlists, JSONLAlertSink(args.output) if args.output != "-" else None)
+    alerts = stage.process(articles)
+    if args.output == "-":
+        for alert in alerts:
+            sys.stdout.write(json.dumps(alert, ensure_ascii=False) + "\n")
+    print(
+        f"{stage.stats['alerts']} alerts on {stage.stats['articles']} articles "
+        f"({len(stage.matcher)} watchlist terms).",
+        file=sys.stderr,
+    )
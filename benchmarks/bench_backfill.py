@@ -0,0 +1,193 @@
+"""
+Compare a backfill crawl with paging back through the listings, offline.
+
+Builds replay archives of the three sites holding 60 days of articles
+(listing pages by number, plus Blogger `updated-max` listings for The
+Hacker News) and crawls them with simulated latency:
+
+  listings        RECENCY_SINCE, one "Next" link at a time, as before
+  backfill        BACKFILL_FROM, the same open-ended range, pages fanned out
+  backfill range  BACKFILL_FROM/BACKFILL_TO in the middle of the archive
+  paused          the same range stopped after a few items (JOBDIR) ...
+  resumed         ... and resumed from the job directory
+
+    python benchmarks/bench_backfill.py [--latency 0.2]
+
+Exits 1 if a crawl misses articles of its range or keeps articles outside
+of it, or if the paused and resumed crawls together do not cover the range.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(REPO_ROOT / "benchmarks"))
+sys.path.insert(0, str(REPO_ROOT / "news_spider"))
+
+import scrapy
+from scrapy.http import HtmlResponse
+from scrapy.utils.request import RequestFingerprinter
+
+from api_backfill import backfill_date_url, date_slices
+from api_crawl_runner import ConcurrentCrawlRunner
+from api_replay import ResponseArchive, replay_settings
+from check_recency_cutoff import SPIDERS, article_html, listing_html
+from news_spider.sources import SOURCES
+
+NEWEST = datetime(2025, 6, 30, 18)
+DAYS = 60
+PER_DAY = 4
+PER_PAGE = 10
+
+SINCE = datetime(2025, 6, 1)
+UNTIL = datetime(2025, 6, 10, 23, 59, 59)
+PAUSE_AFTER = 10
+
+
+# -----------------------------------------------------
+# Synthetic site: PER_DAY articles a day, newest first
+# -----------------------------------------------------
+def site_articles(base: str):
+    """[(url, date)], newest first."""
+    return [
+        (f"{base}article-{i}/", NEWEST - timedelta(hours=i * 24 // PER_DAY))
+        for i in range(DAYS * PER_DAY)
+    ]
+
+
+def expected_urls(spec, since: datetime, until: datetime | None):
+    # Listings show the day only: every article of the first and last day is in range
+    return {
+        url for url, date in site_articles(spec["base"])
+        if since.date() <= date.date() and (until is None or date.date() <= until.date())
+    }
+
+
+def build_archive(spec, archive_dir: Path):
+    name, base = spec["name"], spec["base"]
+    fingerprinter = RequestFingerprinter()
+    articles = site_articles(base)
+    entries = [(None, url, date) for url, date in articles]
+
+    with ResponseArchive(str(archive_dir / f"{name}.zip"), mode="a") as archive:
+        def add(url: str, html: str):
+            request = scrapy.Request(url)
+            response = HtmlResponse(url, body=html.encode("utf-8"), headers={"Content-Type": "text/html; charset=utf-8"})
+            archive.add(fingerprinter.fingerprint(request).hex(), request, response)
+
+        pages = (len(entries) + PER_PAGE - 1) // PER_PAGE
+        for page in range(1, pages + 1):
+            url = base if page == 1 else f"{base}page/{page}/"
+            next_url = f"{base}page/{page + 1}/" if page < pages else None
+            add(url, listing_html(name, entries[(page - 1) * PER_PAGE:page * PER_PAGE], next_url))
+
+        template = SOURCES[name].get("backfill", {}).get("dates")
+        if template:
+            # Posts older than `max`, for the slices of both ranges crawled
+            ends = {end for _, end in date_slices(SINCE, UNTIL)}
+            ends |= {end for _, end in date_slices(SINCE, datetime.combine(NEWEST.date(), datetime.min.time()) + timedelta(days=1))}
+            added = set()
+            for end in ends:
+                slice_start = max(start for start, e in date_slices(SINCE, end) if e == end)
+                while end not in added:
+                    added.add(end)
+                    page = [entry for entry in entries if entry[2] < end][:PER_PAGE]
+                    older = page[-1][2] if len(page) == PER_PAGE else None
+                    add(backfill_date_url(template, end), listing_html(
+                        name, page, backfill_date_url(template, older) if older else None
+                    ))
+                    if older is None or min(date.date() for _, _, date in page) < slice_start.date():
+                        break
+                    end = older
+
+        for url, date in articles:
+            add(url, article_html(name, date))
+
+
+# -----------------------------------------------------
+# Crawls
+# -----------------------------------------------------
+def crawl_once(archive_dir: str, feed_dir: str, latency: float, extra: str):
+    """Crawl all sources (in a subprocess, the reactor cannot restart) and print their stats."""
+    settings = replay_settings(archive_dir, latency=latency, jitter=0.3)
+    settings.update({"LOG_LEVEL": "WARNING", "CONCURRENT_REQUESTS_PER_DOMAIN": 8, **json.loads(extra)})
+    specs = [{k: v for k, v in spec.items() if k not in ("name", "base")} for spec in SPIDERS]
+    stats = ConcurrentCrawlRunner(str(REPO_ROOT), specs, settings=settings, feed_dir=feed_dir, append=True).run()
+    print(json.dumps(stats, default=str))
+
+
+def run_crawl(archive_dir: Path, feed_dir: Path, latency: float, settings: dict) -> dict:
+    out = subprocess.run(
+        [sys.executable, __file__, "--crawl-once", str(archive_dir), str(feed_dir), str(latency), json.dumps(settings)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def scraped_urls(feed_dir: Path, spec) -> list:
+    path = feed_dir / (Path(spec["output"]).stem + ".jsonl")
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["url"] for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.2, help="Simulated download time per request (s)")
+    parser.add_argument("--crawl-once", nargs=4, metavar=("ARCHIVES", "FEEDS", "LATENCY", "SETTINGS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.crawl_once:
+        archive_dir, feed_dir, latency, extra = args.crawl_once
+        crawl_once(archive_dir, feed_dir, float(latency), extra)
+        return
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        archive_dir = tmp / "archives"
+        for spec in SPIDERS:
+            build_archive(spec, archive_dir)
+
+        jobdir = str(tmp / "jobs" / "{spider}")
+        in_range = {"BACKFILL_FROM": SINCE.isoformat(), "BACKFILL_TO": UNTIL.isoformat()}
+        runs = [
+            ("listings", "listings", {"RECENCY_SINCE": SINCE.isoformat()}, None),
+            ("backfill", "backfill", {"BACKFILL_FROM": SINCE.isoformat()}, None),
+            ("backfill range", "range", in_range, UNTIL),
+            ("paused", "resumed", {**in_range, "JOBDIR": jobdir, "CLOSESPIDER_ITEMCOUNT": PAUSE_AFTER}, UNTIL),
+            ("resumed", "resumed", {**in_range, "JOBDIR": jobdir}, UNTIL),
+        ]
+        for label, feeds, settings, until in runs:
+            feed_dir = tmp / f"feeds-{feeds}"
+            stats = run_crawl(archive_dir, feed_dir, args.latency, settings)
+            print(f"\n{label}")
+            for spec in SPIDERS:
+                s = stats[spec["source"]]
+                urls = scraped_urls(feed_dir, spec)
+                expected = expected_urls(spec, SINCE, until)
+                problems = []
+                if set(urls) - expected:
+                    problems.append(f"{len(set(urls) - expected)} articles out of range")
+                if label != "paused" and set(urls) != expected:
+                    problems.append(f"{len(expected - set(urls))} of {len(expected)} articles missing")
+                if s.get("replay/miss"):
+                    problems.append("requested unarchived urls")
+                failures += bool(problems)
+                print(
+                    f"  {spec['source']:<18} {s.get('downloader/request_count', 0):4d} requests, "
+                    f"{len(set(urls)):3d} articles ({len(urls) - len(set(urls))} repeated), "
+                    f"{s.get('elapsed_time_seconds', 0):5.2f}s  {'FAIL: ' + '; '.join(problems) if problems else 'ok'}"
+                )
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Compare the single-pass body extractor with the spiders' previous selectors.
+
+    # on article pages recorded with bench_spider_parse.py --record
+    python benchmarks/bench_body_extractor.py --archive-dir fixtures [--repeat 5]
+
+    # on synthetic pages mimicking each site's markup
+    python benchmarks/bench_body_extractor.py --synthetic 200
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(REPO_ROOT / "news_spider"))
+
+from scrapy.http import HtmlResponse
+from w3lib.html import replace_entities
+
+from api_body_extractor import BodyExtractor
+from api_replay import ResponseArchive, build_response
+from news_spider.sources import SOURCES
+
+
+# -----------------------------------------------------
+# Previous selectors, as they were in the spiders
+# -----------------------------------------------------
+def legacy_bleeping(response) -> str:
+    paragraphs = response.xpath('//div[@class="articleBody"]/*[not(descendant::figure)]')
+    filtered_elements = [
+        el for el in paragraphs
+        if 'ia_ad' not in (el.attrib.get('class', '')) and 'cz-related-article-wrapp' not in (el.attrib.get('class', ''))
+        and el.root.tag not in ['figure', "style"] and el.xpath('string(.)').get().strip() != ""]
+    texts = [el.xpath('string(.)').get().strip() for el in filtered_elements]
+    return "\n".join(texts)
+
+
+def legacy_securityweek(response) -> str:
+    paragraphs = response.xpath(
+        '//div[contains(@class, "zox-post-body")]//p['
+        'not(ancestor::div[contains(@class, "zox-post-ad-wrap")]) and '
+        'not(ancestor::div[contains(@class, "zox-author-box-wrap")]) and '
+        'not(starts-with(normalize-space(string()), "Related:"))'
+        ']/descendant-or-self::text()'
+    ).getall()
+    return "\n".join([p.strip() for p in paragraphs if p.strip()])
+
+
+def legacy_thehackernews(response) -> str:
+    paragraphs = response.xpath(
+        '//div[@id="articlebody"]//*[self::p or self::h1 or self::h2 or self::h3 or self::h4 or self::h5 or self::h6][not(ancestor::div[contains(@class, "note-b")])]/descendant-or-self::text()').getall()
+    if paragraphs and any(p.strip() for p in paragraphs):
+        return "\n".join([p.strip() for p in paragraphs if p.strip() and p.strip() != "#"])
+    raw_nodes = response.xpath(
+        '//div[@id="articlebody"]//text()[not(ancestor-or-self::div[contains(@class, "note-b")])]'
+    ).getall()
+    return "\n".join([replace_entities(text.strip()) for text in raw_nodes if text.strip()])
+
+
+LEGACY = {
+    "bleeping": legacy_bleeping,
+    "securityweek": legacy_securityweek,
+    "thehackernews": legacy_thehackernews,
+}
+
+
+# -----------------------------------------------------
+# Synthetic pages
+# -----------------------------------------------------
+def synthetic_page(site: str, rng: random.Random) -> bytes:
+    words = ["vulnerability", "CVE-2025-1234", "patch", "Microsoft", "exploit", "ransomware",
+             "attackers", "the", "a", "of", "in", "<b>critical</b>", "<a href='#'>advisory</a>"]
+
+    def paragraph():
+        return "<p>" + " ".join(rng.choice(words) for _ in range(rng.randint(20, 80))) + ".</p>"
+
+    blocks = []
+    for i in range(rng.randint(10, 40)):
+        roll = rng.random()
+        if roll < 0.08:
+            blocks.append('<div class="ia_ad zox-post-ad-wrap note-b"><p>Sponsored content</p><script>ads()</script></div>')
+        elif roll < 0.14:
+            blocks.append('<figure><img src="x.png"><figcaption>Screenshot</figcaption></figure>')
+        elif roll < 0.17:
+            blocks.append("<style>.x{color:red}</style>")
+        elif roll < 0.22:
+            blocks.append(f"<h2>Section {i}</h2>")
+        elif roll < 0.25:
+            blocks.append("<p>Related: another story</p>")
+        else:
+            blocks.append(paragraph())
+    content = "".join(blocks)
+
+    nav = "<nav>" + "".join(f"<a href='/c{i}'>Category {i}</a>" for i in range(50)) + "</nav>"
+    if site == "bleeping":
+        body = f'<div class="articleBody">{content}</div>'
+    elif site == "securityweek":
+        body = f'<div class="zox-post-body-wrap"><div class="zox-post-body">{content}</div></div>'
+    else:
+        body = f'<div id="articlebody">{content}</div>'
+    return f"<html><head><title>t</title></head><body>{nav}{body}<footer>{nav}</footer></body></html>".encode("utf-8")
+
+
+def load_pages(args):
+    pages = {site: [] for site in LEGACY}
+    if args.archive_dir:
+        for site in LEGACY:
+            path = Path(args.archive_dir) / f"{site}.zip"
+            if not path.exists():
+                continue
+            with ResponseArchive(str(path)) as archive:
+                pages[site] = [
+                    build_response(e) for e in archive.entries()
+                    if e["status"] == 200 and e["callback"] == "parse_article"
+                ]
+    else:
+        rng = random.Random(0)
+        for site in LEGACY:
+            pages[site] = [
+                HtmlResponse(f"https://example.com/{site}/{i}", body=synthetic_page(site, rng), encoding="utf-8")
+                for i in range(args.synthetic)
+            ]
+    return pages
+
+
+def timed(fn, responses, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        # Fresh responses, so each run parses the HTML like a spider callback
+        fresh = [r.replace(body=r.body) for r in responses]
+        started = time.perf_counter()
+        for r in fresh:
+            fn(r)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--archive-dir", help="Directory of {spider}.zip archives")
+    parser.add_argument("--synthetic", type=int, default=200, help="Synthetic pages per site (without --archive-dir)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for site, responses in load_pages(args).items():
+        if not responses:
+            print(f"{site}: no pages")
+            continue
+
+        extractor = BodyExtractor(**SOURCES[site]["body"])
+        legacy = LEGACY[site]
+        same = sum(extractor.extract(r) == legacy(r) for r in responses)
+
+        t_legacy = timed(legacy, responses, args.repeat)
+        t_new = timed(extractor.extract, responses, args.repeat)
+        n = len(responses)
+        print(
+            f"{site:<14} {n} pages  legacy {t_legacy / n * 1000:7.3f} ms/page  "
+            f"single-pass {t_new / n * 1000:7.3f} ms/page  ({t_legacy / t_new:.1f}x)  "
+            f"identical bodies: {same}/{n}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Compare bulk content-API crawling with one HTML page per article, offline.
+
+Builds replay archives of SecurityWeek (WordPress REST API) and The Hacker
+News (Blogger JSON feed) holding the HTML listings and article pages as
+well as the API pages for the same posts, crawls them with RECENCY_SINCE
+set in each discovery mode and checks that both yield the same items:
+
+  html          listing pages and one request per article
+  api           bulk API pages
+  api disabled  the API answers 404: falls back to the listings
+
+    python benchmarks/bench_content_api.py [--posts 200] [--latency 0.05]
+
+Exits 1 if the modes disagree on the items.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from datetime import timedelta, timezone
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(REPO_ROOT / "benchmarks"))
+
+import scrapy
+from scrapy.http import HtmlResponse, TextResponse
+from scrapy.utils.request import RequestFingerprinter
+
+from api_content_api import (
+    WORDPRESS_PAGE_SIZE, BLOGGER_PAGE_SIZE,
+    wordpress_categories_url, wordpress_posts_url, blogger_posts_url,
+)
+from api_crawl_runner import ConcurrentCrawlRunner
+from api_replay import ResponseArchive, replay_settings
+from check_recency_cutoff import SINCE, SPIDERS, article_html, listing_html
+
+SPIDERS = [spec for spec in SPIDERS if spec["name"] in ("securityweek", "thehackernews")]
+
+API_URLS = {
+    "securityweek": "https://www.securityweek.com/wp-json/wp/v2/",
+    "thehackernews": "https://thehackernews.com/feeds/posts/default/-/Vulnerability",
+}
+CATEGORY_ID = 42
+PER_PAGE = 10
+OLD_POSTS = 15
+
+
+def site_posts(base: str, recent: int):
+    """[(url, date)], newest first: `recent` posts after SINCE, then older ones."""
+    posts = []
+    for i in range(recent + OLD_POSTS):
+        date = SINCE + timedelta(hours=recent - i) if i < recent else SINCE - timedelta(days=i - recent + 1)
+        posts.append((f"{base}article-{i}/", date))
+    return posts
+
+
+def api_cutoff() -> str:
+    return SINCE.astimezone().isoformat(timespec="seconds")
+
+
+def api_pages(name: str, posts):
+    """[(url, body, headers)] of the API pages serving the recent posts."""
+    text = "<p>A vulnerability was patched.</p><p>Attackers exploited it.</p>"
+    api_url = API_URLS[name]
+    recent = [(url, date) for url, date in posts if date >= SINCE]
+    pages = []
+
+    if name == "securityweek":
+        pages.append((wordpress_categories_url(api_url, "vulnerabilities"), json.dumps([{"id": CATEGORY_ID}]), {}))
+        chunks = [recent[i:i + WORDPRESS_PAGE_SIZE] for i in range(0, len(recent), WORDPRESS_PAGE_SIZE)]
+        for page, chunk in enumerate(chunks, 1):
+            data = [{
+                "link": url,
+                "title": {"rendered": "Title"},
+                "date": date.isoformat(),
+                "date_gmt": date.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S"),
+                "content": {"rendered": text},
+                "_embedded": {"author": [{"name": "Author"}]},
+            } for url, date in chunk]
+            headers = {"X-WP-Total": str(len(recent)), "X-WP-TotalPages": str(len(chunks))}
+            pages.append((wordpress_posts_url(api_url, CATEGORY_ID, page, api_cutoff()), json.dumps(data), headers))
+        return pages
+
+    for start in range(1, len(recent) + 1, BLOGGER_PAGE_SIZE):
+        chunk = recent[start - 1:start - 1 + BLOGGER_PAGE_SIZE]
+        links = []
+        if start + BLOGGER_PAGE_SIZE <= len(recent):
+            links.append({"rel": "next", "href": blogger_posts_url(api_url, start + BLOGGER_PAGE_SIZE, api_cutoff())})
+        data = {"feed": {"link": links, "entry": [{
+            "title": {"$t": "Title"},
+            "published": {"$t": date.astimezone().isoformat()},
+            "content": {"$t": text},
+            "author": [{"name": {"$t": "Author"}}],
+            "link": [{"rel": "alternate", "href": url}],
+        } for url, date in chunk]}}
+        pages.append((blogger_posts_url(api_url, start, api_cutoff()), json.dumps(data), {}))
+    return pages
+
+
+def build_archives(archive_dir: Path, recent: int, with_api: bool):
+    fingerprinter = RequestFingerprinter()
+    for spec in SPIDERS:
+        name, base = spec["name"], spec["base"]
+        posts = site_posts(base, recent)
+
+        with ResponseArchive(str(archive_dir / f"{name}.zip"), mode="a") as archive:
+            def add(url: str, body: str, headers: dict, cls=HtmlResponse):
+                request = scrapy.Request(url)
+                response = cls(url, body=body.encode("utf-8"), headers=headers)
+                archive.add(fingerprinter.fingerprint(request).hex(), request, response)
+
+            html = {"Content-Type": "text/html; charset=utf-8"}
+            pages = [posts[i:i + PER_PAGE] for i in range(0, len(posts), PER_PAGE)]
+            for page, chunk in enumerate(pages, 1):
+                url = base if page == 1 else f"{base}page/{page}/"
+                next_url = f"{base}page/{page + 1}/" if page < len(pages) else None
+                add(url, listing_html(name, [(page, u, d) for u, d in chunk], next_url), html)
+            for url, date in posts:
+                add(url, article_html(name, date), html)
+
+            if with_api:
+                for url, body, headers in api_pages(name, posts):
+                    add(url, body, {"Content-Type": "application/json; charset=utf-8", **headers}, TextResponse)
+
+
+def crawl_once(mode: str, archive_dir: str, feed_dir: str, latency: float):
+    """Crawl both sources (in a subprocess, the reactor cannot restart) and print their stats."""
+    settings = replay_settings(archive_dir, latency=latency, jitter=0.3)
+    settings.update({
+        "LOG_LEVEL": "ERROR",
+        "RECENCY_SINCE": SINCE.isoformat(),
+        "DISCOVERY_MODE": mode,
+    })
+    specs = [{k: v for k, v in spec.items() if k not in ("name", "base")} for spec in SPIDERS]
+    stats = ConcurrentCrawlRunner(str(REPO_ROOT), specs, settings=settings, feed_dir=feed_dir).run()
+    print(json.dumps(stats, default=str))
+
+
+def run_crawl(mode: str, archive_dir: Path, feed_dir: Path, latency: float) -> dict:
+    out = subprocess.run(
+        [sys.executable, __file__, "--crawl-once", mode, str(archive_dir), str(feed_dir), str(latency)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def load_items(path: Path):
+    """{url: (title, date, body)} of an exported feed; author sources differ by mode."""
+    with open(path, "r", encoding="utf-8") as f:
+        return {item["url"]: (item["title"], item["date"], item["body"].strip()) for item in json.load(f)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--posts", type=int, default=200, help="Posts per site newer than the cutoff")
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated download time per request (s)")
+    parser.add_argument("--crawl-once", nargs=4, metavar=("MODE", "ARCHIVES", "FEEDS", "LATENCY"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.crawl_once:
+        mode, archive_dir, feed_dir, latency = args.crawl_once
+        crawl_once(mode, archive_dir, feed_dir, float(latency))
+        return
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        build_archives(tmp / "with-api", args.posts, with_api=True)
+        build_archives(tmp / "without-api", args.posts, with_api=False)
+
+        runs = [
+            ("html", "html", tmp / "with-api"),
+            ("api", "api", tmp / "with-api"),
+            ("api disabled", "api", tmp / "without-api"),
+        ]
+        reference = {}
+        for label, mode, archive_dir in runs:
+            feed_dir = tmp / f"feeds-{label.replace(' ', '-')}"
+            stats = run_crawl(mode, archive_dir, feed_dir, args.latency)
+            print(f"\n{label}")
+            for spec in SPIDERS:
+                s = stats[spec["source"]]
+                items = load_items(feed_dir / spec["output"])
+                reference.setdefault(spec["source"], items)
+
+                problems = []
+                if len(items) != args.posts:
+                    problems.append(f"expected {args.posts} items")
+                if items != reference[spec["source"]]:
+                    problems.append("items differ from html mode")
+                failures += bool(problems)
+                print(
+                    f"  {spec['source']:<16} {s.get('downloader/request_count', 0):4d} requests, {len(items):4d} items, "
+                    f"{s.get('elapsed_time_seconds', 0):6.2f}s, {s.get('downloader/response_bytes', 0) / 1024:7.1f} KiB  "
+                    f"{'FAIL: ' + '; '.join(problems) if problems else 'ok'}"
+                )
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
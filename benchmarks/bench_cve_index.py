@@ -0,0 +1,213 @@
+"""
+Build the offline CVE index from a synthetic NVD dump and measure it
+against keeping the parsed dump in memory.
+
+  build     yearly NVD feeds (API 2.0 JSON, one year in the legacy 1.1
+            format) into one memory-mapped index
+  lookups   get(), score() and get_many() on a batch, vs a dict of the
+            parsed dump
+  enrich    CVEEnricher on synthetic articles mentioning CVE ids
+  update    a "modified" delta file applied, vs rebuilding from the dump
+
+    python benchmarks/bench_cve_index.py [--cves 100000] [--lookups 20000]
+
+Exits 1 if a lookup differs from the parsed dump (after the update:
+newest records win, stale ones are ignored), or if compaction changes a
+lookup.
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from api_cve_index import CVEIndex, CVEEnricher, read_nvd_files
+
+YEARS = range(2002, 2026)
+LEGACY_YEAR = 2010
+VENDORS = ["microsoft", "apache", "cisco", "fortinet", "paloaltonetworks", "ivanti", "oracle", "google", "linux"]
+CWES = ["CWE-79", "CWE-89", "CWE-787", "CWE-20", "CWE-22", "CWE-77", "CWE-416", "CWE-502"]
+
+
+def synthetic_cve(rng: random.Random, year: int, number: int, modified: str):
+    score = round(rng.uniform(1, 10), 1)
+    products = [
+        {"vulnerable": True, "criteria": f"cpe:2.3:a:{rng.choice(VENDORS)}:product_{rng.randrange(500)}:{v}.0:*:*:*:*:*:*:*"}
+        for v in range(rng.randint(1, 6))
+    ]
+    return {
+        "id": f"CVE-{year}-{number:04d}",
+        "published": f"{year}-03-01T12:00:00.000",
+        "lastModified": modified,
+        "vulnStatus": "Analyzed",
+        "descriptions": [{"lang": "en", "value": f"Synthetic vulnerability {number} allows remote attackers to "
+                                                  f"execute code via a crafted request. " * rng.randint(1, 3)}],
+        "metrics": {"cvssMetricV31": [{
+            "source": "nvd@nist.gov",
+            "type": "Primary",
+            "cvssData": {"version": "3.1", "baseScore": score, "baseSeverity": "HIGH" if score >= 7 else "MEDIUM",
+                         "vectorString": "CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H"},
+        }]},
+        "weaknesses": [{"source": "nvd@nist.gov", "type": "Primary",
+                        "description": [{"lang": "en", "value": rng.choice(CWES)}]}],
+        "configurations": [{"nodes": [{"operator": "OR", "negate": False, "cpeMatch": products}]}],
+    }
+
+
+def legacy_item(cve):
+    """The same CVE in the NVD 1.1 feed format."""
+    data = cve["metrics"]["cvssMetricV31"][0]["cvssData"]
+    return {
+        "cve": {
+            "CVE_data_meta": {"ID": cve["id"]},
+            "problemtype": {"problemtype_data": [{"description": cve["weaknesses"][0]["description"]}]},
+            "description": {"description_data": cve["descriptions"]},
+        },
+        "configurations": {"nodes": [{"operator": "OR", "children": [], "cpe_match": [
+            {"vulnerable": m["vulnerable"], "cpe23Uri": m["criteria"]} for m in cve["configurations"][0]["nodes"][0]["cpeMatch"]
+        ]}]},
+        "impact": {"baseMetricV3": {"cvssV3": dict(data)}},
+        "publishedDate": cve["published"],
+        "lastModifiedDate": cve["lastModified"],
+    }
+
+
+def write_feed(path: Path, cves, legacy: bool = False):
+    if legacy:
+        data = {"CVE_data_type": "CVE", "CVE_Items": [legacy_item(cve) for cve in cves]}
+    else:
+        data = {"format": "NVD_CVE", "version": "2.0", "vulnerabilities": [{"cve": cve} for cve in cves]}
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def synthetic_dump(directory: Path, n: int, rng: random.Random):
+    """Yearly feeds of n CVEs; a few ids per year are far above the rest, as in the real data."""
+    cves = {}
+    per_year = n // len(YEARS)
+    for year in YEARS:
+        numbers = sorted(rng.sample(range(1, per_year * 4), per_year - 3) + [rng.randrange(1000000, 1100000) for _ in range(3)])
+        feed = [synthetic_cve(rng, year, number, f"{year}-06-01T00:00:00.000") for number in dict.fromkeys(numbers)]
+        write_feed(directory / f"nvdcve-2.0-{year}.json.gz", feed, legacy=year == LEGACY_YEAR)
+        cves.update((cve["id"], cve) for cve in feed)
+    return cves
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def directory_bytes(path: Path) -> int:
+    return sum(os.path.getsize(path / name) for name in os.listdir(path))
+
+
+def check(index: CVEIndex, expected, ids) -> bool:
+    return index.get_many(ids) == {i: expected[i] for i in ids if i in expected} and all(
+        index.get(i) == expected.get(i) for i in ids[:2000]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cves", type=int, default=100000, help="CVEs in the dump")
+    parser.add_argument("--lookups", type=int, default=20000, help="Ids looked up")
+    parser.add_argument("--articles", type=int, default=5000, help="Articles enriched")
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    failures = 0
+    tmp = Path(tempfile.mkdtemp())
+    try:
+        dump_dir, index_dir = tmp / "nvd", tmp / "index"
+        dump_dir.mkdir()
+        cves, seconds = timed(synthetic_dump, dump_dir, args.cves, rng)
+        print(f"{len(cves)} CVEs in {len(YEARS)} yearly feeds ({directory_bytes(dump_dir) / 2 ** 20:.1f} MiB gzipped), "
+              f"generated in {seconds:.0f}s")
+
+        index, build_seconds = timed(CVEIndex.build, str(index_dir), [str(dump_dir)])
+        index.close()
+        print(f"  build      {build_seconds:6.1f}s  index {directory_bytes(index_dir) / 2 ** 20:.1f} MiB")
+
+        # Baseline: the whole dump parsed into a dict
+        parsed, load_seconds = timed(lambda: {r["id"]: r for r in read_nvd_files([str(dump_dir)])})
+        index, open_seconds = timed(CVEIndex, str(index_dir))
+        print(f"  open       {open_seconds * 1000:8.2f}ms (parsing the dump into a dict: {load_seconds:.1f}s)")
+
+        known = list(parsed)
+        ids = [rng.choice(known) if rng.random() < 0.8 else f"CVE-{rng.choice(YEARS)}-{rng.randrange(10 ** 6):04d}"
+               for _ in range(args.lookups)]
+        _, dict_seconds = timed(lambda: [parsed.get(i) for i in ids])
+        _, get_seconds = timed(lambda: [index.get(i) for i in ids])
+        _, score_seconds = timed(lambda: [index.score(i) for i in ids])
+        _, many_seconds = timed(index.get_many, ids)
+        per = 1e6 / len(ids)
+        print(f"  get        {get_seconds * per:8.2f}us/id  (dict {dict_seconds * per:.2f}us)")
+        print(f"  score      {score_seconds * per:8.2f}us/id")
+        print(f"  get_many   {many_seconds * per:8.2f}us/id")
+        ok = check(index, parsed, ids)
+        failures += not ok
+        print(f"  lookups    {'ok' if ok else 'FAIL: records differ from the parsed dump'}")
+
+        articles = [
+            {"id": i, "predicted_result": {"VULNERABILITY": [
+                f"{rng.choice(ids)} in {rng.choice(VENDORS)}" for _ in range(rng.randint(0, 5))
+            ], "ORG": ["ACME"]}}
+            for i in range(args.articles)
+        ]
+        enricher = CVEEnricher(index)
+        _, enrich_seconds = timed(enricher.enrich, articles)
+        s = enricher.stats
+        print(f"  enrich     {enrich_seconds * 1e6 / len(articles):8.2f}us/article  "
+              f"{s['found']}/{s['mentions']} mentions found, {s['enriched_articles']} articles enriched")
+
+        # Delta: some CVEs modified, some added, some stale (older than the index)
+        modified = rng.sample(known, len(known) // 50)
+        stale = rng.sample(known, 100)
+        delta = []
+        for cve_id in modified:
+            cve = dict(cves[cve_id], lastModified="2026-01-15T00:00:00.000", vulnStatus="Modified")
+            delta.append(cve)
+        for number in range(len(known) // 100):
+            delta.append(synthetic_cve(rng, 2026, 10000 + number, "2026-01-15T00:00:00.000"))
+        for cve_id in stale:
+            if cve_id not in modified:
+                delta.append(dict(cves[cve_id], lastModified="2001-01-01T00:00:00.000", vulnStatus="Stale"))
+        delta_path = tmp / "nvdcve-2.0-modified.json.gz"
+        write_feed(delta_path, delta)
+
+        stats, update_seconds = timed(index.update, [str(delta_path)])
+        expected = {r["id"]: r for r in read_nvd_files([str(delta_path)]) if r["status"] != "Stale"}
+        expected = dict(parsed, **expected)
+        _, rebuild_seconds = timed(lambda: CVEIndex.build(str(tmp / "rebuilt"), [str(dump_dir), str(delta_path)]).close())
+        print(f"  update     {update_seconds:6.2f}s  (rebuild {rebuild_seconds:.1f}s)  {stats}  "
+              f"{len(index.parts)} parts")
+
+        check_ids = ids + rng.sample(list(expected), 5000)
+        again = index.update([str(delta_path)])
+        ok = check(index, expected, check_ids) and again["skipped_files"] == 1
+        failures += not ok
+        print(f"  updated    {'ok' if ok else 'FAIL: records differ after the update'}")
+
+        _, compact_seconds = timed(index.compact)
+        ok = check(index, expected, check_ids) and len(index.parts) == 1
+        failures += not ok
+        print(f"  compact    {compact_seconds:6.2f}s  {len(index)} CVEs  {'ok' if ok else 'FAIL: records differ after compaction'}")
+        index.close()
+    finally:
+        shutil.rmtree(tmp)
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Compare feed-based article discovery with paging through HTML listings, offline.
+
+Builds replay archives of the three sites (the listings and articles of
+check_recency_cutoff.py plus an RSS/Atom feed of the same articles) and
+crawls them with RECENCY_SINCE set, once per discovery mode:
+
+  html        listing pages, as before
+  feed        the feed reaches back past the cutoff: no listing is fetched
+  short feed  the feed only holds the newest entries: falls back to the
+              listings, without requesting the feed's articles twice
+
+    python benchmarks/bench_feed_discovery.py [--latency 0.2]
+
+Exits 1 if a mode misses articles or requests one twice.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from email.utils import format_datetime
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(REPO_ROOT / "benchmarks"))
+
+import scrapy
+from scrapy.http import TextResponse
+from scrapy.utils.request import RequestFingerprinter
+
+from api_crawl_runner import ConcurrentCrawlRunner
+from api_replay import ResponseArchive, replay_settings
+from check_recency_cutoff import SINCE, SPIDERS, build_archive, site_articles
+
+FEED_URLS = {
+    "bleeping": "https://www.bleepingcomputer.com/feed/",
+    "securityweek": "https://www.securityweek.com/category/vulnerabilities/feed/",
+    "thehackernews": "https://thehackernews.com/feeds/posts/default/-/Vulnerability",
+}
+
+# Entries of the truncated feed, all newer than the cutoff
+SHORT_FEED = 4
+
+
+def feed_xml(name: str, articles) -> str:
+    if name == "thehackernews":
+        # Blogger serves Atom
+        entries = "".join(
+            f'<entry><title>Title</title><published>{date.astimezone().isoformat()}</published>'
+            f'<link rel="alternate" type="text/html" href="{escape(url)}"/>'
+            f'<author><name>Author</name></author></entry>'
+            for url, date in articles
+        )
+        return f'<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>'
+
+    items = "".join(
+        f"<item><title>Title</title><link>{escape(url)}</link>"
+        f"<dc:creator>Author</dc:creator><pubDate>{format_datetime(date.astimezone())}</pubDate></item>"
+        for url, date in articles
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/">'
+        f"<channel><title>Feed</title>{items}</channel></rss>"
+    )
+
+
+def build_archives(archive_dir: Path, limit: int | None):
+    fingerprinter = RequestFingerprinter()
+    for spec in SPIDERS:
+        build_archive(spec, archive_dir)
+
+        seen, articles = set(), []
+        for _, url, date in site_articles(spec["base"]):
+            if url not in seen:
+                seen.add(url)
+                articles.append((url, date))
+
+        url = FEED_URLS[spec["name"]]
+        request = scrapy.Request(url)
+        response = TextResponse(
+            url,
+            body=feed_xml(spec["name"], articles[:limit]).encode("utf-8"),
+            headers={"Content-Type": "application/xml; charset=utf-8"},
+        )
+        with ResponseArchive(str(archive_dir / f"{spec['name']}.zip"), mode="a") as archive:
+            archive.add(fingerprinter.fingerprint(request).hex(), request, response)
+
+
+def crawl_once(mode: str, archive_dir: str, feed_dir: str, latency: float):
+    """Crawl all sources (in a subprocess, the reactor cannot restart) and print their stats."""
+    settings = replay_settings(archive_dir, latency=latency, jitter=0.3)
+    settings.update({
+        "LOG_LEVEL": "WARNING",
+        "RECENCY_SINCE": SINCE.isoformat(),
+        "DISCOVERY_MODE": mode,
+    })
+    specs = [{k: v for k, v in spec.items() if k not in ("name", "base")} for spec in SPIDERS]
+    stats = ConcurrentCrawlRunner(str(REPO_ROOT), specs, settings=settings, feed_dir=feed_dir).run()
+    print(json.dumps(stats, default=str))
+
+
+def run_crawl(mode: str, archive_dir: Path, tmp: Path, latency: float) -> dict:
+    out = subprocess.run(
+        [sys.executable, __file__, "--crawl-once", mode, str(archive_dir), str(tmp / f"feeds-{mode}"), str(latency)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.2, help="Simulated download time per request (s)")
+    parser.add_argument("--crawl-once", nargs=4, metavar=("MODE", "ARCHIVES", "FEEDS", "LATENCY"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.crawl_once:
+        mode, archive_dir, feed_dir, latency = args.crawl_once
+        crawl_once(mode, archive_dir, feed_dir, float(latency))
+        return
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        full, short = tmp / "full", tmp / "short"
+        build_archives(full, None)
+        build_archives(short, SHORT_FEED)
+
+        runs = [
+            ("html", "html", full),
+            ("feed", "feed", full),
+            ("short feed", "feed", short),
+        ]
+        for label, mode, archive_dir in runs:
+            stats = run_crawl(mode, archive_dir, tmp, args.latency)
+            print(f"\n{label}")
+            for spec in SPIDERS:
+                s = stats[spec["source"]]
+                items = s.get("item_scraped_count", 0)
+                problems = []
+                if items != 8:
+                    problems.append("expected 8 items")
+                if s.get("replay/miss") or s.get("dupefilter/filtered"):
+                    problems.append("requested unarchived or duplicate urls")
+                failures += bool(problems)
+                print(
+                    f"  {spec['source']:<18} {s.get('downloader/request_count', 0):3d} requests, {items:2d} items, "
+                    f"{s.get('elapsed_time_seconds', 0):5.2f}s, fallback {s.get('feed_discovery/fallback', 0)}  "
+                    f"{'FAIL: ' + '; '.join(problems) if problems else 'ok'}"
+                )
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Index a synthetic year of classified articles with the full-text index and
+measure indexing throughput and query latency.
+
+Articles are added and committed one day at a time, as the daily export
+does, so the run goes through the segment merge policy. Then:
+
+  term      one word
+  and       two words
+  phrase    a quoted phrase (planted, or taken from an article)
+  filtered  a word, one source, one month and an entity label
+
+    python benchmarks/bench_fulltext_index.py [--days 365] [--per-day 60] [--queries 200]
+
+Exits 1 if the matches of a query (all of them, not just the top hits)
+differ from a brute-force scan of the articles, or if updated articles are
+not replaced.
+"""
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from api_fulltext_index import FullTextIndex, tokenize
+
+SOURCES = ("BleepingComputer", "SecurityWeek", "The Hacker News")
+LABELS = ("ORG", "MALWARE", "VULNERABILITY", "THREAT_ACTOR")
+PHRASES = ("remote access gateway", "supply chain attack", "zero day exploit", "credential stuffing campaign")
+START = datetime(2025, 1, 1)
+
+
+def vocabulary(n: int, rng: random.Random):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < n:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(3, 9))))
+    return sorted(words)
+
+
+def synthetic_year(days: int, per_day: int, words, seed: int = 7):
+    """Articles by day, word frequencies Zipf-distributed."""
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    weights = 1 / np.arange(1, len(words) + 1)
+    weights /= weights.sum()
+    entities = {label: [f"{label.title()} {i}" for i in range(300)] for label in LABELS}
+
+    by_day = []
+    n = 0
+    for day in range(days):
+        date = START + timedelta(days=day)
+        articles = []
+        for _ in range(per_day):
+            body = [words[i] for i in np_rng.choice(len(words), size=rng.randint(150, 350), p=weights)]
+            for _ in range(rng.randint(0, 2)):
+                at = rng.randrange(len(body))
+                body[at:at] = rng.choice(PHRASES).split()
+            title = [words[i] for i in np_rng.choice(len(words), size=8, p=weights)]
+            predicted = {
+                label: rng.sample(entities[label], rng.randint(1, 3))
+                for label in rng.sample(LABELS, rng.randint(0, len(LABELS)))
+            }
+            articles.append({
+                "id": f"{n:08x}",
+                "title": " ".join(title).capitalize(),
+                "body": " ".join(body).capitalize() + ".",
+                "url": f"https://news.example/{n}",
+                "source": SOURCES[n % len(SOURCES)],
+                "date": date.strftime("%B %d, %Y"),
+                "predicted_result": predicted,
+            })
+            n += 1
+        by_day.append(articles)
+    return by_day
+
+
+class BruteForce:
+    """Matching articles found by scanning token lists, for the checks."""
+
+    def __init__(self):
+        self.articles = {}
+
+    def add(self, article):
+        title, body = tokenize(article["title"]), tokenize(article["body"])
+        self.articles[article["id"]] = (article, title + [None] + body, set(title) | set(body))
+
+    def matches(self, words, phrase=None, source=None, month=None, label=None):
+        found = set()
+        for doc_id, (article, tokens, vocab) in self.articles.items():
+            if not all(w in vocab for w in words):
+                continue
+            if source and article["source"] != source:
+                continue
+            if month and datetime.strptime(article["date"], "%B %d, %Y").month != month:
+                continue
+            if label and label not in article["predicted_result"]:
+                continue
+            if phrase and not any(tokens[i:i + len(phrase)] == phrase for i in range(len(tokens))):
+                continue
+            found.add(doc_id)
+        return found
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) * 1000 if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=365, help="Days of articles")
+    parser.add_argument("--per-day", type=int, default=60, help="Articles per day")
+    parser.add_argument("--vocabulary", type=int, default=30000, help="Distinct words")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per kind")
+    parser.add_argument("--checks", type=int, default=20, help="Queries per kind checked against a scan")
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    words = vocabulary(args.vocabulary, rng)
+    started = time.perf_counter()
+    by_day = synthetic_year(args.days, args.per_day, words)
+    total = sum(len(day) for day in by_day)
+    text_bytes = sum(len(a["title"]) + len(a["body"]) for day in by_day for a in day)
+    print(f"{total} articles over {args.days} days ({text_bytes / 2 ** 20:.0f} MiB of text), "
+          f"generated in {time.perf_counter() - started:.0f}s")
+
+    failures = 0
+    tmp = tempfile.mkdtemp()
+    try:
+        index = FullTextIndex(tmp)
+        brute = BruteForce()
+        commit_seconds = []
+        started = time.perf_counter()
+        for articles in by_day:
+            day_started = time.perf_counter()
+            index.add_items(articles)
+            index.commit()
+            commit_seconds.append(time.perf_counter() - day_started)
+        indexing = time.perf_counter() - started
+        for articles in by_day:
+            for article in articles:
+                brute.add(article)
+
+        info = index.info()
+        print(
+            f"  indexing   {indexing:6.1f}s  {total / indexing:6.0f} articles/s  "
+            f"day p50 {percentile(commit_seconds, 50):.0f}ms max {max(commit_seconds) * 1000:.0f}ms  "
+            f"{index.stats['merges']} merges"
+        )
+        print(
+            f"  index      {info['bytes'] / 2 ** 20:6.1f} MiB ({info['bytes'] / text_bytes:.0%} of the text), "
+            f"{len(info['segments'])} segments: {[s['documents'] for s in info['segments']]}"
+        )
+
+        # Updates: new revisions of some articles replace the old ones
+        updated = rng.sample([a for day in by_day for a in day], max(1, total // 50))
+        for article in updated:
+            article["body"] += " Updated with vendor statement."
+            article.pop("revision", None)
+            brute.add(article)
+        index.add_items(updated)
+        index.commit()
+        hits = index.search('"updated with vendor statement"', limit=total)
+        ok = len(index) == total and {h["id"] for h in hits} == {a["id"] for a in updated}
+        failures += not ok
+        print(f"  updates    {len(updated)} articles replaced  {'ok' if ok else 'FAIL: updates not replaced'}")
+        index.close()
+
+        # Queries, on a re-opened index
+        index = FullTextIndex(tmp)
+        sample = [a for day in by_day for a in day]
+        mid = words[100:3000]
+        kinds = {
+            "term": lambda: dict(words=[rng.choice(mid)]),
+            "and": lambda: dict(words=[rng.choice(mid[:500]), rng.choice(mid[:500])]),
+            "phrase": lambda: dict(phrase=_phrase(rng, sample)),
+            "filtered": lambda: dict(
+                words=[rng.choice(words[:300])],
+                source=rng.choice(SOURCES),
+                month=rng.randint(1, 12),
+                label=rng.choice(LABELS),
+            ),
+        }
+        print(f"  {'query':<9} {'p50':>8} {'p95':>8} {'hits':>7}")
+        for kind, make in kinds.items():
+            latencies, n_hits, checked_ok = [], [], True
+            for q in range(args.queries):
+                spec = make()
+                query, filters = _query(spec)
+                started = time.perf_counter()
+                hits = index.search(query, limit=10, **filters)
+                latencies.append(time.perf_counter() - started)
+                n_hits.append(len(hits))
+
+                if q < args.checks:
+                    found = {h["id"] for h in index.search(query, limit=total, **filters)}
+                    phrase = spec.get("phrase")
+                    expected = brute.matches(spec.get("words", phrase), phrase, spec.get("source"),
+                                             spec.get("month"), spec.get("label"))
+                    checked_ok &= found == expected
+            failures += not checked_ok
+            print(
+                f"  {kind:<9} {percentile(latencies, 50):6.2f}ms {percentile(latencies, 95):6.2f}ms "
+                f"{np.mean(n_hits):7.1f}  {'ok' if checked_ok else 'FAIL: matches differ from the scan'}"
+            )
+        index.close()
+    finally:
+        shutil.rmtree(tmp)
+
+    sys.exit(1 if failures else 0)
+
+
+def _phrase(rng: random.Random, articles):
+    if rng.random() < 0.5:
+        return rng.choice(PHRASES).split()
+    tokens = tokenize(rng.choice(articles)["body"])
+    at = rng.randrange(len(tokens) - 3)
+    return tokens[at:at + rng.randint(2, 3)]
+
+
+def _query(spec):
+    query = " ".join(spec.get("words", []))
+    if spec.get("phrase"):
+        query = '"' + " ".join(spec["phrase"]) + '"'
+    filters = {}
+    if spec.get("source"):
+        filters["source"] = spec["source"]
+    if spec.get("month"):
+        month = spec["month"]
+        filters["since"] = f"2025-{month:02d}-01"
+        filters["until"] = (datetime(2025 + month // 12, month % 12 + 1, 1) - timedelta(days=1)).date()
+    if spec.get("label"):
+        filters["labels"] = [spec["label"]]
+    return query, filters
+
+
+if __name__ == "__main__":
+    main()
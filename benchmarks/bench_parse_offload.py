@@ -0,0 +1,160 @@
+"""
+Measure reactor loop lag with article parsing inline and offloaded, offline.
+
+Builds replay archives of the three sites with large article pages (a
+few hundred paragraphs each) and crawls them once per PARSE_OFFLOAD mode:
+
+  inline   body extraction and normalization on the reactor thread
+  thread   in a thread pool
+  process  in a process pool
+
+Loop lag is how late the instrumentation's periodic reactor timer fires
+(reactor/lag, see api_crawl_instrumentation.py): while a page is parsed
+on the reactor thread, no download progresses either.
+
+    python benchmarks/bench_parse_offload.py [--articles 60] [--paragraphs 400] [--workers 2]
+
+Exits 1 if a mode's articles differ from the inline crawl's.
+"""
+import argparse
+import hashlib
+import json
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(REPO_ROOT / "benchmarks"))
+
+import scrapy
+from scrapy.http import HtmlResponse
+from scrapy.utils.request import RequestFingerprinter
+
+from api_crawl_runner import ConcurrentCrawlRunner
+from api_replay import ResponseArchive, replay_settings
+from check_recency_cutoff import SPIDERS, listing_html
+
+DATE = datetime(2025, 6, 10)
+MODES = ("inline", "thread", "process")
+
+
+def paragraphs_html(n: int, seed: int) -> str:
+    return "".join(
+        f"<p>Paragraph {i} of article {seed}: the <strong>vendor</strong> patched "
+        f"<a href=\"/cve/{i}\">CVE-2025-{seed:04d}{i % 10}</a>, a <em>critical</em> flaw\n"
+        f"exploited in the wild since <span class=\"date\">June {i % 28 + 1}</span>.</p>"
+        for i in range(n)
+    )
+
+
+def heavy_article_html(name: str, seed: int, paragraphs: int) -> str:
+    text = paragraphs_html(paragraphs, seed)
+    if name == "bleeping":
+        return f'<html><body><div class="articleBody">{text}<div class="ia_ad">Ad</div></div></body></html>'
+    if name == "securityweek":
+        return (
+            f'<html><body><time class="post-date updated">{DATE:%B %d, %Y}</time>'
+            f'<span class="zox-post-excerpt">Excerpt of article {seed}.</span>'
+            f'<div class="zox-post-body">{text}<div class="zox-post-ad-wrap"><p>Ad</p></div></div></body></html>'
+        )
+    return (
+        f'<html><body><div class="postmeta"><span class="author">Author</span></div>'
+        f'<div id="articlebody">{text}<div class="note-b"><p>Note</p></div></div></body></html>'
+    )
+
+
+def build_archive(spec, archive_dir: Path, articles: int, paragraphs: int):
+    name, base = spec["name"], spec["base"]
+    fingerprinter = RequestFingerprinter()
+    entries = [(1, f"{base}article-{i}/", DATE) for i in range(articles)]
+
+    with ResponseArchive(str(archive_dir / f"{name}.zip"), mode="a") as archive:
+        def add(url: str, html: str):
+            request = scrapy.Request(url)
+            response = HtmlResponse(url, body=html.encode("utf-8"), headers={"Content-Type": "text/html; charset=utf-8"})
+            archive.add(fingerprinter.fingerprint(request).hex(), request, response)
+
+        add(base, listing_html(name, entries, None))
+        for i, (_, url, _) in enumerate(entries):
+            add(url, heavy_article_html(name, i, paragraphs))
+
+
+def crawl_once(mode: str, archive_dir: str, feed_dir: str, workers: int):
+    """Crawl all sources (in a subprocess, the reactor cannot restart) and print their stats."""
+    settings = replay_settings(archive_dir, latency=0.05, jitter=0.3)
+    settings.update({
+        "LOG_LEVEL": "WARNING",
+        "RECENCY_SINCE": DATE.isoformat(),
+        "CONCURRENT_REQUESTS_PER_DOMAIN": 16,
+        "INSTRUMENTATION_LOOP_LAG": 0.01,
+        "PARSE_OFFLOAD": None if mode == "inline" else mode,
+        "PARSE_OFFLOAD_WORKERS": workers,
+    })
+    specs = [{k: v for k, v in spec.items() if k not in ("name", "base")} for spec in SPIDERS]
+    stats = ConcurrentCrawlRunner(str(REPO_ROOT), specs, settings=settings, feed_dir=feed_dir, append=True).run()
+    print(json.dumps(stats, default=str))
+
+
+def run_crawl(mode: str, archive_dir: Path, feed_dir: Path, workers: int) -> dict:
+    out = subprocess.run(
+        [sys.executable, __file__, "--crawl-once", mode, str(archive_dir), str(feed_dir), str(workers)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def article_digests(feed_dir: Path, spec) -> dict:
+    path = feed_dir / (Path(spec["output"]).stem + ".jsonl")
+    with open(path, encoding="utf-8") as f:
+        items = [json.loads(line) for line in f if line.strip()]
+    return {item["url"]: hashlib.sha1(json.dumps(item, sort_keys=True).encode()).hexdigest() for item in items}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--articles", type=int, default=60, help="Articles per source")
+    parser.add_argument("--paragraphs", type=int, default=400, help="Paragraphs per article")
+    parser.add_argument("--workers", type=int, default=2, help="PARSE_OFFLOAD_WORKERS")
+    parser.add_argument("--crawl-once", nargs=4, metavar=("MODE", "ARCHIVES", "FEEDS", "WORKERS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.crawl_once:
+        mode, archive_dir, feed_dir, workers = args.crawl_once
+        crawl_once(mode, archive_dir, feed_dir, int(workers))
+        return
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        archive_dir = tmp / "archives"
+        for spec in SPIDERS:
+            build_archive(spec, archive_dir, args.articles, args.paragraphs)
+
+        inline = {}
+        print(f"{'mode':<8} {'source':<18} {'items':>5} {'time':>7} {'lag mean':>9} {'lag p95':>8} {'lag max':>8}")
+        for mode in MODES:
+            feed_dir = tmp / f"feeds-{mode}"
+            stats = run_crawl(mode, archive_dir, feed_dir, args.workers)
+            for spec in SPIDERS:
+                s = stats[spec["source"]]
+                digests = article_digests(feed_dir, spec)
+                if mode == "inline":
+                    inline[spec["name"]] = digests
+                ok = len(digests) == args.articles and digests == inline[spec["name"]]
+                failures += not ok
+
+                lag = "instrumentation/reactor/lag"
+                print(
+                    f"{mode:<8} {spec['source']:<18} {len(digests):5d} {s.get('elapsed_time_seconds', 0):6.2f}s "
+                    f"{s.get(lag + '/mean', 0) * 1000:7.1f}ms {s.get(lag + '/p95', 0) * 1000:6.1f}ms "
+                    f"{s.get(lag + '/max', 0) * 1000:6.1f}ms  {'ok' if ok else 'FAIL: articles differ from inline'}"
+                )
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
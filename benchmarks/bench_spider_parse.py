@@ -0,0 +1,154 @@
+"""
+Measure spider parse throughput offline from recorded responses.
+
+    # once, online: record listing and article responses of every spider
+    python benchmarks/bench_spider_parse.py --record --archive-dir fixtures
+
+    # offline: run each callback over the recorded pages
+    python benchmarks/bench_spider_parse.py --archive-dir fixtures [--repeat 5]
+
+    # offline: replay full crawls with simulated download latency
+    python benchmarks/bench_spider_parse.py --archive-dir fixtures --crawl --latency 0.2
+"""
+import argparse
+import importlib
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+import scrapy
+
+from api_crawl_runner import ConcurrentCrawlRunner
+from api_replay import ResponseArchive, build_response, record_settings, replay_settings
+
+SPIDERS = [
+    {
+        "dir": "news_spider",
+        "settings": "news_spider.settings",
+        "spider": "news_spider.spiders.news.BleepingSpider",
+        "output": "bleeping.json",
+        "source": "BleepingComputer",
+    },
+    {
+        "dir": "news_spider",
+        "settings": "news_spider.settings",
+        "spider": "news_spider.spiders.news.SecurityweekSpider",
+        "output": "securityweek.json",
+        "source": "SecurityWeek",
+    },
+    {
+        "dir": "news_spider",
+        "settings": "news_spider.settings",
+        "spider": "news_spider.spiders.news.ThehackernewsSpider",
+        "output": "thehackernews.json",
+        "source": "The Hacker News",
+    },
+]
+
+
+def load_spider(spec):
+    project_dir = str(REPO_ROOT / spec["dir"])
+    if project_dir not in sys.path:
+        sys.path.insert(0, project_dir)
+    module_name, class_name = spec["spider"].rsplit(".", 1)
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def bench_callbacks(spec, archive_dir: Path, repeat: int):
+    spidercls = load_spider(spec)
+    path = archive_dir / f"{spidercls.name}.zip"
+    if not path.exists():
+        print(f"{spec['source']}: no archive at {path}, skipped")
+        return
+
+    with ResponseArchive(str(path)) as archive:
+        entries = [
+            e for e in archive.entries()
+            if e["status"] == 200 and e["callback"] in ("parse", "parse_article")
+        ]
+
+    spider = spidercls()
+    results = defaultdict(lambda: defaultdict(float))
+
+    for _ in range(repeat):
+        for entry in entries:
+            callback = getattr(spider, entry["callback"])
+            request = scrapy.Request(entry["url"], callback=callback, cb_kwargs=entry["cb_kwargs"])
+            # Fresh response each time, so selector parsing is measured too
+            response = build_response(entry, request)
+
+            stats = results[entry["callback"]]
+            wall, cpu = time.perf_counter(), time.process_time()
+            try:
+                for output in callback(response, **entry["cb_kwargs"]):
+                    stats["requests" if isinstance(output, scrapy.Request) else "items"] += 1
+            except Exception:
+                stats["errors"] += 1
+            stats["cpu"] += time.process_time() - cpu
+            stats["wall"] += time.perf_counter() - wall
+            stats["pages"] += 1
+            stats["bytes"] += len(entry["body"])
+
+    print(f"{spec['source']} ({len(entries)} pages, x{repeat})")
+    for name, s in sorted(results.items()):
+        print(
+            f"  {name:<14} {s['pages'] / s['wall']:8.1f} pages/s  "
+            f"{s['cpu'] / s['pages'] * 1000:7.2f} ms CPU/page  "
+            f"{s['bytes'] / s['wall'] / 1e6:6.1f} MB/s  "
+            f"{int(s['items'])} items, {int(s['requests'])} requests, {int(s['errors'])} errors"
+        )
+
+
+def bench_crawl(archive_dir: Path, latency: float, jitter: float):
+    settings = replay_settings(str(archive_dir), latency=latency, jitter=jitter)
+    settings["LOG_LEVEL"] = "WARNING"
+
+    with tempfile.TemporaryDirectory() as feed_dir:
+        started = time.perf_counter()
+        cpu = time.process_time()
+        stats = ConcurrentCrawlRunner(str(REPO_ROOT), SPIDERS, settings=settings, feed_dir=feed_dir).run()
+        wall = time.perf_counter() - started
+        cpu = time.process_time() - cpu
+
+    pages = sum(s.get("downloader/response_count", 0) for s in stats.values())
+    misses = sum(s.get("replay/miss", 0) for s in stats.values())
+    print(
+        f"replayed crawl: {pages} pages in {wall:.2f}s ({pages / wall:.1f} pages/s), "
+        f"{cpu:.2f}s CPU, {misses} requests not in the archive (latency {latency}s ±{jitter:.0%})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--archive-dir", default=str(REPO_ROOT / "fixtures"))
+    parser.add_argument("--record", action="store_true", help="Crawl the live sites and record their responses")
+    parser.add_argument("--crawl", action="store_true", help="Replay full crawls instead of calling callbacks directly")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated download latency in seconds (--crawl)")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Relative latency jitter (--crawl)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    archive_dir = Path(args.archive_dir)
+
+    if args.record:
+        with tempfile.TemporaryDirectory() as feed_dir:
+            ConcurrentCrawlRunner(
+                str(REPO_ROOT), SPIDERS, settings=record_settings(str(archive_dir)), feed_dir=feed_dir
+            ).run()
+        return
+
+    if args.crawl:
+        bench_crawl(archive_dir, args.latency, args.jitter)
+        return
+
+    for spec in SPIDERS:
+        bench_callbacks(spec, archive_dir, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
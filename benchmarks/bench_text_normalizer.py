@@ -0,0 +1,62 @@
+"""
+Benchmark the shared body normalizer against the legacy four-step chain.
+
+    python benchmarks/bench_text_normalizer.py [--sizes 10000 100000 1000000] [--repeat 20]
+"""
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from api_text_normalizer import normalize_body, normalize_body_legacy, is_normalized
+
+
+def make_body(n_chars: int, seed: int = 0) -> str:
+    """Synthetic scraped body: sentences, soft line breaks, tabs, CRs and nbsp."""
+    rng = random.Random(seed)
+    words = ["vulnerability", "CVE-2025-1234", "patch", "Microsoft", "exploit",
+             "ransomware", "attackers", "the", "a", "of", "in", "and"]
+    parts = []
+    size = 0
+    while size < n_chars:
+        word = rng.choice(words)
+        sep = rng.choices(
+            [" ", "\n", ".\n", "\t", "\r\n", "\xa0", ". "],
+            weights=[80, 6, 5, 2, 2, 2, 3],
+        )[0]
+        parts.append(word + sep)
+        size += len(word) + len(sep)
+    return "".join(parts)
+
+
+def bench(label: str, fn, body: str, repeat: int) -> float:
+    best = min(timeit.repeat(lambda: fn(body), number=1, repeat=repeat))
+    print(f"  {label:<28} {best * 1000:9.3f} ms  {len(body) / best / 1e6:8.1f} MB/s")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for n_chars in args.sizes:
+        body = make_body(n_chars)
+        normalized = normalize_body(body)
+        assert normalized == normalize_body_legacy(body)
+
+        print(f"body of {len(body):,} chars")
+        legacy = bench("legacy chain", normalize_body_legacy, body, args.repeat)
+        fused = bench("normalize_body", normalize_body, body, args.repeat)
+        bench("legacy chain (normalized)", normalize_body_legacy, normalized, args.repeat)
+        skip = bench("normalize_body (normalized)", normalize_body, normalized, args.repeat)
+        bench("is_normalized", is_normalized, normalized, args.repeat)
+        print(f"  speedup: {legacy / fused:.1f}x raw, {legacy / skip:.1f}x on already-normalized input")
+
+
+if __name__ == "__main__":
+    main()
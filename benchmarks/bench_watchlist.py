@@ -0,0 +1,134 @@
+"""
+Compare watchlist matching with the Aho-Corasick automaton against a loop
+over the terms, on synthetic articles.
+
+  loop        every term searched in every (casefolded) body and entity
+  automaton   one pass per text (api_watchlist_alerts.WatchlistMatcher)
+  reload      an edit of the watchlist applied incrementally vs rebuilt
+
+    python benchmarks/bench_watchlist.py [--terms 5000] [--articles 300]
+
+Exits 1 if the automaton's matches differ from the loop's, or if the
+incrementally reloaded matcher's differ from a rebuilt one.
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from api_entity_dictionary import EntityDictionary
+from api_watchlist_alerts import WatchlistMatcher
+
+WORDS = (
+    "attackers exploited a critical vulnerability in the remote access gateway "
+    "patch released advisory customers urged to update ransomware campaign "
+    "credentials stolen from cloud tenants researchers observed lateral movement"
+).split()
+
+
+def synthetic_watchlists(n: int, rng: random.Random):
+    per_list = n // 3
+    return {
+        "vendors": [f"Vendor{i:04d} {rng.choice(['Inc', 'Corp', 'Systems'])}" for i in range(per_list)],
+        "products": [f"Product {rng.choice(WORDS).title()} {i}" for i in range(per_list)],
+        "assets": [f"host-{i:05d}.corp.example" for i in range(n - 2 * per_list)],
+    }
+
+
+def synthetic_articles(n: int, watchlists, rng: random.Random):
+    terms = [term for terms in watchlists.values() for term in terms]
+    articles = []
+    for i in range(n):
+        words = [rng.choice(WORDS) for _ in range(400)]
+        mentioned = rng.sample(terms, rng.randint(0, 4))
+        for term in mentioned:
+            words.insert(rng.randrange(len(words)), rng.choice([term, term.upper(), term.lower()]))
+        # A near miss that must not match as a whole word
+        words.insert(rng.randrange(len(words)), terms[rng.randrange(len(terms))] + "x")
+        articles.append({
+            "id": i,
+            "body": " ".join(words) + ".",
+            "predicted_result": {"ORG": mentioned[:1]},
+        })
+    return articles
+
+
+def loop_matches(articles, watchlists):
+    """The baseline: every term, in every text."""
+    terms = {EntityDictionary.normalize(t) for ts in watchlists.values() for t in ts}
+    patterns = [(term, re.compile(r"(?<!\w)" + re.escape(term) + r"(?!\w)")) for term in terms]
+    found = set()
+    for article in articles:
+        texts = [article["body"]] + [t for ts in article["predicted_result"].values() for t in ts]
+        for text in texts:
+            folded = " ".join(text.casefold().split())
+            for term, pattern in patterns:
+                if term in folded and pattern.search(folded):
+                    found.add((article["id"], term))
+    return found
+
+
+def automaton_matches(articles, matcher):
+    return {(article["id"], term) for article in articles for term in matcher.match_item(article)}
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--terms", type=int, default=5000, help="Watchlist terms")
+    parser.add_argument("--articles", type=int, default=300, help="Articles to match")
+    parser.add_argument("--edits", type=int, default=50, help="Terms added and removed by the reload")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    watchlists = synthetic_watchlists(args.terms, rng)
+    articles = synthetic_articles(args.articles, watchlists, rng)
+    failures = 0
+
+    expected, loop_seconds = timed(loop_matches, articles, watchlists)
+    matcher, build_seconds = timed(WatchlistMatcher, watchlists)
+    found, match_seconds = timed(automaton_matches, articles, matcher)
+    failures += found != expected
+    print(f"{args.terms} terms, {args.articles} articles, {len(expected)} (article, term) matches")
+    print(f"  loop       {loop_seconds * 1000 / args.articles:8.2f} ms/article")
+    print(
+        f"  automaton  {match_seconds * 1000 / args.articles:8.2f} ms/article "
+        f"({loop_seconds / match_seconds:.0f}x), built in {build_seconds * 1000:.0f} ms  "
+        f"{'ok' if found == expected else 'FAIL: matches differ'}"
+    )
+
+    # Reload: some terms removed, new ones added (and mentioned in the articles)
+    edited = {name: list(terms) for name, terms in watchlists.items()}
+    for _ in range(args.edits):
+        edited["vendors"].pop(rng.randrange(len(edited["vendors"])))
+    edited["products"].extend(f"New Product {i}" for i in range(args.edits))
+    for i, article in enumerate(articles[:args.edits]):
+        article["body"] += f" Affects New Product {i}."
+
+    reload_stats, reload_seconds = timed(matcher.reload, edited)
+    rebuilt, rebuild_seconds = timed(WatchlistMatcher, edited)
+    reloaded_found = automaton_matches(articles, matcher)
+    rebuilt_found = automaton_matches(articles, rebuilt)
+    ok = reloaded_found == rebuilt_found == loop_matches(articles, edited)
+    failures += not ok
+    print(
+        f"  reload     +{reload_stats['added']} -{reload_stats['removed']} terms in {reload_seconds * 1000:.1f} ms "
+        f"(rebuild {rebuild_seconds * 1000:.0f} ms), {len(matcher.delta)} in the delta  "
+        f"{'ok' if ok else 'FAIL: matches differ from a rebuilt matcher'}"
+    )
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Exercise the conditional-request middleware against a local HTTP stand-in.
+
+Serves a listing page (with ETag and/or Last-Modified) and its articles on
+127.0.0.1, crawls it several times and checks that unchanged listings are
+answered with 304 and stop the crawl, while changed ones are crawled again.
+
+    python benchmarks/check_conditional_http.py
+
+Exits 1 if any scenario does not behave as expected.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+import scrapy
+
+
+class StandInSite:
+    """Listing + articles whose validators change when `version` does."""
+
+    def __init__(self):
+        self.version = 1
+        self.send_etag = True
+        self.send_last_modified = True
+        self.hits = {}
+
+    def listing(self) -> bytes:
+        links = "".join(f'<a class="article" href="/a{self.version}-{i}">A{i}</a>' for i in range(3))
+        return f"<html><body>{links}</body></html>".encode("utf-8")
+
+    def handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                site.hits[self.path] = site.hits.get(self.path, 0) + 1
+                if self.path != "/listing":
+                    self._send(200, b"<html><body><p>Article.</p></body></html>", {})
+                    return
+
+                etag = f'"v{site.version}"'
+                modified = formatdate(1_700_000_000 + site.version * 86400, usegmt=True)
+                headers = {}
+                if site.send_etag:
+                    headers["ETag"] = etag
+                if site.send_last_modified:
+                    headers["Last-Modified"] = modified
+
+                if site.send_etag and self.headers.get("If-None-Match") == etag:
+                    self._send(304, b"", headers)
+                elif (
+                    not site.send_etag and site.send_last_modified
+                    and self.headers.get("If-Modified-Since") == modified
+                ):
+                    self._send(304, b"", headers)
+                else:
+                    self._send(200, site.listing(), headers)
+
+            def _send(self, status, body, headers):
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                if status != 304:
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+class ListingSpider(scrapy.Spider):
+    name = "conditional_check"
+
+    def parse(self, response):
+        for href in response.css("a.article::attr(href)").getall():
+            yield response.follow(href, callback=self.parse_article)
+
+    def parse_article(self, response):
+        yield {"url": response.url}
+
+
+def crawl_once(port: int, validator_dir: str):
+    """Run one crawl (in a subprocess, the reactor cannot restart) and print its stats."""
+    from scrapy.crawler import CrawlerProcess
+
+    process = CrawlerProcess({
+        "LOG_LEVEL": "WARNING",
+        "DOWNLOADER_MIDDLEWARES": {"api_conditional_http.ConditionalRequestMiddleware": 110},
+        "CONDITIONAL_HTTP_DIR": validator_dir,
+        "ROBOTSTXT_OBEY": False,
+    })
+    crawler = process.create_crawler(ListingSpider)
+    process.crawl(crawler, start_urls=[f"http://127.0.0.1:{port}/listing"])
+    process.start()
+    print(json.dumps(crawler.stats.get_stats(), default=str))
+
+
+def run_crawl(port: int, validator_dir: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, __file__, "--crawl-once", str(port), validator_dir],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--crawl-once", nargs=2, metavar=("PORT", "DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.crawl_once:
+        crawl_once(int(args.crawl_once[0]), args.crawl_once[1])
+        return
+
+    site = StandInSite()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), site.handler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as validator_dir:
+        def scenario(label, expect_items, expect_not_modified):
+            nonlocal failures
+            stats = run_crawl(port, validator_dir)
+            items = stats.get("item_scraped_count", 0)
+            not_modified = stats.get("conditional_http/not_modified", 0)
+            ok = items == expect_items and not_modified == expect_not_modified
+            failures += not ok
+            print(
+                f"{label:<44} {stats.get('downloader/request_count', 0)} requests, {items} items, "
+                f"{not_modified} not modified  {'ok' if ok else 'FAIL'}"
+            )
+
+        scenario("first crawl (no validators yet)", 3, 0)
+        scenario("unchanged listing (ETag)", 0, 1)
+        site.version = 2
+        scenario("changed listing", 3, 0)
+        site.send_etag = False
+        site.version = 3
+        scenario("Last-Modified only, changed", 3, 0)
+        scenario("Last-Modified only, unchanged", 0, 1)
+
+    server.shutdown()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
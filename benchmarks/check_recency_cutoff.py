@@ -0,0 +1,191 @@
+"""
+Count the requests each spider issues under the recency cutoff, offline.
+
+Builds replay archives mimicking the three sites' markup (three listing
+pages: all recent, mixed, all old; one article listed twice), crawls them
+with RECENCY_SINCE set and checks that no redundant listing page or
+article is requested.
+
+    python benchmarks/check_recency_cutoff.py
+
+Exits 1 if a spider issues more (or fewer) requests than necessary.
+"""
+import argparse
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+import scrapy
+from scrapy.http import HtmlResponse
+from scrapy.utils.request import RequestFingerprinter
+
+from api_crawl_runner import ConcurrentCrawlRunner
+from api_replay import ResponseArchive, replay_settings
+
+SINCE = datetime(2025, 6, 10)
+PER_PAGE = 5
+
+SPIDERS = [
+    {
+        "dir": "news_spider",
+        "settings": "news_spider.settings",
+        "spider": "news_spider.spiders.news.BleepingSpider",
+        "output": "bleeping.json",
+        "source": "BleepingComputer",
+        "name": "bleeping",
+        "base": "https://www.bleepingcomputer.com/news/security/",
+    },
+    {
+        "dir": "news_spider",
+        "settings": "news_spider.settings",
+        "spider": "news_spider.spiders.news.SecurityweekSpider",
+        "output": "securityweek.json",
+        "source": "SecurityWeek",
+        "name": "securityweek",
+        "base": "https://www.securityweek.com/category/vulnerabilities/",
+    },
+    {
+        "dir": "news_spider",
+        "settings": "news_spider.settings",
+        "spider": "news_spider.spiders.news.ThehackernewsSpider",
+        "output": "thehackernews.json",
+        "source": "The Hacker News",
+        "name": "thehackernews",
+        "base": "https://thehackernews.com/search/label/Vulnerability/",
+    },
+]
+
+
+# -----------------------------------------------------
+# Synthetic site: page 1 recent, page 2 mixed, page 3 old
+# -----------------------------------------------------
+def site_articles(base: str):
+    """[(page, url, date)], newest first; the first article is listed again on page 2."""
+    articles = []
+    for i in range(3 * PER_PAGE):
+        page = i // PER_PAGE + 1
+        # 8 recent articles, then older ones
+        date = SINCE + timedelta(days=1) if i < 8 else SINCE - timedelta(days=i - 7)
+        articles.append((page, f"{base}article-{i}/", date))
+    articles.insert(PER_PAGE, (2, articles[0][1], articles[0][2]))
+    return articles
+
+
+def listing_html(name: str, entries, next_url: str | None) -> str:
+    blocks = []
+    for _, url, date in entries:
+        if name == "bleeping":
+            blocks.append(
+                f'<div class="bc_latest_news_text"><h4><a href="{url}">Title</a></h4>'
+                f'<ul><li><a class="author">Author</a></li>'
+                f'<li class="bc_news_date">{date:%B %d, %Y}</li></ul></div>'
+            )
+        elif name == "securityweek":
+            blocks.append(
+                f'<article class="zox-art-wrap"><div class="zox-art-title"><a href="{url}">'
+                f'<h2 class="zox-s-title2">Title</h2></a></div>'
+                f'<span class="zox-byline-name"><a>Author</a></span></article>'
+            )
+        else:
+            blocks.append(
+                f'<div class="body-post clear"><a class="story-link" href="{url}">'
+                f'<h2 class="home-title">Title</h2></a>'
+                f'<span class="h-datetime">{date:%b %d, %Y}</span></div>'
+            )
+
+    if next_url:
+        if name == "bleeping":
+            blocks.append(f'<ul class="cz-pagination"><li><a aria-label="Next Page" href="{next_url}">Next</a></li></ul>')
+        elif name == "securityweek":
+            blocks.append(f'<div class="pagination"><a href="{next_url}">Next</a></div>')
+        else:
+            blocks.append(f'<a class="blog-pager-older-link-mobile" href="{next_url}">Older</a>')
+
+    return f"<html><body>{''.join(blocks)}</body></html>"
+
+
+def article_html(name: str, date: datetime) -> str:
+    text = "<p>A vulnerability was patched.</p><p>Attackers exploited it.</p>"
+    if name == "bleeping":
+        return f'<html><body><div class="articleBody">{text}</div></body></html>'
+    if name == "securityweek":
+        return (
+            f'<html><body><time class="post-date updated">{date:%B %d, %Y}</time>'
+            f'<div class="zox-post-body">{text}</div></body></html>'
+        )
+    return f'<html><body><div id="articlebody">{text}</div></body></html>'
+
+
+def build_archive(spec, archive_dir: Path):
+    name, base = spec["name"], spec["base"]
+    fingerprinter = RequestFingerprinter()
+    articles = site_articles(base)
+
+    with ResponseArchive(str(archive_dir / f"{name}.zip"), mode="a") as archive:
+        def add(url: str, html: str):
+            request = scrapy.Request(url)
+            response = HtmlResponse(url, body=html.encode("utf-8"), headers={"Content-Type": "text/html; charset=utf-8"})
+            archive.add(fingerprinter.fingerprint(request).hex(), request, response)
+
+        for page in (1, 2, 3):
+            url = base if page == 1 else f"{base}page/{page}/"
+            next_url = f"{base}page/{page + 1}/" if page < 3 else None
+            add(url, listing_html(name, [a for a in articles if a[0] == page], next_url))
+
+        for _, url, date in articles:
+            add(url, article_html(name, date))
+
+
+def expected_requests(spec) -> int:
+    # Listing dates: the mixed page 2 is fetched, page 3 is not, only recent
+    # articles are. SecurityWeek: dates only on article pages, so every
+    # article of pages 1 and 2 is fetched, page 3 is not.
+    if spec["name"] == "securityweek":
+        return 2 + 2 * PER_PAGE
+    return 2 + 8
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive_dir = Path(tmp) / "archives"
+        for spec in SPIDERS:
+            build_archive(spec, archive_dir)
+
+        settings = replay_settings(str(archive_dir))
+        settings.update({"LOG_LEVEL": "WARNING", "RECENCY_SINCE": SINCE.isoformat()})
+        specs = [{k: v for k, v in spec.items() if k not in ("name", "base")} for spec in SPIDERS]
+        stats = ConcurrentCrawlRunner(
+            str(REPO_ROOT), specs, settings=settings, feed_dir=str(Path(tmp) / "feeds")
+        ).run()
+
+    failures = 0
+    for spec in SPIDERS:
+        s = stats[spec["source"]]
+        requests = s.get("downloader/request_count", 0)
+        expected = expected_requests(spec)
+        problems = []
+        if requests != expected:
+            problems.append(f"expected {expected} requests")
+        if s.get("item_scraped_count", 0) != 8:
+            problems.append("expected 8 items")
+        if s.get("replay/miss") or s.get("dupefilter/filtered"):
+            problems.append("requested unarchived or duplicate urls")
+
+        failures += bool(problems)
+        print(
+            f"{spec['source']:<18} {requests:3d} requests, {s.get('item_scraped_count', 0):2d} items, "
+            f"finish reason {s.get('finish_reason')}  {'FAIL: ' + '; '.join(problems) if problems else 'ok'}"
+        )
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
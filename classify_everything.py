@@ -1,122 +1,442 @@
-import subprocess
+import argparse
 import json
-import re
+import os
+import shutil
+import time
 from pathlib import Path
 from datetime import datetime
 
+from api_crawl_runner import ConcurrentCrawlRunner
+from api_streaming_pipeline import ArticleStream, StreamingInferenceConsumer, register_stream
+from api_pipeline_stages import StageCheckpoints, JSONLCheckpoint
+from api_run_report import RunReport
+from api_replay import record_settings, replay_settings
+from api_text_normalizer import normalize_body
+from api_article_store import ArticleStore
+from api_seen_url_frontier import SeenUrlStore
+from api_near_duplicates import NearDuplicateDetector
+from api_inference_token_classification_model import TokenClassificationSecurityModel
+from api_visualization_table import EntityTableCSVExporter
+from api_entity_cooccurrence import EntityCooccurrenceMatrix
+from api_entity_dictionary import EntityDictionary
+from api_output_writer import ShardedJSONLWriter, CombinedJSONWriter
+from api_watchlist_alerts import WatchlistAlerts, JSONLAlertSink
+from api_fulltext_index import FullTextIndex
+from api_cve_index import CVEIndex, CVEEnricher
+
 BASE_DIR = "/home/ubuntu/SOC-Care-API"
 
 SPIDERS = [
     {
-        "dir": "thehackernews_spider",
-        "command": ["/home/ubuntu/SOC-Care-API/soccareenv/bin/scrapy", "crawl", "thehackernews", "-o", "thehackernews.json"],
+        "dir": "news_spider",
+        "settings": "news_spider.settings",
+        "spider": "news_spider.spiders.news.ThehackernewsSpider",
+        "pipeline": "news_spider.pipelines.NewsSpiderStreamPipeline",
         "output": "thehackernews.json",
         "source": "The Hacker News",
     },
     {
-        "dir": "securityweek",
-        "command": ["/home/ubuntu/SOC-Care-API/soccareenv/bin/scrapy", "crawl", "securityweek", "-o", "securityweek.json"],
+        "dir": "news_spider",
+        "settings": "news_spider.settings",
+        "spider": "news_spider.spiders.news.SecurityweekSpider",
+        "pipeline": "news_spider.pipelines.NewsSpiderStreamPipeline",
         "output": "securityweek.json",
         "source": "SecurityWeek",
     },
     {
-        "dir": "bleeping_spider",
-        "command": ["/home/ubuntu/SOC-Care-API/soccareenv/bin/scrapy", "crawl", "bleeping", "-o", "bleeping.json"],
+        "dir": "news_spider",
+        "settings": "news_spider.settings",
+        "spider": "news_spider.spiders.news.BleepingSpider",
+        "pipeline": "news_spider.pipelines.NewsSpiderStreamPipeline",
         "output": "bleeping.json",
         "source": "BleepingComputer",
     },
 ]
 
+parser = argparse.ArgumentParser(description="Crawl, classify and export today's security news.")
+parser.add_argument("--restart", action="store_true", help="Run every stage again (the crawl appends to today's feeds)")
+parser.add_argument("--no-overlap", action="store_true", help="Crawl first, then classify (no inference during the crawl)")
+parser.add_argument("--record", metavar="DIR", help="Also record every crawled response into DIR/{spider}.zip")
+parser.add_argument("--replay", metavar="DIR", help="Crawl offline from responses recorded with --record")
+args = parser.parse_args()
+
 timestamp = datetime.now().strftime("%Y%m%d")
 
-# ------------------------
-# Step A: Run spiders
-# ------------------------
+# Create a directory for output files if it doesn't exist
+output_dir_path = f"{BASE_DIR}/data_processed/{timestamp}_outputs"
+Path(output_dir_path).mkdir(parents=True, exist_ok=True)
 
-for spider in SPIDERS:
-    print(f"Running {spider['source']} spider...")
-    subprocess.run(
-        spider["command"],
-        cwd=f"{BASE_DIR}/{spider['dir']}",
-        check=True
-    )
+# Intermediate artifacts and stage state of today's run. Re-running the
+# script skips completed stages and resumes classify/export where they
+# stopped.
+run_dir = f"{BASE_DIR}/data_processed/{timestamp}_run"
+if args.restart:
+    # Feeds and the ingest log are kept: urls already fetched are skipped
+    # by the seen-url frontier and stored articles would look "unchanged".
+    for name in ("stages.json", "merged.jsonl", "normalized.jsonl", "classified.jsonl", "exported.jsonl"):
+        Path(run_dir, name).unlink(missing_ok=True)
+checkpoints = StageCheckpoints(run_dir)
+
+# Per-stage timings, crawl stats and throughput, copied next to the
+# outputs at the end (compare two runs with `python api_run_report.py`)
+report = RunReport(checkpoints.path("report.json"), run=timestamp)
 
 # ------------------------
-# Step B: Concatenate + enrich
+# Setup: store, model, checkpoints
 # ------------------------
 
-all_items = []
-article_id = 1
+# Ids come from the canonical url, revisions from the body hash; only
+# new or changed articles go on to inference. Statuses assigned in this
+# run are logged so a resumed run does not see its own articles as
+# "unchanged".
+article_store = ArticleStore(f"{BASE_DIR}/data_processed/article_store")
+ingest_log = JSONLCheckpoint(checkpoints.path("ingested.jsonl"))
+ingest_statuses = {(e["id"], e["revision"]): e["status"] for e in ingest_log.records()}
 
-for spider in SPIDERS:
-    json_path = f"{BASE_DIR}/{spider['dir']}/{spider['output']}"
+# Urls of stored articles, which later crawls skip (see SEEN_URL_DIR in the
+# spider settings). Added only once an article is in the store, so an
+# article downloaded but never ingested is fetched again. Replayed crawls
+# do not touch it.
+seen_urls = None
+if not (args.record or args.replay):
+    seen_urls = SeenUrlStore(f"{BASE_DIR}/data_processed/seen_urls")
 
-    with open(json_path, encoding="utf-8") as f:
-        data = json.load(f)
+# Classified articles, one per line, with their spans and duplicate link.
+# An article edited during the run is classified again as a new revision.
+classified = JSONLCheckpoint(checkpoints.path("classified.jsonl"), key=("id", "revision"))
 
-        for item in data:
-            item["id"] = article_id
-            item["source"] = spider["source"]
-            article_id += 1
-            all_items.append(item)
+# Near-identical bodies (within the run and over the last week) are
+# classified once; duplicates reuse their representative's spans.
+near_duplicates = NearDuplicateDetector(
+    f"{BASE_DIR}/data_processed/near_duplicates",
+    threshold=0.8,
+    num_perm=128,
+    bands=32,
+    window_days=7,
+)
+near_duplicates.restore(classified.records())
 
-# ------------------------
-# Step B.1: Cleanup individual spider JSONs
-# ------------------------
+ner = None
+table_builder = EntityTableCSVExporter()
 
-for spider in SPIDERS:
-    json_path = f"{BASE_DIR}/{spider['dir']}/{spider['output']}"
-    json_path = Path(json_path)
+# Alerts on articles mentioning a watched vendor, product or asset, as soon
+# as they are classified. Watchlists are `{list}.txt` files, reloaded when
+# edited during the run.
+watchlist_dir = f"{BASE_DIR}/watchlists"
+watchlist_alerts = None
+if os.path.isdir(watchlist_dir):
+    watchlist_alerts = WatchlistAlerts(watchlist_dir, JSONLAlertSink(f"{output_dir_path}/{timestamp}_alerts.jsonl"))
 
-    if json_path.exists():
-        json_path.unlink()
-        print(f"Deleted {json_path}")
+# CVSS, CWE and affected products of the CVE ids in predicted entities, from
+# a local NVD index (built and updated offline with `python api_cve_index.py`)
+cve_index_dir = f"{BASE_DIR}/data_processed/cve_index"
+cve_enricher = None
+if os.path.exists(os.path.join(cve_index_dir, CVEIndex.MANIFEST)):
+    cve_enricher = CVEEnricher(CVEIndex(cve_index_dir))
 
-# ------------------------
-# Step C: Post-processing
-# ------------------------
+crawl_settings = {}
+if args.record:
+    crawl_settings = record_settings(args.record)
+elif args.replay:
+    crawl_settings = replay_settings(args.replay)
+
+crawl_runner = ConcurrentCrawlRunner(
+    BASE_DIR,
+    SPIDERS,
+    settings=crawl_settings,
+    stream=None if args.no_overlap else "soccare",
+    feed_dir=checkpoints.path("crawl"),
+    append=True,
+)
 
-for item in all_items:
-    if "body" in item and isinstance(item["body"], str):
-        item["body"] = re.sub(r'(?<![.!?])\n', ' ', item["body"])
-        item["body"] = re.sub(r'[\t\r]', '', item["body"])
-        item["body"] = re.sub(r'\n+', '\n', item["body"])
-        item["body"] = item["body"].replace(u'\xa0', u' ')
 
-# Create a directory for output files if it doesn't exist
-output_dir_path = f"{BASE_DIR}/data_processed/{timestamp}_outputs"
-Path(output_dir_path).mkdir(parents=True, exist_ok=True)
+def load_model():
+    """Load the model on first use, so resuming at export does not pay for it."""
+    global ner
+    if ner is None:
+        ner = TokenClassificationSecurityModel("/home/ubuntu/SOC-Care-API/finetuned_CTI_BERT_soccare", device='cpu')
+    return ner
+
+
+def read_jsonl(path):
+    """Records of a JSON Lines file, ignoring a torn last line."""
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def ingest(batch):
+    """Store a batch of normalized articles and return those needing inference."""
+    logged = set(ingest_statuses)
+    entries, fresh = article_store.ingest(batch, known=ingest_statuses)
+    ingest_log.append(e for e in entries if (e["id"], e["revision"]) not in logged)
+    if seen_urls is not None:
+        for entry in entries:
+            if entry["url"]:
+                seen_urls.add(entry["url"])
+        seen_urls.flush()
+    return entries, fresh
+
+
+def classify_batch(batch):
+    """Deduplicate and classify one batch of normalized articles, then checkpoint them."""
+    _, fresh = ingest(batch)
+    fresh = [item for item in fresh if classified.key_of(item) not in classified]
+    if not fresh:
+        return
+
+    duplicate_of = {}
+    representatives = []
+    for item in fresh:
+        match = near_duplicates.assign(item)
+        if match is None:
+            representatives.append(item)
+        else:
+            duplicate_of[item["id"]] = match
+
+    started = time.perf_counter()
+    results = load_model().generate([item["body"] for item in representatives], batch_size=8)
+
+    tokens_by_source = {}
+    for item, result in zip(representatives, results):
+        near_duplicates.set_spans(item["id"], result["pred_spans"])
+        tokens_by_source[item.get("source")] = tokens_by_source.get(item.get("source"), 0) + result["n_tokens"]
+    report.add_inference(len(representatives), time.perf_counter() - started, tokens_by_source)
+
+    for item in fresh:
+        if item["id"] in duplicate_of:
+            item["duplicate_of"], similarity = duplicate_of[item["id"]]
+            item["duplicate_similarity"] = round(similarity, 4)
+            # The representative's offsets point into its own body
+            pred_spans = near_duplicates.spans_for(item["duplicate_of"], item["body"])
+        else:
+            pred_spans = near_duplicates.spans_for(item["id"])
+
+        item["predicted_result"] = table_builder.to_column_dict(
+            pred_spans,
+            sort_by_text_position=True,
+            unique=True,
+        )
+        item["pred_spans"] = pred_spans
+
+    if cve_enricher is not None:
+        cve_enricher.enrich(fresh)
+    if watchlist_alerts is not None:
+        watchlist_alerts.process(fresh)
+    classified.append(fresh)
+
 
 # -----------------------------------------------------
-# TOKEN CLASSIFICATION PART
+# STAGES
 # -----------------------------------------------------
 
-from api_inference_token_classification_model import TokenClassificationSecurityModel
-from api_visualization_table import EntityTableCSVExporter
+def stage_crawl():
+    """
+    Run all spiders into the run directory. Unless --no-overlap is given,
+    articles are classified while the crawl is running.
+    """
+    if args.no_overlap:
+        print("Running spiders...")
+        crawl_stats = crawl_runner.run()
+    else:
+        # Spiders push normalized articles into a bounded queue from their
+        # item pipelines; the inference thread batches them through the
+        # model as they arrive. A full queue holds back the crawl instead
+        # of buffering.
+        article_stream = register_stream("soccare", ArticleStream(maxsize=32))
+        consumer = StreamingInferenceConsumer(article_stream, classify_batch, batch_size=8)
+        consumer.start()
 
-ner = TokenClassificationSecurityModel("/home/ubuntu/SOC-Care-API/finetuned_CTI_BERT_soccare", device='cpu')
-table_builder = EntityTableCSVExporter()
+        print("Running spiders...")
+        crawl_stats = crawl_runner.run()
+
+        article_stream.finish()
+        consumer.join()
+
+        print(
+            f"{len(classified)} articles classified during the crawl "
+            f"({article_stream.stats['backpressure_waits']} backpressure waits, "
+            f"{article_stream.stats['backpressure_seconds']:.1f}s; inference busy {consumer.busy_seconds:.1f}s)."
+        )
+        report.set("stream", dict(article_stream.stats, inference_busy_seconds=round(consumer.busy_seconds, 3)))
+        if consumer.error is not None:
+            # The feeds are complete; the classify stage picks up the rest
+            print(f"Inference during the crawl failed: {consumer.error!r}")
+
+    report.add_crawl_stats(crawl_stats)
+
+    stats_path = checkpoints.path("crawl", "stats.json")
+    with open(stats_path, "w", encoding="utf-8") as f:
+        json.dump(crawl_stats, f, ensure_ascii=False, indent=4, default=str)
+
+    feeds = [crawl_runner.feed_path(spider) for spider in SPIDERS]
+    return [stats_path] + [path for path in feeds if os.path.exists(path)]
+
+
+def stage_merge():
+    """Merge the per-source feeds into one file, tagging each article with its source."""
+    merged_path = checkpoints.path("merged.jsonl")
+    seen_urls = set()
+
+    with open(merged_path, "w", encoding="utf-8") as out:
+        for spider in SPIDERS:
+            for item in read_jsonl(crawl_runner.feed_path(spider)):
+                # A re-run crawl appends to its feed
+                if item.get("url") in seen_urls:
+                    continue
+                seen_urls.add(item.get("url"))
+
+                item["source"] = spider["source"]
+                out.write(json.dumps(item, ensure_ascii=False) + "\n")
+
+    return [merged_path]
+
+
+def stage_normalize():
+    """Normalize bodies, assign ids and store articles; keep the new or changed ones."""
+    items = list(read_jsonl(checkpoints.path("merged.jsonl")))
+    for item in items:
+        if isinstance(item.get("body"), str):
+            item["body"] = normalize_body(item["body"])
+
+    entries, fresh = ingest(items)
+    report.add_sources(entries)
+
+    normalized_path = checkpoints.path("normalized.jsonl")
+    with open(normalized_path, "w", encoding="utf-8") as out:
+        for item in fresh:
+            out.write(json.dumps(item, ensure_ascii=False) + "\n")
+
+    manifest_path = article_store.write_manifest(entries, checkpoints.path("articles.json"))
+    return [normalized_path, manifest_path]
+
+
+def stage_classify():
+    """Classify the articles not yet in the checkpoint, in batches of 32."""
+    batch = []
+    for item in read_jsonl(checkpoints.path("normalized.jsonl")):
+        if classified.key_of(item) in classified:
+            continue
+        batch.append(item)
+        if len(batch) == 32:
+            classify_batch(batch)
+            batch = []
+    if batch:
+        classify_batch(batch)
+
+    print(f"{len(classified)} new or changed articles classified, {len(near_duplicates.links)} near-duplicates linked.")
+    return [classified.path]
 
 
-payload = [item["body"] for item in all_items]
+def stage_export():
+    """
+    Write the day's outputs from the classified checkpoint. CSVs already
+    exported and one-time updates of shared state (near-duplicate window,
+    co-occurrence counts, full-text index) are logged so a resumed export
+    does not repeat them.
+    """
+    export_log = JSONLCheckpoint(checkpoints.path("exported.jsonl"))
 
-result = ner.generate(payload)
+    # Shards reference entities by corpus-level id instead of repeated strings
+    entity_dictionary_path = f"{BASE_DIR}/data_processed/entity_dictionary.jsonl"
+    entity_dictionary = EntityDictionary(entity_dictionary_path)
+    all_items = []
+    exported = []
 
-for i, item in enumerate(all_items):
-    item["predicted_result"] = table_builder.to_column_dict(
-        result[i]["pred_spans"],
-        sort_by_text_position=True,
-        unique=True,
+    # Results go to JSONL shards; the combined JSON, with entity strings, is
+    # kept for existing consumers.
+    shard_writer = ShardedJSONLWriter(
+        output_dir_path,
+        timestamp,
+        max_shard_bytes=64 * 1024 * 1024,
+        compression="gzip",
+        metadata={"entity_dictionary": entity_dictionary_path},
     )
+    combined_writer = CombinedJSONWriter(f"{output_dir_path}/{timestamp}_combined.json")
 
-with open(f"{output_dir_path}/{timestamp}_combined.json", "w", encoding="utf-8") as f:
-    json.dump(all_items, f, ensure_ascii=False, indent=4)
+    # Only the latest classified revision of each article is exported
+    latest = {item["id"]: item for item in classified.records()}
 
-for i, res in enumerate(result):
-    table_builder.export(
-        unique=True,
-        pred_spans=result[i]["pred_spans"],
-        output_file=f"{output_dir_path}/{all_items[i]['id']}.csv",
-)
-    
-print("Token classification and CSV export completed.")
\ No newline at end of file
+    with shard_writer, combined_writer:
+        for item in latest.values():
+            pred_spans = item.pop("pred_spans")
+            encoded = entity_dictionary.encode_column_dict(item["predicted_result"])
+            shard_writer.write(dict(item, predicted_result=encoded))
+            combined_writer.write(item)
+            all_items.append(item)
+
+            if item["id"] not in export_log:
+                table_builder.export(
+                    unique=True,
+                    pred_spans=pred_spans,
+                    output_file=f"{output_dir_path}/{item['id']}.csv",
+                )
+                exported.append({"id": item["id"]})
+                if len(exported) == 50:
+                    export_log.append(exported)
+                    exported = []
+        export_log.append(exported)
+
+    shutil.copyfile(checkpoints.path("articles.json"), f"{output_dir_path}/{timestamp}_articles.json")
+
+    entity_dictionary.save()
+
+    if "near_duplicates" not in export_log:
+        near_duplicates.save(timestamp)
+        export_log.append([{"id": "near_duplicates"}])
+    near_duplicates.write_report(f"{output_dir_path}/{timestamp}_near_duplicates.json")
+
+    print(f"{len(all_items)} articles written, {len(near_duplicates.links)} near-duplicates linked.")
+    print("Token classification and CSV export completed.")
+
+    # Entity co-occurrence
+    cooccurrence_dir = f"{BASE_DIR}/data_processed/entity_cooccurrence"
+
+    cooccurrence = EntityCooccurrenceMatrix.load(cooccurrence_dir)
+    if "cooccurrence" not in export_log:
+        cooccurrence.add_items(all_items)
+        cooccurrence.save(cooccurrence_dir)
+        export_log.append([{"id": "cooccurrence"}])
+
+    neighbours_path = cooccurrence.export_top_neighbours(
+        f"{output_dir_path}/{timestamp}_entity_neighbours.json",
+        n=10,
+        by="pmi",
+        min_count=2,
+    )
+
+    print("Entity co-occurrence update completed.")
+
+    # Full-text search index; re-adding an indexed revision is a no-op
+    if "fulltext" not in export_log:
+        with FullTextIndex(f"{BASE_DIR}/data_processed/fulltext_index") as fulltext_index:
+            fulltext_index.add_items(all_items)
+            fulltext_index.commit()
+            report.set("fulltext_index", dict(fulltext_index.stats, documents=len(fulltext_index)))
+        export_log.append([{"id": "fulltext"}])
+
+    report.add_outputs(output_dir_path)
+    return [shard_writer.manifest_path, combined_writer.output_file, neighbours_path]
+
+
+checkpoints.run([
+    ("crawl", report.timed("crawl", stage_crawl)),
+    ("merge", report.timed("merge", stage_merge)),
+    ("normalize", report.timed("normalize", stage_normalize)),
+    ("classify", report.timed("classify", stage_classify)),
+    ("export", report.timed("export", stage_export)),
+])
+
+if watchlist_alerts is not None:
+    report.set("alerts", dict(watchlist_alerts.stats, **watchlist_alerts.matcher.stats))
+if cve_enricher is not None:
+    report.set("cve_enrichment", cve_enricher.stats)
+    cve_enricher.index.close()
+
+shutil.copyfile(report.save(), f"{output_dir_path}/{timestamp}_run_report.json")
+print(f"Run report written to {output_dir_path}/{timestamp}_run_report.json")
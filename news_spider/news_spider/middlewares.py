@@ -8,8 +8,12 @@ from scrapy import signals
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
 
+from api_conditional_http import ConditionalRequestMiddleware
+from api_crawl_instrumentation import CallbackTimingMiddleware
+from api_seen_url_frontier import SeenUrlDownloaderMiddleware
 
-class BleepingSpiderSpiderMiddleware:
+
+class NewsSpiderSpiderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
     # scrapy acts as if the spider middleware does not modify the
     # passed objects.
@@ -53,7 +57,7 @@ class BleepingSpiderSpiderMiddleware:
         spider.logger.info("Spider opened: %s" % spider.name)
 
 
-class BleepingSpiderDownloaderMiddleware:
+class NewsSpiderDownloaderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
     # scrapy acts as if the downloader middleware does not modify the
     # passed objects.
@@ -100,5 +104,19 @@ class BleepingSpiderDownloaderMiddleware:
         spider.logger.info("Spider opened: %s" % spider.name)
 
 
+class NewsSpiderSeenUrlMiddleware(SeenUrlDownloaderMiddleware):
+    # Drops article requests for urls already fetched in an earlier run.
+    # The store under SEEN_URL_DIR is shared by all sources.
+    pass
+
+
+class NewsSpiderConditionalHttpMiddleware(ConditionalRequestMiddleware):
+    # Sends If-None-Match / If-Modified-Since for listing pages; a 304 stops
+    # the listing crawl. Validators are stored under CONDITIONAL_HTTP_DIR.
+    pass
 
 
+class NewsSpiderCallbackTimingMiddleware(CallbackTimingMiddleware):
+    # Times every callback for the CrawlInstrumentation extension; ordered
+    # last so that it wraps the spider's own output only.
+    pass
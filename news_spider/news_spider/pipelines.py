@@ -0,0 +1,27 @@
+# Define your item pipelines here
+#
+# Don't forget to add your pipeline to the ITEM_PIPELINES setting
+# See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
+
+
+# useful for handling different item types with a single interface
+from itemadapter import ItemAdapter
+
+from api_streaming_pipeline import ArticleStreamPipeline
+
+
+class NewsSpiderPipeline:
+    def process_item(self, item, spider):
+        return item
+
+
+class NewsSpiderStreamPipeline(ArticleStreamPipeline):
+    # Enabled by api_crawl_runner when crawling in-process with a streaming
+    # consumer; hands articles to the inference thread as they are scraped.
+    # One class for every source: the source name comes from the spider.
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        pipeline = super().from_crawler(crawler)
+        pipeline.source = crawler.spidercls.source
+        return pipeline
@@ -0,0 +1,158 @@
+# Scrapy settings for news_spider project
+#
+# For simplicity, this file contains only settings considered important or
+# commonly used. You can find more settings consulting the documentation:
+#
+#     https://docs.scrapy.org/en/latest/topics/settings.html
+#     https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
+#     https://docs.scrapy.org/en/latest/topics/spider-middleware.html
+
+import sys
+from pathlib import Path
+
+# Shared SOC-Care modules (api_*.py) live in the repository root
+REPO_ROOT = str(Path(__file__).resolve().parents[2])
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+
+BOT_NAME = "news_spider"
+
+SPIDER_MODULES = ["news_spider.spiders"]
+NEWSPIDER_MODULE = "news_spider.spiders"
+
+ADDONS = {}
+
+
+# Crawl responsibly by identifying yourself (and your website) on the user-agent
+#USER_AGENT = "news_spider (+http://www.yourdomain.com)"
+
+# Obey robots.txt rules
+ROBOTSTXT_OBEY = True
+
+# Configure maximum concurrent requests performed by Scrapy (default: 16)
+#CONCURRENT_REQUESTS = 32
+
+# Configure a delay for requests for the same website (default: 0)
+# See https://docs.scrapy.org/en/latest/topics/settings.html#download-delay
+# See also autothrottle settings and docs
+#DOWNLOAD_DELAY = 3
+# The download delay setting will honor only one of:
+#CONCURRENT_REQUESTS_PER_DOMAIN = 16
+#CONCURRENT_REQUESTS_PER_IP = 16
+
+# Disable cookies (enabled by default)
+#COOKIES_ENABLED = False
+
+# Disable Telnet Console (enabled by default)
+#TELNETCONSOLE_ENABLED = False
+
+# Override the default request headers:
+#DEFAULT_REQUEST_HEADERS = {
+#    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+#    "Accept-Language": "en",
+#}
+
+# Enable or disable spider middlewares
+# See https://docs.scrapy.org/en/latest/topics/spider-middleware.html
+SPIDER_MIDDLEWARES = {
+#    "news_spider.middlewares.NewsSpiderSpiderMiddleware": 543,
+    "news_spider.middlewares.NewsSpiderCallbackTimingMiddleware": 1000,
+}
+
+# Enable or disable downloader middlewares
+# See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
+DOWNLOADER_MIDDLEWARES = {
+#    "news_spider.middlewares.NewsSpiderDownloaderMiddleware": 543,
+    "news_spider.middlewares.NewsSpiderSeenUrlMiddleware": 100,
+    "news_spider.middlewares.NewsSpiderConditionalHttpMiddleware": 110,
+}
+
+# One HTTP connection pool for every source crawled in this process
+DOWNLOAD_HANDLERS = {
+    "http": "api_crawl_runner.SharedPoolDownloadHandler",
+    "https": "api_crawl_runner.SharedPoolDownloadHandler",
+}
+
+# Persistent seen-url frontier shared by all sources
+SEEN_URL_DIR = str(Path(REPO_ROOT) / "data_processed" / "seen_urls")
+SEEN_URL_CALLBACKS = ["parse_article"]
+# Stored articles are still re-fetched for this many days, to pick up edits
+SEEN_URL_REFRESH_DAYS = 2
+
+# Only crawl articles published within RECENCY_DAYS (or since RECENCY_SINCE,
+# an ISO date); spider arguments `-a days=...` / `-a since=...` override
+RECENCY_DAYS = 1
+
+# ETag / Last-Modified of listing pages, for conditional requests
+CONDITIONAL_HTTP_DIR = str(Path(REPO_ROOT) / "data_processed" / "http_validators")
+CONDITIONAL_HTTP_CALLBACKS = ["parse", "parse_feed"]
+
+# Article discovery: "html" pages through the listings, "feed" reads the
+# site's RSS/Atom feed and falls back to the listings when it does not reach
+# back far enough, "api" fetches full posts in bulk from the site's content
+# API (sources with "content_api"; HTML elsewhere); spider argument
+# `-a discovery=...` overrides
+DISCOVERY_MODE = "html"
+
+# Sources and their per-source throttling are configured in sources.py
+
+# Backfill of a date range instead of the recent articles (spider arguments
+# `-a backfill_from=2025-06-01 [-a backfill_to=...]` override), with
+# `-s JOBDIR=...` to pause and resume: listing pages in flight for
+# page-number listings, days per slice for date-based ones
+BACKFILL_FROM = None
+BACKFILL_TO = None
+BACKFILL_WINDOW = 8
+BACKFILL_SLICE_DAYS = 1
+
+# Enable or disable extensions
+# See https://docs.scrapy.org/en/latest/topics/extensions.html
+EXTENSIONS = {
+#    "scrapy.extensions.telnet.TelnetConsole": None,
+    "api_crawl_instrumentation.CrawlInstrumentation": 500,
+}
+
+# Callback, selector, queueing and AutoThrottle timings in the crawl stats
+# (instrumentation/...), with a histogram summary logged when a spider
+# closes and written to INSTRUMENTATION_DIR if set
+INSTRUMENTATION_ENABLED = True
+#INSTRUMENTATION_DIR = str(Path(REPO_ROOT) / "data_processed" / "instrumentation")
+
+# Run article body extraction and normalization in a "thread" or "process"
+# pool instead of on the reactor thread (default: inline), with at most
+# PARSE_OFFLOAD_MAX_PENDING pages submitted at once
+PARSE_OFFLOAD = None
+#PARSE_OFFLOAD_WORKERS = 2
+#PARSE_OFFLOAD_MAX_PENDING = 4
+
+# Configure item pipelines
+# See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
+#ITEM_PIPELINES = {
+#    "news_spider.pipelines.NewsSpiderPipeline": 300,
+#}
+
+# Enable and configure the AutoThrottle extension (disabled by default)
+# See https://docs.scrapy.org/en/latest/topics/autothrottle.html
+#AUTOTHROTTLE_ENABLED = True
+# The initial download delay
+#AUTOTHROTTLE_START_DELAY = 5
+# The maximum download delay to be set in case of high latencies
+#AUTOTHROTTLE_MAX_DELAY = 60
+# The average number of requests Scrapy should be sending in parallel to
+# each remote server
+#AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
+# Enable showing throttling stats for every response received:
+#AUTOTHROTTLE_DEBUG = False
+
+# Enable and configure HTTP caching (disabled by default)
+# See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html#httpcache-middleware-settings
+#HTTPCACHE_ENABLED = True
+#HTTPCACHE_EXPIRATION_SECS = 0
+#HTTPCACHE_DIR = "httpcache"
+#HTTPCACHE_IGNORE_HTTP_CODES = []
+#HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
+
+# Set settings whose default value is deprecated to a future-proof value
+FEED_EXPORT_ENCODING = "utf-8"
+
+
@@ -0,0 +1,141 @@
+# News sources crawled by the generic spider (news_spider/spiders/news.py).
+#
+# Each entry becomes one spider named after its key (`scrapy crawl securityweek`).
+# Adding a source means adding an entry here; no new project or spider code.
+#
+#   source          display name, stored with every article
+#   start_urls      first listing page(s)
+#   listing         selectors on listing pages, relative to each "articles"
+#                   block ("next_page" relative to the page). CSS unless the
+#                   expression starts with "/", "./" or "(" (XPath).
+#                   Without "date", listings are treated as undated: the
+#                   next page waits until the articles of the current one
+#                   are parsed and turn out recent.
+#   article         selectors on article pages: "date" and "author" override
+#                   the listing's, "excerpt" text is put before the body
+#   date_format     how listing/article dates are written ("%B %d, %Y"),
+#                   also used to format feed and API dates
+#   body            BodyExtractor rules for the article body
+#   feed            RSS/Atom feed for `-a discovery=feed`
+#   content_api     bulk posts API for `-a discovery=api`
+#   backfill        listing urls for `-a backfill_from=...`: "pages" with
+#                   `{page}` or "dates" with `{max}` (see api_backfill.py)
+#   settings        per-source throttling (the spider's custom_settings)
+
+from api_body_extractor import HEADINGS
+
+# Politeness settings shared by every source
+THROTTLE = {
+    "ROBOTSTXT_OBEY": False,
+    "AUTOTHROTTLE_ENABLED": True,
+    "AUTOTHROTTLE_START_DELAY": 2,
+    "AUTOTHROTTLE_MAX_DELAY": 10,
+    "AUTOTHROTTLE_TARGET_CONCURRENCY": 1.0,
+    "CONCURRENT_REQUESTS_PER_DOMAIN": 2,
+}
+
+SAFARI_UA = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Safari/605.1.15"
+CHROME_UA = "Mozilla/5.0 (Macintosh; Intel Mac OS X 13_5_2) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.6312.86 Safari/537.36"
+
+SOURCES = {
+    "bleeping": {
+        "source": "BleepingComputer",
+        "allowed_domains": ["bleepingcomputer.com"],
+        "start_urls": ["https://www.bleepingcomputer.com/news/security/"],
+        "listing": {
+            "articles": "div.bc_latest_news_text",
+            "url": "h4 a::attr(href)",
+            "title": "h4 a::text",
+            "date": "ul li.bc_news_date::text",
+            "author": "ul li a.author::text",
+            "next_page": 'ul.cz-pagination li a[aria-label="Next Page"]::attr(href)',
+        },
+        "article": {},
+        "date_format": "%B %d, %Y",
+        # Direct children of .articleBody without ads, related links or figures
+        "body": {
+            "containers": '//div[@class="articleBody"]',
+            "units": None,  # every direct child of the container is one line
+            "split": "unit",
+            "exclude_classes": ("ia_ad", "cz-related-article-wrapp"),
+            "exclude_tags": ("figure", "style", "script"),
+            "drop_units_containing": ("figure",),
+        },
+        # Site-wide feed, security news only
+        "feed": {
+            "url": "https://www.bleepingcomputer.com/feed/",
+            "link_pattern": r"/news/security/",
+        },
+        "backfill": {"pages": "https://www.bleepingcomputer.com/news/security/page/{page}/"},
+        "settings": {**THROTTLE, "USER_AGENT": CHROME_UA, "DOWNLOAD_DELAY": 3},
+    },
+    "securityweek": {
+        "source": "SecurityWeek",
+        "allowed_domains": ["securityweek.com"],
+        "start_urls": ["https://www.securityweek.com/category/vulnerabilities/"],
+        "listing": {
+            "articles": "article.zox-art-wrap",
+            "url": "div.zox-art-title a::attr(href)",
+            "title": "h2.zox-s-title2::text",
+            "author": "span.zox-byline-name a::text",
+            "next_page": '//div[@class="pagination"]/a[contains(text(), "Next")]/@href',
+        },
+        "article": {
+            "date": "time.post-date.updated::text",
+            "excerpt": '//span[contains(@class, "zox-post-excerpt")]/descendant-or-self::text()',
+        },
+        "date_format": "%B %d, %Y",
+        # Paragraphs of the post body without ads, the author box or "Related:" links
+        "body": {
+            "containers": '//div[contains(@class, "zox-post-body")]',
+            "units": ("p",),
+            "split": "node",
+            "exclude_classes": ("zox-post-ad-wrap", "zox-author-box-wrap"),
+            "exclude_tags": ("style", "script"),
+            "skip_prefixes": ("Related:",),
+        },
+        "feed": {"url": "https://www.securityweek.com/category/vulnerabilities/feed/"},
+        "content_api": {
+            "type": "wordpress",
+            "url": "https://www.securityweek.com/wp-json/wp/v2/",
+            "category": "vulnerabilities",
+        },
+        "backfill": {"pages": "https://www.securityweek.com/category/vulnerabilities/page/{page}/"},
+        "settings": {**THROTTLE, "USER_AGENT": SAFARI_UA, "DOWNLOAD_DELAY": 2},
+    },
+    "thehackernews": {
+        "source": "The Hacker News",
+        "allowed_domains": ["thehackernews.com"],
+        "start_urls": ["https://thehackernews.com/search/label/Vulnerability/"],
+        "listing": {
+            "articles": "div.body-post.clear",
+            "url": "a.story-link::attr(href)",
+            "title": "h2.home-title::text",
+            "date": "span.h-datetime::text",
+            "next_page": "a.blog-pager-older-link-mobile::attr(href)",
+        },
+        "article": {
+            "author": "div.postmeta span.author::text",
+        },
+        "date_format": "%b %d, %Y",
+        # Paragraphs and headings of #articlebody outside .note-b, falling
+        # back to all of its text when there are none
+        "body": {
+            "containers": '//div[@id="articlebody"]',
+            "units": ("p",) + HEADINGS,
+            "split": "node",
+            "exclude_classes": ("note-b",),
+            "exclude_tags": ("style", "script"),
+            "skip_texts": ("#",),
+            "fallback_all_text": True,
+        },
+        "feed": {"url": "https://thehackernews.com/feeds/posts/default/-/Vulnerability"},
+        "content_api": {
+            "type": "blogger",
+            "url": "https://thehackernews.com/feeds/posts/default/-/Vulnerability",
+        },
+        # Blogger lists the posts up to a date: slices are crawled in parallel
+        "backfill": {"dates": "https://thehackernews.com/search/label/Vulnerability?updated-max={max}&max-results=20"},
+        "settings": {**THROTTLE, "USER_AGENT": SAFARI_UA, "DOWNLOAD_DELAY": 2},
+    },
+}
@@ -0,0 +1,238 @@
+from typing import List, Dict, Any
+
+import scrapy
+from scrapy.exceptions import IgnoreRequest
+from scrapy.utils.defer import maybe_deferred_to_future
+
+from api_backfill import BackfillMixin
+from api_body_extractor import BodyExtractor
+from api_compiled_selector import CompiledSelector
+from api_content_api import ContentApiMixin
+from api_parse_offload import ParseOffloadMixin
+from api_recency_cutoff import RecencyCutoffMixin, parse_listing_date
+from api_text_normalizer import normalize_body
+
+from news_spider.sources import SOURCES
+
+LISTING_FIELDS = {"articles", "url", "title", "date", "author", "next_page"}
+ARTICLE_FIELDS = {"date", "author", "excerpt"}
+SOURCE_KEYS = {
+    "source", "allowed_domains", "start_urls", "listing", "article",
+    "date_format", "body", "feed", "content_api", "backfill", "settings",
+}
+
+
+def compile_selectors(selectors: Dict[str, str], allowed, where: str) -> Dict[str, CompiledSelector]:
+    unknown = set(selectors) - allowed
+    if unknown:
+        raise ValueError(f"Unknown {where} selectors: {sorted(unknown)}")
+    return {field: CompiledSelector(expression) for field, expression in selectors.items()}
+
+
+def article_fields(root, article: Dict[str, CompiledSelector], body_extractor: BodyExtractor) -> Dict[str, str]:
+    """
+    Date and author (for the article selectors a source has) and the
+    normalized body of an article page. Runs in the parse offload pool
+    when PARSE_OFFLOAD is set, so it only gets picklable arguments.
+    """
+    fields = {}
+    for field in ("date", "author"):
+        if field in article:
+            fields[field] = article[field].first(root) or "Unknown"
+
+    lines = body_extractor.extract_lines(root)
+    if "excerpt" in article:
+        # The excerpt is its own paragraph ahead of the body
+        body = "\n".join(article["excerpt"].texts(root)) + "\n" + "\n".join(lines)
+    else:
+        body = "\n".join(lines)
+    fields["body"] = normalize_body(body)
+    return fields
+
+
+class NewsSpider(BackfillMixin, ContentApiMixin, RecencyCutoffMixin, ParseOffloadMixin, scrapy.Spider):
+    """
+    Generic news spider driven by a source entry of `sources.py`.
+
+    `for_source()` builds one subclass per source (named after its key),
+    with the selectors compiled and the body rules loaded once, at import.
+    Each source is crawled by its own crawler; ConcurrentCrawlRunner runs
+    them on one reactor.
+    """
+
+    source: str | None = None
+    listing: Dict[str, CompiledSelector] = {}
+    article: Dict[str, CompiledSelector] = {}
+    date_format = "%B %d, %Y"
+
+    @classmethod
+    def for_source(cls, key: str, config: Dict[str, Any]) -> type:
+        unknown = set(config) - SOURCE_KEYS
+        if unknown:
+            raise ValueError(f"Unknown keys in source '{key}': {sorted(unknown)}")
+
+        listing = compile_selectors(config["listing"], LISTING_FIELDS, f"'{key}' listing")
+        for field in ("articles", "url", "title"):
+            if field not in listing:
+                raise ValueError(f"Source '{key}' has no '{field}' listing selector")
+
+        feed = config.get("feed", {})
+        content_api = config.get("content_api", {})
+        backfill = config.get("backfill", {})
+        attrs = {
+            "__module__": __name__,
+            "name": key,
+            "source": config["source"],
+            "allowed_domains": config["allowed_domains"],
+            "start_urls": config["start_urls"],
+            "custom_settings": config.get("settings", {}),
+            "listing": listing,
+            "article": compile_selectors(config.get("article", {}), ARTICLE_FIELDS, f"'{key}' article"),
+            "date_format": config.get("date_format", cls.date_format),
+            "body_extractor": BodyExtractor(**config["body"]),
+            "feed_url": feed.get("url"),
+            "feed_link_pattern": feed.get("link_pattern"),
+            "feed_date_format": config.get("date_format", cls.date_format),
+            "content_api": content_api.get("type"),
+            "content_api_url": content_api.get("url"),
+            "content_api_category": content_api.get("category"),
+            "content_api_date_format": config.get("date_format", cls.date_format),
+            "backfill_pages": backfill.get("pages"),
+            "backfill_dates": backfill.get("dates"),
+        }
+        class_name = "".join(part.title() for part in key.split("_")) + "Spider"
+        return type(class_name, (cls,), attrs)
+
+    @property
+    def dated_listings(self) -> bool:
+        return "date" in self.listing
+
+    def listing_entries(self, response) -> List[Dict[str, Any]]:
+        """Articles of a listing page: url, title, author, date (text) and article_date."""
+        root = response.selector.root
+        listing = self.listing
+        entries = []
+
+        # Each article block
+        for article in listing["articles"].all(root):
+            url = listing["url"].first(article)
+            title = listing["title"].first(article)
+            if not (title and url):
+                continue  # skip articles with no title or URL
+
+            date = listing["date"].first(article) if self.dated_listings else None
+            date = date or "Unknown"
+            author = listing["author"].first(article) if "author" in listing else None
+            entries.append({
+                "url": response.urljoin(url),
+                "title": title,
+                "author": author or "Unknown",
+                "date": date,
+                "article_date": parse_listing_date(date),
+            })
+
+        return entries
+
+    def next_page_url(self, response) -> str | None:
+        if "next_page" not in self.listing:
+            return None
+        return self.listing["next_page"].first(response.selector.root)
+
+    def parse(self, response):
+        dates = []
+        article_requests = []
+
+        for entry in self.listing_entries(response):
+            if self.dated_listings:
+                dates.append(entry["article_date"])
+                if not self.cutoff.is_recent(entry["article_date"]):
+                    continue
+            if not self.cutoff.first_request(entry["url"]):
+                continue
+
+            article_requests.append(
+                self.article_request(response, entry["url"], entry["title"], entry["date"], entry["author"])
+            )
+
+        next_page_url = self.next_page_url(response)
+        next_page = response.follow(next_page_url, callback=self.parse) if next_page_url else None
+
+        if self.dated_listings:
+            # Listings are newest first: past the cutoff here, past it on every later page
+            if not self.cutoff.continue_paging(dates):
+                next_page = None
+        else:
+            # Undated listings: the next page waits until every article of
+            # this one has been parsed and none is past the cutoff
+            next_page = self.cutoff.defer_next_page(response.url, len(article_requests), next_page)
+
+        yield from article_requests
+        if next_page is not None:
+            yield next_page
+
+    def article_request(self, response, url: str, title: str, date: str, author: str):
+        return response.follow(
+            url,
+            callback=self.parse_article,
+            errback=None if self.dated_listings else self.article_failed,
+            cb_kwargs={"title": title, "date": date, "author": author, "url": url},
+            meta={"listing_page": response.url},
+        )
+
+    def article_failed(self, failure):
+        # Skipped by the seen-url frontier: fetched by an earlier run, as is
+        # everything listed below it
+        next_page = self.cutoff.article_done(
+            failure.request.meta.get("listing_page"),
+            old=failure.check(IgnoreRequest) is not None,
+        )
+        if next_page is not None:
+            yield next_page
+
+    def parse_article(self, response, title, url, date="Unknown", author="Unknown"):
+        if self.parse_offload is not None:
+            return self._parse_article_offloaded(response, title, url, date, author)
+        fields = article_fields(response.selector.root, self.article, self.body_extractor)
+        return self._article_output(response, fields, title, url, date, author)
+
+    def parse_offload_shared(self):
+        # Sent to each parse worker once, not with every page
+        return (self.article, self.body_extractor)
+
+    async def _parse_article_offloaded(self, response, title, url, date, author):
+        fields = await maybe_deferred_to_future(
+            self.parse_offload.call_on_page(response, article_fields)
+        )
+        for output in self._article_output(response, fields, title, url, date, author):
+            yield output
+
+    def _article_output(self, response, fields, title, url, date, author):
+        date = fields.get("date", date)
+        article_date = parse_listing_date(date)
+
+        if self.backfilling:
+            released, keep = self.backfill_article_done(response.request, article_date)
+        elif "date" in self.article:
+            next_page = self.cutoff.article_done(response.meta.get("listing_page"), article_date)
+            released, keep = [next_page] if next_page is not None else [], self.cutoff.is_recent(article_date)
+        else:
+            released, keep = [], True
+        yield from released
+        if not keep:
+            return
+
+        yield {
+            "title": title,
+            "date": date,
+            "author": fields.get("author", author),
+            "url": url,
+            "body": fields["body"],
+        }
+
+
+# One spider per configured source: BleepingSpider, SecurityweekSpider, ...
+for _key, _config in SOURCES.items():
+    _spider = NewsSpider.for_source(_key, _config)
+    globals()[_spider.__name__] = _spider
+
+del _key, _config, _spider
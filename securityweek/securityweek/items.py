@@ -1,12 +0,0 @@
-# Define here the models for your scraped items
-#
-# See documentation in:
-# https://docs.scrapy.org/en/latest/topics/items.html
-
-import scrapy
-
-
-class SecurityweekItem(scrapy.Item):
-    # define the fields for your item here like:
-    # name = scrapy.Field()
-    pass